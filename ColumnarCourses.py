@@ -0,0 +1,287 @@
+import numpy as np
+
+# Reuse the formatting and rules so both backends report identically
+from Courses import Courses, EXCLUDED_FROM_GPA, GPA_TARGETS, base_course_code
+from Mark import Mark
+from report_renderer import SEPARATOR, render
+
+
+class ColumnarCourses(object):
+    """
+    A column-oriented, NumPy-backed alternative to Courses that keeps each field of the course rows in a typed array.
+
+    Rows added with add_course are buffered and packed into parallel typed arrays the first time a query needs
+    them, and scholarship, CGPA and per-year grouping run as vectorized masks and reductions over every row.
+    Courses answers the same queries from running totals kept by add_course, which is faster; this backend is
+    for callers that want the rows as arrays. Results are the same as the list-backed Courses.
+
+    Attributes:
+        __student (Student): The student associated with these courses.
+        __codes, __names, __marks (list): The course code, course name and Mark of each row, kept for display.
+        __scholarship_pct (np.ndarray): The percentage counted towards scholarships (E is 0, NaN if not counted).
+        __comparable (np.ndarray): Mark.get_comparable_percentage() of each row.
+        __gpa (np.ndarray): The GPA points of each row (NaN if the row cannot count towards the CGPA).
+        __credits (np.ndarray): The credit hours of each row.
+        __years (np.ndarray): The academic year of each row.
+        __base_ids (np.ndarray): The interned id of each row's base course code (e.g. CS-1910).
+        __prefix_ids (np.ndarray): The interned id of each row's subject prefix (e.g. CS).
+    """
+
+    def __init__(self, student):
+        """
+        Initializes the ColumnarCourses object with a student and empty columns.
+
+        Args:
+            student (Student): The student associated with these courses.
+
+        Raises:
+            TypeError: If the provided student is not an instance of the Student class.
+        """
+        from Student import Student  # Lazy import to avoid circular dependencies
+        if not isinstance(student, Student):
+            raise TypeError(f"Expected a Student object, got {type(student).__name__}")
+        self.__student = student
+        self.__codes = []
+        self.__names = []
+        self.__marks = []
+        self.__pending = []  # Rows added since the columns were last packed
+        self.__base_code_ids = {}
+        self.__prefix_ids_by_name = {}
+
+        self.__scholarship_pct = np.empty(0, dtype=np.float64)
+        self.__comparable = np.empty(0, dtype=np.float64)
+        self.__gpa = np.empty(0, dtype=np.float64)
+        self.__credits = np.empty(0, dtype=np.int64)
+        self.__years = np.empty(0, dtype=np.int64)
+        self.__base_ids = np.empty(0, dtype=np.int32)
+        self.__prefix_ids = np.empty(0, dtype=np.int32)
+
+    def add_course(self, *courses, academic_year: int):
+        """
+        Adds multiple courses to the columns for a specific academic year.
+
+        Args:
+            *courses: A variable number of tuples representing courses.
+                      Each tuple can contain (course_code, course_name, mark, credit_hours).
+            academic_year (int): The academic year the courses were taken.
+        """
+        for course in courses:
+            if len(course) == 1:
+                course_code = course[0]
+                course_name = "N/A"  # Default course name
+                mark = Mark()
+                credit_hours = 3
+            elif len(course) == 2:
+                course_code, course_name = course
+                mark = Mark()
+                credit_hours = 3
+            elif len(course) == 3:
+                course_code, course_name, mark = course
+                credit_hours = 3
+            elif len(course) == 4:
+                course_code, course_name, mark, credit_hours = course
+            else:
+                raise ValueError("Each course must be a tuple of length 1, 2, 3, or 4.")
+
+            if mark is None:
+                mark = Mark()
+            if not isinstance(mark, Mark):
+                raise ValueError(f"Expected a Mark object, got {type(mark).__name__}.")
+            if credit_hours < 0:
+                raise ValueError("Credit hours must be a positive integer.")
+
+            self.__codes.append(course_code)
+            self.__names.append(course_name)
+            self.__marks.append(mark)
+            self.__pending.append(self.__encode_row(course_code, mark, credit_hours, academic_year))
+
+    def __encode_row(self, course_code: str, mark: Mark, credit_hours: int, academic_year: int) -> tuple:
+        """
+        Converts one course into the values stored in each column, interning its base code and subject prefix.
+        """
+        parts = course_code.split('-')
+        base_id = self.__base_code_ids.setdefault('-'.join(parts[:2]), len(self.__base_code_ids))
+        prefix_id = self.__prefix_ids_by_name.setdefault(parts[0], len(self.__prefix_ids_by_name))
+
+        if isinstance(mark.percentage, (int, float)):
+            scholarship_pct = mark.percentage
+        elif mark.percentage == "E":
+            scholarship_pct = 0
+        else:
+            scholarship_pct = np.nan
+
+        counts_for_gpa = (mark.percentage not in EXCLUDED_FROM_GPA
+                          and isinstance(mark.gpa, (int, float)))
+        gpa = mark.gpa if counts_for_gpa else np.nan
+
+        return (scholarship_pct, mark.get_comparable_percentage(), gpa, credit_hours, academic_year,
+                base_id, prefix_id)
+
+    def __pack(self) -> None:
+        """
+        Moves any buffered rows into the typed columns.
+        """
+        if not self.__pending:
+            return
+        scholarship_pct, comparable, gpa, credits, years, base_ids, prefix_ids = zip(*self.__pending)
+        self.__pending = []
+
+        self.__scholarship_pct = np.concatenate((self.__scholarship_pct, np.array(scholarship_pct, dtype=np.float64)))
+        self.__comparable = np.concatenate((self.__comparable, np.array(comparable, dtype=np.float64)))
+        self.__gpa = np.concatenate((self.__gpa, np.array(gpa, dtype=np.float64)))
+        self.__credits = np.concatenate((self.__credits, np.array(credits, dtype=np.int64)))
+        self.__years = np.concatenate((self.__years, np.array(years, dtype=np.int64)))
+        self.__base_ids = np.concatenate((self.__base_ids, np.array(base_ids, dtype=np.int32)))
+        self.__prefix_ids = np.concatenate((self.__prefix_ids, np.array(prefix_ids, dtype=np.int32)))
+
+    def get_courses(self) -> list:
+        """
+        Returns every course in the order it was added.
+
+        Returns:
+            list: Tuples of (course_code, course_name, mark, credit_hours, academic_year).
+        """
+        self.__pack()
+        return list(zip(self.__codes, self.__names, self.__marks, self.__credits.tolist(), self.__years.tolist()))
+
+    def get_courses_and_marks(self) -> dict:
+        """
+        Returns a dictionary of courses and their marks.
+
+        Returns:
+            dict: A dictionary where keys are course codes and values are tuples of (course_name, Mark object).
+        """
+        return {code: (name, mark) for code, name, mark in zip(self.__codes, self.__names, self.__marks)}
+
+    def calculate_scholarship(self, academic_year: int) -> str:
+        """
+        Calculates the scholarship based on the weighted average of marks for a specific academic year.
+
+        Args:
+            academic_year (int): The academic year for which to calculate the scholarship.
+
+        Returns:
+            str: A message indicating the weighted average and the scholarship amount.
+        """
+        self.__pack()
+        counted = (self.__years == academic_year) & ~np.isnan(self.__scholarship_pct)
+        credits = self.__credits[counted]
+        total_weighted_marks = float(np.dot(self.__scholarship_pct[counted], credits))
+        total_credit_hours = int(credits.sum())
+        return Courses.format_scholarship(
+            Courses._scholarship_result(academic_year, total_weighted_marks, total_credit_hours))
+
+    def calculate_all_scholarships(self, academic_years=None) -> dict:
+        """
+        Calculates the scholarship of every academic year with one grouped reduction over the year column.
+
+        Args:
+            academic_years (iterable, optional): The academic years to report. Defaults to every year with courses.
+
+        Returns:
+            dict: Academic year -> scholarship result, as returned by Courses.calculate_all_scholarships.
+        """
+        self.__pack()
+        years, year_index = np.unique(self.__years, return_inverse=True)
+        counted = ~np.isnan(self.__scholarship_pct)
+        credits = np.where(counted, self.__credits, 0)
+        weighted = np.bincount(year_index, weights=np.where(counted, self.__scholarship_pct, 0) * credits,
+                               minlength=years.size)
+        credit_totals = np.bincount(year_index, weights=credits, minlength=years.size)
+        totals = {int(year): (float(w), int(c)) for year, w, c in zip(years, weighted, credit_totals)}
+
+        if academic_years is None:
+            academic_years = totals
+        return {year: Courses._scholarship_result(year, *totals.get(year, (0, 0))) for year in academic_years}
+
+    def get_best_attempt(self, course_code: str):
+        """
+        Returns the attempt counted towards the CGPA for a course, ignoring the section number.
+
+        Args:
+            course_code (str): The course code, with or without a section (e.g. 'MATH-1920' or 'MATH-1920-02').
+
+        Returns:
+            tuple | None: The (mark, credit_hours) of the best attempt, or None if no attempt counts.
+        """
+        base_id = self.__base_code_ids.get(base_course_code(course_code))
+        if base_id is None:
+            return None
+        self.__pack()
+        rows = np.flatnonzero((self.__base_ids == base_id) & ~np.isnan(self.__gpa))
+        if rows.size == 0:
+            return None
+        best = rows[np.argmax(self.__comparable[rows])]  # argmax returns the earliest row on ties
+        return self.__marks[best], self.__credits[best].item()
+
+    def what_if(self, pending: list, academic_year: int, gpa_targets: tuple = GPA_TARGETS) -> dict:
+        """
+        Solves for the lowest percentage the pending courses of a year need to reach each scholarship tier and each
+        cumulative GPA target, exactly as Courses.what_if does (see there for the arguments and result), on a
+        Courses loaded with these rows.
+        """
+        courses = Courses(self.__student)
+        for course_code, course_name, mark, credit_hours, year in self.get_courses():
+            courses.add_course((course_code, course_name, mark, credit_hours), academic_year=year)
+        return courses.what_if(pending, academic_year, gpa_targets)
+
+    def calculate_cumulative_gpa(self) -> str:
+        """
+        Calculates the cumulative GPA (CGPA) using only the highest mark for each base course code.
+
+        Returns:
+            str: A message indicating the cumulative GPA or a message if no valid courses are found.
+        """
+        self.__pack()
+        rows = np.flatnonzero(~np.isnan(self.__gpa))
+        if rows.size == 0:
+            return Courses._cumulative_gpa_message(0, 0)
+
+        # Sort by base code, then best mark first; the stable sort keeps the earliest attempt first on ties
+        base_ids = self.__base_ids[rows]
+        order = np.lexsort((-self.__comparable[rows], base_ids))
+        sorted_base_ids = base_ids[order]
+        first_of_group = np.empty(order.size, dtype=bool)
+        first_of_group[0] = True
+        np.not_equal(sorted_base_ids[1:], sorted_base_ids[:-1], out=first_of_group[1:])
+        best = rows[order[first_of_group]]
+
+        credits = self.__credits[best]
+        total_weighted_gpa = float(np.dot(self.__gpa[best], credits))
+        total_credit_hours = int(credits.sum())
+        return Courses._cumulative_gpa_message(total_weighted_gpa, total_credit_hours)
+
+    def write_report(self, stream) -> None:
+        """
+        Writes the courses grouped by academic year and sorted first by subject name prefix and then by subject
+        mark, exactly as Courses does, to a text stream or report_renderer.ReportWriter.
+        """
+        self.__pack()
+        stream.write("Completed Courses by year:\n")
+        if self.__years.size == 0:
+            return
+
+        # Rank the interned prefixes alphabetically so a single stable lexsort orders every year at once
+        prefixes = sorted(self.__prefix_ids_by_name, key=self.__prefix_ids_by_name.get)
+        prefix_rank = np.empty(len(prefixes), dtype=np.int32)
+        prefix_rank[np.argsort(np.array(prefixes, dtype=object), kind="stable")] = np.arange(len(prefixes))
+        order = np.lexsort((-self.__comparable, prefix_rank[self.__prefix_ids], self.__years))
+
+        sorted_years = self.__years[order]
+        boundaries = np.flatnonzero(np.diff(sorted_years)) + 1
+        for group in np.split(order, boundaries):
+            year = self.__years[group[0]]
+            stream.write(f"\nYear {year}:\n{SEPARATOR}\n")
+            width = len(str(len(group)))
+            for i, row in enumerate(group.tolist(), start=1):
+                stream.write(
+                    f"{i:>{width}}. Course: {self.__codes[row]} ({self.__names[row]}), {self.__marks[row]}, "
+                    f"Credit Hours: {self.__credits[row]}\n"
+                )
+            stream.write(SEPARATOR + "\n")
+
+    def __str__(self) -> str:
+        """
+        Returns a string representation of the courses, see write_report.
+        """
+        return render(self.write_report)
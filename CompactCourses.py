@@ -0,0 +1,149 @@
+import sys
+from array import array
+
+from Courses import Courses
+from Mark import Mark
+
+# Grade ids: 0-100 are the percentage itself, then the special grades; _OVERFLOW marks a row kept as a tuple
+_SPECIAL_GRADE_IDS = {"E": 101, "P": 102, "DSC": 103, "N/A": 104}
+_MARK_BY_ID = tuple(Mark(p) for p in range(101)) + tuple(Mark(g) for g in _SPECIAL_GRADE_IDS)
+_OVERFLOW = 255
+_MAX_SMALL_INT = 0xFFFF  # Credit hours and academic years are stored as unsigned 16-bit integers
+
+
+class CourseCatalog(object):
+    """
+    Interns course codes and names as small integer ids, so every student of a cohort shares one copy of
+    'CS-1910-01' or 'Computer Science I' instead of holding their own.
+
+    Attributes:
+        codes (list): The course code of each code id.
+        names (list): The course name of each name id.
+        __code_ids (dict): Course code -> code id.
+        __name_ids (dict): Course name -> name id.
+    """
+
+    __slots__ = ("codes", "names", "__code_ids", "__name_ids")
+
+    def __init__(self):
+        self.codes = []
+        self.names = []
+        self.__code_ids = {}
+        self.__name_ids = {}
+
+    def code_id(self, code: str) -> int:
+        code_id = self.__code_ids.get(code)
+        if code_id is None:
+            code_id = self.__code_ids[code] = len(self.codes)
+            self.codes.append(sys.intern(code))
+        return code_id
+
+    def name_id(self, name: str) -> int:
+        name_id = self.__name_ids.get(name)
+        if name_id is None:
+            name_id = self.__name_ids[name] = len(self.names)
+            self.names.append(sys.intern(name))
+        return name_id
+
+    def __len__(self) -> int:
+        return len(self.codes) + len(self.names)
+
+
+SHARED_CATALOG = CourseCatalog()  # The catalog CompactCourses use unless given their own
+
+
+class CompactRows(object):
+    """
+    A list-like store of (course_code, course_name, mark, credit_hours, academic_year) rows kept as typed columns:
+    catalog ids for the code and name, and one small integer each for the grade, credit hours and year. Rows are
+    rebuilt as tuples when iterated.
+
+    A row that does not fit the encoding (a grade without an id, a non-integer or very large credit count or
+    year) is kept as its tuple instead, so every row Courses accepts is stored unchanged.
+
+    Attributes:
+        __catalog (CourseCatalog): Where codes and names are interned.
+        __code_ids, __name_ids (array): The catalog ids of each row ('I', unsigned 32-bit).
+        __grade_ids (array): The grade id of each row ('B', unsigned 8-bit), _OVERFLOW for a row kept as a tuple.
+        __credits, __years (array): The credit hours and academic year of each row ('H', unsigned 16-bit).
+        __overflow (dict): Row index -> tuple, for the rows that do not fit the encoding.
+    """
+
+    __slots__ = ("__catalog", "__code_ids", "__name_ids", "__grade_ids", "__credits", "__years", "__overflow")
+
+    def __init__(self, catalog: CourseCatalog = None):
+        self.__catalog = catalog if catalog is not None else SHARED_CATALOG
+        self.__code_ids = array("I")
+        self.__name_ids = array("I")
+        self.__grade_ids = array("B")
+        self.__credits = array("H")
+        self.__years = array("H")
+        self.__overflow = {}
+
+    def append(self, row: tuple) -> None:
+        code, name, mark, credit_hours, academic_year = row
+        percentage = mark.percentage
+        if type(percentage) is int and 0 <= percentage <= 100:
+            grade_id = percentage
+        else:
+            grade_id = _SPECIAL_GRADE_IDS.get(percentage, _OVERFLOW) if isinstance(percentage, str) else _OVERFLOW
+        fits = (grade_id != _OVERFLOW and type(mark) is Mark
+                and type(credit_hours) is int and 0 <= credit_hours <= _MAX_SMALL_INT
+                and type(academic_year) is int and 0 <= academic_year <= _MAX_SMALL_INT)
+        if fits:
+            self.__code_ids.append(self.__catalog.code_id(code))
+            self.__name_ids.append(self.__catalog.name_id(name))
+            self.__credits.append(credit_hours)
+            self.__years.append(academic_year)
+        else:
+            self.__overflow[len(self.__grade_ids)] = row
+            grade_id = _OVERFLOW
+            for column in (self.__code_ids, self.__name_ids, self.__credits, self.__years):
+                column.append(0)
+        self.__grade_ids.append(grade_id)
+
+    def __len__(self) -> int:
+        return len(self.__grade_ids)
+
+    def __iter__(self):
+        codes, names = self.__catalog.codes, self.__catalog.names
+        for index, (code_id, name_id, grade_id, credit_hours, academic_year) in enumerate(
+                zip(self.__code_ids, self.__name_ids, self.__grade_ids, self.__credits, self.__years)):
+            if grade_id == _OVERFLOW:
+                yield self.__overflow[index]
+            else:
+                yield codes[code_id], names[name_id], _MARK_BY_ID[grade_id], credit_hours, academic_year
+
+    def __reduce__(self):
+        # Pickled as plain rows and re-interned into the shared catalog, so a pickle never carries a whole catalog
+        return _rows_from_tuples, (list(self),)
+
+
+def _rows_from_tuples(rows: list) -> CompactRows:
+    compact = CompactRows()
+    for row in rows:
+        compact.append(row)
+    return compact
+
+
+class CompactCourses(Courses):
+    """
+    Courses that keep their rows in CompactRows, for cohorts too large to hold a tuple, a code string and a name
+    string per course row. Results and reports are the same as Courses.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, student, catalog: CourseCatalog = None):
+        """
+        Initializes the CompactCourses object with a student and no courses.
+
+        Args:
+            student (Student): The student associated with these courses.
+            catalog (CourseCatalog, optional): Where course codes and names are interned. Defaults to the catalog
+                                               shared by every CompactCourses of the process.
+
+        Raises:
+            TypeError: If the provided student is not an instance of the Student class.
+        """
+        super().__init__(student, rows=CompactRows(catalog))
@@ -1,4 +1,28 @@
+import math
+import sys
+
 from Mark import Mark  # Import Mark for handling course grades
+from policies import DEFAULT_POLICY
+from report_renderer import render, write_courses
+
+# The default (UPEI) policy's scholarship tiers as (minimum weighted average, amount), highest tier first
+SCHOLARSHIP_TIERS = DEFAULT_POLICY.tiers
+MINIMUM_YEAR_CREDITS = DEFAULT_POLICY.minimum_credits  # Credit hours a year needs before it can earn a scholarship
+EXCLUDED_FROM_GPA = ("DSC", "N/A", "P")  # Marks that never count towards the cumulative GPA
+GPA_TARGETS = (4.3, 4.0, 3.7, 3.3, 3.0)  # Cumulative GPAs what_if solves for by default
+
+# Shared (mark, credit_hours) best attempts. Marks are flyweights, so a cohort only has a few hundred distinct attempts
+_SHARED_ATTEMPTS = {}
+
+# The percentages where the GPA of a mark steps up, e.g. 50 (D-) and 91 (A+)
+_GPA_STEPS = tuple(p for p in range(101) if p == 0 or Mark.percentage_to_gpa(p) != Mark.percentage_to_gpa(p - 1))
+
+
+def base_course_code(course_code: str) -> str:
+    """
+    Returns a course code without its section, e.g. 'CS-1910-01' -> 'CS-1910'.
+    """
+    return '-'.join(course_code.split('-')[:2])
 
 
 class Courses(object):
@@ -9,14 +33,22 @@ class Courses(object):
         __student (Student): The student associated with these courses.
         __courses (list): A list of tuples, where each tuple represents a course.
                           Each tuple contains (course_code, course_name, mark, credit_hours, academic_year).
+                          CompactCourses keep them in a CompactRows instead.
+        __year_totals (dict): Running [weighted mark total, credit hours] of the scholarship-counted courses
+                              of each academic year, kept up to date by add_course.
+        __best_attempts (dict): The best (mark, credit_hours) attempt of each base course code.
+        __gpa_totals (list): Running [GPA points, credit hours] over the best attempts.
     """
 
-    def __init__(self, student):
+    __slots__ = ("__student", "__courses", "__year_totals", "__best_attempts", "__gpa_totals")
+
+    def __init__(self, student, rows=None):
         """
         Initializes the Courses object with a student and an empty list of courses.
 
         Args:
             student (Student): The student associated with these courses.
+            rows (optional): An empty list-like row store to keep the courses in. Defaults to a list.
 
         Raises:
             TypeError: If the provided student is not an instance of the Student class.
@@ -25,7 +57,10 @@ class Courses(object):
         if not isinstance(student, Student):
             raise TypeError(f"Expected a Student object, got {type(student).__name__}")
         self.__student = student  # Store the student object
-        self.__courses = []  # Initialize an empty list to store course details
+        self.__courses = rows if rows is not None else []  # Initialize an empty list to store course details
+        self.__year_totals = {}
+        self.__best_attempts = {}
+        self.__gpa_totals = [0, 0]
 
     def add_course(self, *courses, academic_year: int):
         """
@@ -64,6 +99,44 @@ class Courses(object):
             # Append the course details along with the academic year
             self.__courses.append((course_code, course_name, mark, credit_hours, academic_year))
 
+            # Numeric marks count towards the year's scholarship average, and an E counts as 0
+            year_totals = self.__year_totals.setdefault(academic_year, [0, 0])
+            if isinstance(mark.percentage, (int, float)):
+                year_totals[0] += mark.percentage * credit_hours
+                year_totals[1] += credit_hours
+            elif mark.percentage == "E":
+                year_totals[1] += credit_hours
+
+            self.__record_attempt(course_code, mark, credit_hours)
+
+    def __record_attempt(self, course_code: str, mark: Mark, credit_hours: int) -> None:
+        """
+        Updates the best-attempt index and the running GPA totals with a new attempt at a course.
+        Only a strictly higher mark replaces an earlier attempt at the same base course code.
+        """
+        if mark.percentage in EXCLUDED_FROM_GPA or not isinstance(mark.gpa, (int, float)):
+            return
+        base_code = sys.intern(base_course_code(course_code))  # Shared by every student who took the course
+        best = self.__best_attempts.get(base_code)
+        if best is not None:
+            if mark.get_comparable_percentage() <= best[0].get_comparable_percentage():
+                return
+            self.__gpa_totals[0] -= best[0].gpa * best[1]
+            self.__gpa_totals[1] -= best[1]
+        attempt = (mark, credit_hours)
+        self.__best_attempts[base_code] = _SHARED_ATTEMPTS.setdefault(attempt, attempt)
+        self.__gpa_totals[0] += mark.gpa * credit_hours
+        self.__gpa_totals[1] += credit_hours
+
+    def get_courses(self) -> list:
+        """
+        Returns every course in the order it was added.
+
+        Returns:
+            list: Tuples of (course_code, course_name, mark, credit_hours, academic_year).
+        """
+        return list(self.__courses)
+
     def get_courses_and_marks(self) -> dict:
         """
         Returns a dictionary of courses and their marks.
@@ -83,38 +156,169 @@ class Courses(object):
         Returns:
             str: A message indicating the weighted average and the scholarship amount.
         """
-        total_weighted_marks = 0
-        total_credit_hours = 0
+        return Courses.format_scholarship(self.__scholarship_result(academic_year))
 
-        for _, _, mark, credit_hours, course_year in self.__courses:
-            if course_year == academic_year:
-                if isinstance(mark.percentage, (int, float)):
-                    total_weighted_marks += mark.percentage * credit_hours
-                    total_credit_hours += credit_hours
-                elif mark.percentage == "E":
-                    total_weighted_marks += 0
-                    total_credit_hours += credit_hours
+    def calculate_all_scholarships(self, academic_years=None) -> dict:
+        """
+        Calculates the scholarship of every academic year from the running per-year totals.
 
-        if total_credit_hours == 0:
-            return f"Year {academic_year} - No courses taken in the academic year to calculate scholarship."
-        elif total_credit_hours < 18:
-            return (f"Year {academic_year} - Not enough courses taken in the academic year to calculate scholarship."
-                    f" Minimum year credits required: 18, current credits: {total_credit_hours}"
-                    )
-
-        weighted_average = total_weighted_marks / total_credit_hours
-
-        if 95 <= weighted_average <= 100:
-            return f"Year {academic_year} - Weighted Average: {weighted_average:.2f}, $3000 Scholarship"
-        elif 90 <= weighted_average < 95:
-            return f"Year {academic_year} - Weighted Average: {weighted_average:.2f}, $2000 Scholarship"
-        elif 85 <= weighted_average < 90:
-            return f"Year {academic_year} - Weighted Average: {weighted_average:.2f}, $1000 Scholarship"
-        elif 80 <= weighted_average < 85:
-            return f"Year {academic_year} - Weighted Average: {weighted_average:.2f}, $500 Scholarship"
-        else:
-            return (f"Year {academic_year} - No Scholarship: Weighted Average must be higher than 79%. Current:"
-                    f" {weighted_average:.2f}")
+        Args:
+            academic_years (iterable, optional): The academic years to report. Defaults to every year with courses.
+
+        Returns:
+            dict: Academic year -> scholarship result, see _scholarship_result for its keys.
+        """
+        if academic_years is None:
+            academic_years = sorted(self.__year_totals)
+        return {year: self.__scholarship_result(year) for year in academic_years}
+
+    def __scholarship_result(self, academic_year: int) -> dict:
+        total_weighted_marks, total_credit_hours = self.__year_totals.get(academic_year, (0, 0))
+        return Courses._scholarship_result(academic_year, total_weighted_marks, total_credit_hours)
+
+    @staticmethod
+    def _scholarship_result(academic_year: int, total_weighted_marks: float, total_credit_hours: int) -> dict:
+        """
+        Decides the scholarship for a year from its weighted mark total and credit hours under the default policy,
+        see policies.ScholarshipPolicy.scholarship_result for the result's keys.
+        """
+        return DEFAULT_POLICY.scholarship_result(academic_year, total_weighted_marks, total_credit_hours)
+
+    @staticmethod
+    def format_scholarship(result: dict, label: str = None) -> str:
+        """
+        Formats a scholarship result as a message.
+
+        Args:
+            result (dict): A result from calculate_all_scholarships.
+            label (str, optional): How to name the year. Defaults to "Year <academic_year>".
+
+        Returns:
+            str: A message indicating the weighted average and the scholarship amount.
+        """
+        return DEFAULT_POLICY.format_scholarship(result, label)
+
+    def get_best_attempt(self, course_code: str):
+        """
+        Returns the attempt counted towards the CGPA for a course, ignoring the section number.
+
+        Args:
+            course_code (str): The course code, with or without a section (e.g. 'MATH-1920' or 'MATH-1920-02').
+
+        Returns:
+            tuple | None: The (mark, credit_hours) of the best attempt, or None if no attempt counts.
+        """
+        return self.__best_attempts.get(base_course_code(course_code))
+
+    def what_if(self, pending: list, academic_year: int, gpa_targets: tuple = GPA_TARGETS) -> dict:
+        """
+        Solves for the lowest percentage the pending (not yet graded) courses of a year need to reach each
+        scholarship tier and each cumulative GPA target.
+
+        The percentage is the same for every pending course without a percentage of its own, and is the lowest
+        whole percentage that reaches the target. A year's weighted average grows linearly with it, so each tier
+        is solved in closed form. The CGPA only changes where a pending course moves into the next GPA band or
+        beats the best earlier attempt at the same course (the best-attempt rule, so a retake only counts if it
+        is strictly higher), so only those few percentages are evaluated, in increasing order.
+
+        Each answer is the lowest whole percentage that reaches the target. For a scholarship tier every higher
+        percentage reaches it too; the CGPA can fall again as the percentage rises, when a pending course
+        displaces a better attempt at the same course, so a higher percentage need not reach a CGPA target.
+
+        Args:
+            pending (list): (course_code, credit_hours) or (course_code, credit_hours, percentage) tuples, for
+                            the courses still to be graded in academic_year. A percentage fixes that course's
+                            expected mark, e.g. for a course already known to be passed with 70.
+            academic_year (int): The academic year the pending courses belong to.
+            gpa_targets (tuple, optional): The cumulative GPAs to solve for.
+
+        Returns:
+            dict: academic_year, credit_hours (the year's scholarship credit hours once the pending courses are
+                  graded), scholarships (a dict per tier, highest first, with tier, amount and percentage) and
+                  cumulative_gpa (a dict per target with target and percentage). The percentage is the lowest
+                  one that reaches the target, and None if no percentage up to 100 reaches it.
+
+        Raises:
+            ValueError: If a pending course is malformed or a fixed percentage is not between 0 and 100.
+        """
+        free_credits, fixed_points, fixed_credits, pending_by_base = 0, 0, 0, {}
+        for course in pending:
+            if len(course) not in (2, 3):
+                raise ValueError("Each pending course must be (course_code, credit_hours[, percentage]).")
+            course_code, credit_hours = course[0], course[1]
+            percentage = course[2] if len(course) == 3 else None
+            if credit_hours < 0:
+                raise ValueError("Credit hours must be a positive integer.")
+            if percentage is None:
+                free_credits += credit_hours
+            elif isinstance(percentage, int) and 0 <= percentage <= 100:
+                fixed_points += percentage * credit_hours
+                fixed_credits += credit_hours
+            else:
+                raise ValueError(f"A pending percentage must be a whole number from 0 to 100, got {percentage!r}")
+            pending_by_base.setdefault(base_course_code(course_code), []).append((credit_hours, percentage))
+
+        year_points, year_credits = self.__year_totals.get(academic_year, (0, 0))
+        points = year_points + fixed_points
+        credits = year_credits + fixed_credits + free_credits
+        scholarships = []
+        for minimum_average, amount in SCHOLARSHIP_TIERS:
+            percentage = None
+            if credits >= MINIMUM_YEAR_CREDITS:
+                # (points + x * free_credits) / credits >= minimum_average, solved for x
+                missing = minimum_average * credits - points
+                if missing <= 0:
+                    percentage = 0
+                elif free_credits and math.ceil(missing / free_credits) <= 100:
+                    percentage = math.ceil(missing / free_credits)
+            scholarships.append({"tier": minimum_average, "amount": amount, "percentage": percentage})
+
+        # Between these percentages no pending course changes GPA band or overtakes an attempt, so the CGPA is flat.
+        # Ties keep the earlier attempt: a free course overtakes an earlier fixed one at fixed + 1, and stops being
+        # overtaken by a later fixed one at fixed itself.
+        candidates = set(_GPA_STEPS)
+        for base_code, attempts in pending_by_base.items():
+            best = self.__best_attempts.get(base_code)
+            if best is not None:
+                candidates.add(best[0].get_comparable_percentage() + 1)
+            for _, fixed in attempts:
+                if fixed is not None:
+                    candidates.update((fixed, fixed + 1))
+        candidates = sorted(p for p in candidates if 0 <= p <= 100)
+
+        cumulative = {}  # Percentage -> CGPA, evaluated lazily as the targets need them
+        cumulative_gpa = []
+        for target in gpa_targets:
+            percentage = None
+            for candidate in candidates:
+                if candidate not in cumulative:
+                    cumulative[candidate] = self.__cumulative_gpa_with(pending_by_base, candidate)
+                if cumulative[candidate] >= target - 1e-9:
+                    percentage = candidate
+                    break
+            cumulative_gpa.append({"target": target, "percentage": percentage})
+
+        return {"academic_year": academic_year, "credit_hours": credits, "scholarships": scholarships,
+                "cumulative_gpa": cumulative_gpa}
+
+    def __cumulative_gpa_with(self, pending_by_base: dict, percentage: int) -> float:
+        """
+        Returns the CGPA once the pending courses are graded, those without a fixed percentage at percentage.
+        """
+        total_weighted_gpa, total_credit_hours = self.__gpa_totals
+        for base_code, attempts in pending_by_base.items():
+            best = current = self.__best_attempts.get(base_code)
+            for credit_hours, fixed in attempts:  # In order, exactly as __record_attempt would see them
+                mark = Mark(percentage if fixed is None else fixed)
+                if current is None or mark.get_comparable_percentage() > current[0].get_comparable_percentage():
+                    current = (mark, credit_hours)
+            if current is not best:
+                if best is not None:
+                    total_weighted_gpa -= best[0].gpa * best[1]
+                    total_credit_hours -= best[1]
+                total_weighted_gpa += current[0].gpa * current[1]
+                total_credit_hours += current[1]
+        return round(total_weighted_gpa, 9) / total_credit_hours if total_credit_hours else 0.0
 
     def calculate_cumulative_gpa(self) -> str:
         """
@@ -125,51 +329,33 @@ class Courses(object):
         Returns:
             str: A message indicating the cumulative GPA or a message if no valid courses are found.
         """
-        total_weighted_gpa: float = 0
-        total_credit_hours: float = 0
+        total_weighted_gpa, total_credit_hours = self.__gpa_totals
+        return Courses._cumulative_gpa_message(total_weighted_gpa, total_credit_hours)
 
-        highest_marks = {}
-        for course_code, _, mark, credit_hours, _ in self.__courses:
-            base_course_code = '-'.join(course_code.split('-')[:2])
-            if mark.percentage not in ["DSC", "N/A", "P"]:
-                if (base_course_code not in highest_marks or mark.get_comparable_percentage() >
-                        highest_marks[base_course_code][0].get_comparable_percentage()):
-                    highest_marks[base_course_code] = (mark, credit_hours)
-
-        for mark, credit_hours in highest_marks.values():
-            total_weighted_gpa += mark.gpa * credit_hours
-            total_credit_hours += credit_hours
+    @staticmethod
+    def _cumulative_gpa_message(total_weighted_gpa: float, total_credit_hours: float) -> str:
+        """
+        Builds the cumulative GPA message from the GPA-point total and credit hours of the counted attempts.
 
+        Returns:
+            str: A message indicating the cumulative GPA or a message if no valid courses are found.
+        """
         if total_credit_hours == 0:
             return "No valid courses to calculate GPA."
 
-        cumulative_gpa = total_weighted_gpa / total_credit_hours
+        # Drop the float noise left by the running sums so equal totals always format the same way
+        cumulative_gpa = round(total_weighted_gpa, 9) / total_credit_hours
         return f"Cumulative GPA: {cumulative_gpa:.3f}\nTotal Credit Hours: {total_credit_hours}"
 
+    def write_report(self, stream) -> None:
+        """
+        Writes the courses grouped by academic year, sorted first by subject name prefix (e.g., 'Math', 'CS') and
+        then by subject mark, to a text stream or report_renderer.ReportWriter.
+        """
+        write_courses(stream, self.__courses)
+
     def __str__(self) -> str:
         """
-        Returns a string representation of the Courses object, listing all courses grouped by academic year,
-        sorted first by subject name prefix (e.g., 'Math', 'CS') and then by subject mark.
-        """
-        separator: str = "=" * 100
-        output: str = "Completed Courses by year:\n"
-
-        # Group by year
-        courses_by_year = {}
-        for course_code, course_name, mark, credit_hours, year in self.__courses:
-            courses_by_year.setdefault(year, []).append((course_code, course_name, mark, credit_hours))
-
-        for year in sorted(courses_by_year):
-            output += f"\nYear {year}:\n{separator}\n"
-            sorted_courses = sorted(
-                courses_by_year[year],
-                key=lambda item: (item[0].split('-')[0], -item[2].get_comparable_percentage())
-            )
-            width = len(str(len(sorted_courses)))
-            for i, (code, name, mark, credits) in enumerate(sorted_courses, start=1):
-                output += (
-                    f"{i:>{width}}. Course: {code} ({name}), {mark}, Credit Hours: {credits}\n"
-                )
-            output += separator + "\n"
-
-        return output
\ No newline at end of file
+        Returns a string representation of the Courses object, see write_report.
+        """
+        return render(self.write_report)
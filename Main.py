@@ -1,131 +1,210 @@
-import subprocess
 import sys
 from Student import Student
 from Courses import Courses
 from Mark import Mark
+from grades_parser import parse_grades_file
+from report_renderer import ReportWriter, write_transcript
+from transcript_cache import TranscriptCache
+from transcript_records import collect_records, parse_student_information, records_from_extraction
 import os
-import re
 
 
-def parse_grades_file(file_path: str):
+def map_years_to_academic_years(parsed_courses: dict):
+    """
+    Maps academic years to year1, year2, etc.
     """
-    Parses the grades file and organizes the courses by academic year.
+    sorted_years = sorted(parsed_courses.keys())
+    return {f"year{i+1}": parsed_courses[y] for i, y in enumerate(sorted_years)}
+
+
+def read_student_information(file_path: str):
+    """
+    Reads the student information file and returns the name, student ID, majors and minors.
     """
     with open(file_path, "r", encoding="utf-8") as file:
-        lines = file.readlines()
-
-    parsed_courses_by_year = {}
-    current_academic_year = None
-    academic_year_pattern = r"--- Academic Year (\d{4}-\d{4}) ---"
-    course_pattern = r"^(.*?) \| (.*?) \| (\d+) credits \| Final Grade: (.*)$"
-
-    for line in lines:
-        line = line.strip()
-        match_year = re.match(academic_year_pattern, line)
-        if match_year:
-            current_academic_year = match_year.group(1)
-            parsed_courses_by_year[current_academic_year] = []
-            continue
-
-        match_course = re.match(course_pattern, line)
-        if match_course and current_academic_year:
-            code = match_course.group(1).split()[0]
-            name = match_course.group(2)
-            credits = int(match_course.group(3))
-            grade = match_course.group(4) or "N/A"
-            parsed_courses_by_year[current_academic_year].append(
-                (code, name, grade, credits)
-            )
-
-    return parsed_courses_by_year
+        return parse_student_information(file)
 
 
-def map_years_to_academic_years(parsed_courses: dict):
+def build_student(courses_by_year: dict, name: str, student_id: int, majors: tuple, minors: tuple,
+                  courses_cls=Courses) -> Student:
     """
-    Maps academic years to year1, year2, etc.
+    Builds a Student and its Courses from parsed courses, numbering academic years as year 1, year 2, etc.
+    courses_cls selects the storage backend, e.g. Courses or ColumnarCourses.
     """
-    sorted_years = sorted(parsed_courses.keys())
-    return {f"year{i+1}": parsed_courses[y] for i, y in enumerate(sorted_years)}
+    mapped = map_years_to_academic_years(courses_by_year)
 
+    student = Student(name, student_id, None, majors, minors)
+    courses_obj = courses_cls(student)
+    for ykey, clist in mapped.items():
+        year_idx = int(ykey[len("year"):])
+        marks = Mark.from_many(cgrade for _, _, cgrade, _ in clist)
+        courses_obj.add_course(*((code, cname, mark, creds) for (code, cname, _, creds), mark in zip(clist, marks)),
+                               academic_year=year_idx)
+    student.set_courses(courses_obj)
+    return student
+
+
+def load_transcript(grades_file: str, info_file: str, cache: TranscriptCache = None, courses_cls=Courses) -> dict:
+    """
+    Loads a student's transcript from their grades and information files.
+
+    With a cache, the already-built transcript is returned when neither file has changed, and the text files are
+    only parsed on a miss.
+
+    Returns:
+        dict: name, student_id, majors and minors as read from the information file, academic_years (the
+              academic year spans, year 1 first) and student (the built Student with its courses).
+    """
+    variant = courses_cls.__name__
+    if cache is not None:
+        transcript = cache.load(grades_file, info_file, variant=variant)
+        if transcript is not None:
+            return transcript
+
+    courses_by_year = parse_grades_file(grades_file)
+    name, student_id, majors, minors = read_student_information(info_file)
+    transcript = {
+        "name": name,
+        "student_id": student_id,
+        "majors": majors,
+        "minors": minors,
+        "academic_years": sorted(courses_by_year),
+        "student": build_student(courses_by_year, name, student_id, majors, minors, courses_cls),
+    }
+    if cache is not None:
+        cache.store(grades_file, info_file, value=transcript, variant=variant)
+    return transcript
+
+
+def transcript_from_records(student: dict, courses_by_year: dict, courses_cls=Courses) -> dict:
+    """
+    Builds a transcript straight from an extractor's record stream, as read by transcript_records.read_records.
+
+    Returns:
+        dict: The same transcript load_transcript returns for the equivalent text files.
+    """
+    name, student_id = student["name"].strip(), int(student["student_id"])
+    majors, minors = tuple(student["majors"]), tuple(student["minors"])
+    return {
+        "name": name,
+        "student_id": student_id,
+        "majors": majors,
+        "minors": minors,
+        "academic_years": sorted(courses_by_year),
+        "student": build_student(courses_by_year, name, student_id, majors, minors, courses_cls),
+    }
+
+
+def print_transcript(transcript: dict, stream=None) -> None:
+    """
+    Prints a transcript loaded by load_transcript: the student header, courses by academic year and scholarships.
+
+    Args:
+        transcript (dict): The transcript to print.
+        stream (optional): The text stream to print to. Defaults to stdout.
+    """
+    with ReportWriter(stream or sys.stdout) as writer:
+        write_transcript(writer, transcript)
 
-if __name__ == "__main__":
-    # 1) Ask for browser & credentials
-    browser = input("Which browser would you like to use? (chrome/safari): ").strip().lower()
-    username = input("Enter your username: ").strip()
-    password = input("Enter your password: ").strip()
 
-    print(f"\nUsing browser: {browser}")
-    print("Fetching student information and latest grades...\n")
+def fetch_in_process(browser: str, username: str, password: str) -> dict:
+    """
+    Runs the extractor backend in this process and returns its extraction.
+
+    The backend, and for a browser backend Selenium, is only imported here, once a fetch is really needed.
+    """
+    from extractor_common import BACKENDS, StageTimer, fetch_transcript, load_backend
 
+    timer = StageTimer()
     try:
-        # 2) Launch extractor with the same Python interpreter as this script
-        venv_python = sys.executable
+        return fetch_transcript(load_backend(browser if browser in BACKENDS else "chrome"), username, password, timer)
+    finally:
+        print("Stage timings:\n" + timer.report())
 
-        extractor = "grades_extractor_safari.py" if browser == "safari" else "grades_extractor_chrome.py"
-        subprocess.run([venv_python, extractor, username, password], check=True)
 
-        print("\nSuccessfully fetched student information and grades.\n")
-        print("=" * 100)
-    except subprocess.CalledProcessError as e:
-        print(f"Error fetching grades: {e}")
-        exit(1)
+def fetch_records(browser: str, username: str, password: str) -> tuple:
+    """
+    Fetches the transcript as records, without writing or re-parsing any text file.
 
-    # 3) Parse and display
+    A running extractor service is preferred: its browsers are already started and may still be logged in.
+    Otherwise the extractor runs in this process.
+
+    Returns:
+        tuple: (student, courses_by_year), see transcript_records.collect_records.
+    """
+    from extractor_service import fetch_via_service
+
+    # Only a service that could not be reached, or could not be trusted, falls back to fetching in-process. An error
+    # the service reports (e.g. rejected credentials) is raised, as a second login would only fail again.
+    try:
+        reply = fetch_via_service(username, password, os.getcwd(), browser, records=True)
+    except (OSError, EOFError, ValueError):
+        return collect_records(records_from_extraction(fetch_in_process(browser, username, password)))
+    return collect_records(reply["records"])
+
+
+def fetch_files(browser: str, username: str, password: str, info_file: str, grades_file: str) -> None:
+    """
+    Fetches the transcript into student_information.txt and printer_friendly_grades.txt style files.
+    """
+    from extractor_common import write_transcript_files
+    from extractor_service import fetch_via_service
+
+    # Prefer a running extractor service: its browsers are already started and may still be logged in
+    try:
+        fetch_via_service(username, password, os.getcwd(), browser)
+    except (OSError, EOFError, ValueError):  # No service, an untrusted or broken one; errors it reports are raised
+        write_transcript_files(fetch_in_process(browser, username, password), info_file, grades_file)
+
+
+if __name__ == "__main__":
+    # --from-cache reports on the files of an earlier fetch without loading any extractor or browser module.
+    # --export also writes student_information.txt and printer_friendly_grades.txt, and reads the transcript back
+    # from them as before.
+    # --store also saves the transcript as a new snapshot in transcripts.db (see transcript_store.py).
+    from_cache = "--from-cache" in sys.argv[1:]
+    export = "--export" in sys.argv[1:]
+    store = "--store" in sys.argv[1:]
     grades_file = "printer_friendly_grades.txt"
     info_file   = "student_information.txt"
 
-    try:
-        courses_by_year = parse_grades_file(grades_file)
-        mapped = map_years_to_academic_years(courses_by_year)
-
-        # Read student info
-        with open(info_file, "r", encoding="utf-8") as f:
-            info_lines = f.readlines()
-
-        name, student_id, majors, minors = "Unknown", 0, (), ()
-        for line in info_lines:
-            if line.startswith("Name:"):
-                name = line.split(":", 1)[1].strip()
-            elif line.startswith("Student ID:"):
-                student_id = int(line.split(":", 1)[1].strip())
-            elif line.startswith("Majors:"):
-                majors = tuple(x.strip() for x in line.split(":", 1)[1].split(","))
-            elif line.startswith("Minors:"):
-                minors = tuple(x.strip() for x in line.split(":", 1)[1].split(","))
-
-        # Build objects
-        student = Student(name, student_id, None, majors, minors)
-        courses_obj = Courses(student)
-        for ykey, clist in mapped.items():
-            year_idx = int(ykey[-1])
-            for code, cname, cgrade, creds in clist:
-                mark = Mark(int(cgrade)) if cgrade.isdigit() else Mark(cgrade.upper())
-                courses_obj.add_course((code, cname, mark, creds), academic_year=year_idx)
-        student.set_courses(courses_obj)
-
-        # Print header
-        print(f"Name: {name}")
-        print(f"Student ID: {student_id}")
-        print(f"Major(s): {', '.join(m.title() for m in majors)}")
-        print(f"Minor(s): {', '.join(m.title() for m in minors) or 'None'}")
-        print(courses_obj.calculate_cumulative_gpa())
-        print("=" * 100)
-
-        # Completed Courses by year
-        print("Completed Courses by year:")
-        for idx, span in enumerate(sorted(courses_by_year.keys()), start=1):
-            print(f"\nAcademic Year {span} (year {idx}):")
-            print("=" * 100)
-            for i, (code, cname, cgrade, creds) in enumerate(courses_by_year[span], start=1):
-                mark = Mark(int(cgrade)) if cgrade.isdigit() else Mark(cgrade.upper())
-                print(f"{i}. Course: {code} ({cname}), {mark}, Credit Hours: {creds}")
+    if not from_cache:
+        # 1) Ask for browser & credentials
+        browser = input("Which browser would you like to use? (chrome/safari/http): ").strip().lower()
+        username = input("Enter your username: ").strip()
+        password = input("Enter your password: ").strip()
+
+        print(f"\nUsing browser: {browser}")
+        print("Fetching student information and latest grades...\n")
+
+        try:
+            if export:
+                # 2) Fetch into the text files
+                fetch_files(browser, username, password, info_file, grades_file)
+            else:
+                # 2) Receive the transcript as typed records, with nothing to write or parse in between
+                student_record, courses_by_year = fetch_records(browser, username, password)
+
+            print("\nSuccessfully fetched student information and grades.\n")
             print("=" * 100)
+        except Exception as e:
+            print(f"Error fetching grades: {e}")
+            exit(1)
 
-        # Scholarship Eligibility
-        print("\nScholarship Eligibility:")
-        print("=" * 100)
-        for idx, span in enumerate(sorted(courses_by_year.keys()), start=1):
-            line = courses_obj.calculate_scholarship(idx)
-            print(line.replace(f"Year {idx}", f"Academic Year {span} (year {idx})"))
+    # 3) Parse and display
+    try:
+        if from_cache or export:
+            transcript = load_transcript(grades_file, info_file, TranscriptCache.beside(grades_file))
+        else:
+            transcript = transcript_from_records(student_record, courses_by_year)
+        print_transcript(transcript)
+        if store:
+            from transcript_store import DEFAULT_DATABASE, TranscriptStore
+            try:
+                with TranscriptStore(DEFAULT_DATABASE) as transcript_store:
+                    transcript_store.save(transcript)
+                print(f"\nTranscript saved to {DEFAULT_DATABASE}")
+            except ValueError as e:
+                print(f"\nTranscript not saved: {e}")
     except FileNotFoundError as e:
-        print(f"Error: {e}")
\ No newline at end of file
+        print(f"Error: {e}")
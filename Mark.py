@@ -1,28 +1,69 @@
+from policies import DEFAULT_GRADING_SCALE
+
+# Lookup tables indexed by percentage 0-100, built once at import time from the default (UPEI) grading scale;
+# other scales are applied with policies.evaluate_policies
+_GPA_BY_PERCENTAGE = tuple(DEFAULT_GRADING_SCALE.gpa(p) for p in range(101))
+_LETTER_BY_PERCENTAGE = tuple(DEFAULT_GRADING_SCALE.letter(p) for p in range(101))
+
+# Special (non-numeric) grades as percentage -> (GPA, letter)
+_SPECIAL_GRADES = {"N/A": ("N/A", "N/A"), "P": ("P", "P"), "DSC": ("DSC", "DSC"), "E": (0, "F")}
+
+
 class Mark(object):
     """
     A class to represent a mark (grade) for a course.
 
+    Marks are immutable flyweights: Mark(93) always returns the same shared instance, so a cohort with
+    millions of course rows only holds about a hundred distinct Mark objects.
+
     Attributes:
         percentage (str | int): The percentage grade for the course.
         gpa (float | str): The GPA equivalent of the percentage.
         letter (str): The letter grade equivalent of the percentage.
     """
 
-    def __init__(self, percentage: str | int = "N/A"):
+    __slots__ = ("percentage", "gpa", "letter")
+
+    _instances = {}  # Interned Marks keyed by (class, type of percentage, percentage)
+
+    def __new__(cls, percentage: str | int = "N/A"):
         """
-        Initializes a Mark object.
+        Returns the Mark for a percentage. Marks are immutable, so equal percentages share one instance.
 
         Args:
             percentage (str | int, optional): The percentage grade. Defaults to "N/A".
         """
+        # The type is part of the key so that 1, 1.0 and True do not share an instance
+        key = (cls, type(percentage), percentage)
+        try:
+            return cls._instances[key]
+        except KeyError:
+            pass
+        except TypeError:  # Unhashable percentage, cannot be interned
+            key = None
+
+        self = object.__new__(cls)
         if percentage == "DSC":  # Handle discontinued courses
-            self.percentage = "DSC"
-            self.gpa = "N/A"
-            self.letter = "N/A"
+            gpa, letter = "N/A", "N/A"
         else:
-            self.percentage = percentage
-            self.gpa = Mark.percentage_to_gpa(percentage)
-            self.letter = Mark.percentage_to_letter(percentage)
+            gpa, letter = Mark.percentage_to_gpa(percentage), Mark.percentage_to_letter(percentage)
+        object.__setattr__(self, "percentage", percentage)
+        object.__setattr__(self, "gpa", gpa)
+        object.__setattr__(self, "letter", letter)
+
+        if key is not None:
+            cls._instances[key] = self
+        return self
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} objects are immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} objects are immutable")
+
+    def __reduce__(self):
+        # Rebuild through __new__ so unpickled Marks (e.g. from worker processes) are interned too
+        return type(self), (self.percentage,)
 
     @staticmethod
     def percentage_to_gpa(percentage: str | int) -> float:
@@ -36,37 +77,12 @@ class Mark(object):
             float | str: The GPA equivalent of the percentage.
         """
         if isinstance(percentage, str):
-            if percentage in ["N/A", "P", "DSC"]:
-                return percentage
-            if percentage == "E":  # E is treated as a mark of 0
-                return 0
+            if percentage in _SPECIAL_GRADES:
+                return _SPECIAL_GRADES[percentage][0]
         elif isinstance(percentage, int):  # Numeric grades
-            if 91 <= percentage <= 100:
-                return 4.3
-            elif 85 <= percentage < 91:
-                return 4.0
-            elif 80 <= percentage < 85:
-                return 3.7
-            elif 77 <= percentage < 80:
-                return 3.3
-            elif 74 <= percentage < 77:
-                return 3.0
-            elif 70 <= percentage < 74:
-                return 2.7
-            elif 67 <= percentage < 70:
-                return 2.3
-            elif 64 <= percentage < 67:
-                return 2.0
-            elif 60 <= percentage < 64:
-                return 1.7
-            elif 57 <= percentage < 60:
-                return 1.3
-            elif 54 <= percentage < 57:
-                return 1.0
-            elif 50 <= percentage < 54:
-                return 0.7
-            else:
-                return 0
+            if 0 <= percentage <= 100:
+                return _GPA_BY_PERCENTAGE[percentage]
+            return 0
         return "N/A"  # Default for invalid percentage
 
     @staticmethod
@@ -81,39 +97,53 @@ class Mark(object):
             str: The letter grade equivalent of the percentage.
         """
         if isinstance(percentage, str):
-            if percentage in ["N/A", "P", "DSC"]:
-                return percentage
-            if percentage == "E":
-                return "F"
+            if percentage in _SPECIAL_GRADES:
+                return _SPECIAL_GRADES[percentage][1]
         elif isinstance(percentage, int):  # Numeric grades
-            if 91 <= percentage <= 100:
-                return "A+"
-            elif 85 <= percentage < 91:
-                return "A"
-            elif 80 <= percentage < 85:
-                return "A-"
-            elif 77 <= percentage < 80:
-                return "B+"
-            elif 74 <= percentage < 77:
-                return "B"
-            elif 70 <= percentage < 74:
-                return "B-"
-            elif 67 <= percentage < 70:
-                return "C+"
-            elif 64 <= percentage < 67:
-                return "C"
-            elif 60 <= percentage < 64:
-                return "C-"
-            elif 57 <= percentage < 60:
-                return "D+"
-            elif 54 <= percentage < 57:
-                return "D"
-            elif 50 <= percentage < 54:
-                return "D-"
-            else:
-                return "F"
+            if 0 <= percentage <= 100:
+                return _LETTER_BY_PERCENTAGE[percentage]
+            return "F"
         return "N/A"
 
+    @classmethod
+    def from_grade(cls, grade: str | int) -> "Mark":
+        """
+        Returns the Mark for a raw grade as it appears in a grades file, e.g. "93", "00", "dsc" or "".
+
+        Args:
+            grade (str | int): The raw grade. Digit strings become numeric percentages, blanks become "N/A"
+                               and other text is upper-cased.
+
+        Returns:
+            Mark: The shared Mark instance for the grade.
+        """
+        if isinstance(grade, str):
+            grade = grade.strip()
+            if grade.isdigit():
+                return cls(int(grade))
+            return cls(grade.upper() or "N/A")
+        return cls(grade)
+
+    @classmethod
+    def from_many(cls, grades) -> list:
+        """
+        Converts a whole column of raw grades to Marks, resolving each distinct raw value only once.
+
+        Args:
+            grades (iterable): Raw grades accepted by Mark.from_grade.
+
+        Returns:
+            list: The Mark for each grade, in the same order.
+        """
+        resolved = {}
+        marks = []
+        for grade in grades:
+            mark = resolved.get(grade)
+            if mark is None:
+                mark = resolved[grade] = cls.from_grade(grade)
+            marks.append(mark)
+        return marks
+
     def get_comparable_percentage(self) -> str | int:
         """
         Returns the percentage value for sorting purposes.
@@ -135,3 +165,6 @@ class Mark(object):
             str: The percentage, GPA, and letter grade of the mark.
         """
         return f"MARK: {self.percentage}, GPA: {self.gpa}, LETTER: {self.letter}"
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.percentage!r})"
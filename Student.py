@@ -1,4 +1,7 @@
+import sys
+
 from Courses import Courses  # Import Courses to avoid circular dependencies
+from report_renderer import render, write_student_header
 
 
 class Student:
@@ -6,6 +9,8 @@ class Student:
     A class to represent a student.
     """
 
+    __slots__ = ("__name", "__student_id", "__courses", "__majors", "__minors")
+
     def __init__(self, name: str, student_id: int, courses: Courses,
                  major: str | tuple[str, ...], minor: str | tuple[str, ...] = None):
         """
@@ -14,9 +19,11 @@ class Student:
         self.__name = name
         self.__student_id = student_id
         self.__courses = courses
-        self.__majors = tuple(m.lower() for m in major) if isinstance(major, tuple) else (major.lower(),)
-        self.__minors = tuple(m.lower() for m in minor) if isinstance(minor, tuple) else (
-            minor.lower(),) if minor else ()
+        # Interned, as a cohort names the same few programs over and over
+        self.__majors = tuple(sys.intern(m.lower()) for m in major) if isinstance(major, tuple) else (
+            sys.intern(major.lower()),)
+        self.__minors = tuple(sys.intern(m.lower()) for m in minor) if isinstance(minor, tuple) else (
+            sys.intern(minor.lower()),) if minor else ()
 
     def set_courses(self, courses: Courses) -> None:
         """
@@ -33,21 +40,19 @@ class Student:
         """
         return self.__courses
 
-    def __str__(self) -> str:
+    def write_report(self, stream) -> None:
         """
-        Returns a string representation of the student.
+        Writes the student's name, ID, programs and cumulative GPA followed by their course report to a text stream
+        or report_renderer.ReportWriter.
         """
-        separator = "=" * 100
         majors = ", ".join(m.title() for m in self.__majors)
         minors = ", ".join(m.title() for m in self.__minors) if self.__minors else "None"
-        gpa = self.__courses.calculate_cumulative_gpa()
-
-        return (
-            f"Name: {self.__name}\n"
-            f"Student ID: {self.__student_id}\n"
-            f"Major(s): {majors}\n"
-            f"Minor(s): {minors}\n"
-            f"{gpa}\n"
-            f"{separator}\n"
-            f"{self.__courses}"
-        )
\ No newline at end of file
+        write_student_header(stream, self.__name, self.__student_id, majors, minors,
+                             self.__courses.calculate_cumulative_gpa())
+        self.__courses.write_report(stream)
+
+    def __str__(self) -> str:
+        """
+        Returns a string representation of the student, see write_report.
+        """
+        return render(self.write_report)
@@ -0,0 +1,204 @@
+import argparse
+import csv
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from Courses import Courses
+from Main import load_transcript
+from policies import evaluate_policies, load_policies
+from report_renderer import ReportWriter, render, write_transcript
+from transcript_cache import TranscriptCache, DEFAULT_MAX_BYTES
+
+GRADES_FILE_NAME = "printer_friendly_grades.txt"
+INFO_FILE_NAME = "student_information.txt"
+
+# (cache_dir, max_bytes) -> TranscriptCache, one per worker process, so the cache size is only scanned once per
+# worker instead of once per transcript
+_worker_caches = {}
+
+
+def discover_transcripts(directory: str) -> list[tuple[str, str]]:
+    """
+    Finds every (grades file, information file) pair below a directory.
+
+    Each student is expected in its own sub-directory holding a 'printer_friendly_grades.txt'
+    and a 'student_information.txt', which is the layout the extractors produce.
+    """
+    pairs = []
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()  # Walk in a stable order so results line up between runs
+        if GRADES_FILE_NAME in files and INFO_FILE_NAME in files:
+            pairs.append((os.path.join(root, GRADES_FILE_NAME), os.path.join(root, INFO_FILE_NAME)))
+    return pairs
+
+
+def read_manifest(manifest_path: str) -> list[tuple[str, str]]:
+    """
+    Reads a CSV manifest of 'grades_file,info_file' rows.
+
+    Relative paths are resolved against the manifest's directory. Blank lines and lines starting with '#' are skipped.
+    """
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+    pairs = []
+    with open(manifest_path, "r", encoding="utf-8", newline="") as file:
+        for row in csv.reader(file):
+            if not row or row[0].strip().startswith("#"):
+                continue
+            if len(row) != 2:
+                raise ValueError(f"Manifest rows must be 'grades_file,info_file', got: {row}")
+            grades_file, info_file = (os.path.join(base_dir, p.strip()) for p in row)
+            pairs.append((grades_file, info_file))
+    return pairs
+
+
+def _courses_backend(name: str):
+    """
+    Returns the Courses class for a backend name, importing the NumPy backend only when it is asked for.
+    """
+    if name == "columnar":
+        from ColumnarCourses import ColumnarCourses
+        return ColumnarCourses
+    if name == "compact":
+        from CompactCourses import CompactCourses
+        return CompactCourses
+    return Courses
+
+
+def _worker_cache(cache_dir: str, max_bytes: int) -> TranscriptCache:
+    """
+    Returns this process's TranscriptCache for a cache directory, creating it on first use.
+    """
+    cache = _worker_caches.get((cache_dir, max_bytes))
+    if cache is None:
+        cache = _worker_caches[cache_dir, max_bytes] = TranscriptCache(cache_dir, max_bytes=max_bytes)
+    return cache
+
+
+def evaluate_transcript(pair: tuple[str, str], backend: str = "list", cache_dir: str = None,
+                        cache_max_bytes: int = DEFAULT_MAX_BYTES, report: bool = False, policies: tuple = ()) -> dict:
+    """
+    Parses one student's grade and information files and evaluates their CGPA and yearly scholarships.
+
+    Runs inside a worker process, so it only returns plain data that can be sent back to the parent.
+    With a cache_dir, unchanged transcripts are loaded from the shared parse cache instead of being re-parsed.
+    With report, the result also holds the student's printed report (as Main.py prints it) under 'report'.
+    With policies (policies.ScholarshipPolicy objects), the result also holds the CGPA and the scholarship of each
+    year under every policy, in 'policies'.
+    """
+    grades_file, info_file = pair
+    result = {"grades_file": grades_file, "info_file": info_file}
+    cache = _worker_cache(cache_dir, cache_max_bytes) if cache_dir else None
+    try:
+        transcript = load_transcript(grades_file, info_file, cache, _courses_backend(backend))
+    except (OSError, ValueError) as e:
+        result["error"] = str(e)
+        return result
+
+    courses = transcript["student"].get_courses()
+    spans = transcript["academic_years"]
+    scholarships = courses.calculate_all_scholarships(range(1, len(spans) + 1))
+    result.update({
+        "name": transcript["name"],
+        "student_id": transcript["student_id"],
+        "majors": list(transcript["majors"]),
+        "minors": list(transcript["minors"]),
+        "cumulative_gpa": courses.calculate_cumulative_gpa(),
+        "scholarships": [
+            dict(scholarships[idx], academic_year=span, year=idx, result=Courses.format_scholarship(scholarships[idx]))
+            for idx, span in enumerate(spans, start=1)
+        ],
+    })
+    if policies:
+        evaluated = evaluate_policies(courses, policies, range(1, len(spans) + 1))
+        result["policies"] = {
+            name: {"cumulative_gpa": evaluation["cumulative_gpa"],
+                   "scholarships": [dict(evaluation["scholarships"][idx], academic_year=span, year=idx)
+                                    for idx, span in enumerate(spans, start=1)]}
+            for name, evaluation in evaluated.items()
+        }
+    if report:
+        result["report"] = render(write_transcript, transcript)
+    return result
+
+
+def evaluate_cohort(pairs: list[tuple[str, str]], output_file: str, workers: int = None, chunksize: int = 16,
+                    backend: str = "list", cache_dir: str = None, cache_max_bytes: int = DEFAULT_MAX_BYTES,
+                    report_file: str = None, policies: tuple = ()) -> int:
+    """
+    Evaluates every transcript over a process pool and writes one JSON object per student to the output file.
+
+    Args:
+        pairs (list): The (grades file, information file) pairs to evaluate.
+        output_file (str): The JSON Lines file to write the aggregated results to.
+        workers (int, optional): The number of worker processes. Defaults to the number of CPUs.
+        chunksize (int, optional): The number of transcripts sent to a worker at a time.
+        backend (str, optional): The Courses storage backend, "list", "columnar" or "compact".
+        cache_dir (str, optional): A parse cache directory shared by the workers. No caching if omitted.
+        cache_max_bytes (int, optional): The size the parse cache is trimmed back under.
+        report_file (str, optional): A text file to write every student's printed report to, in the same order
+                                     and separated by blank lines. Each report is written as soon as it arrives.
+        policies (tuple, optional): Extra policies.ScholarshipPolicy objects to evaluate every student under.
+
+    Returns:
+        int: The number of transcripts that could not be evaluated.
+    """
+    failures, reports = 0, 0
+    with ProcessPoolExecutor(max_workers=workers) as pool, open(output_file, "w", encoding="utf-8") as out, \
+            open(report_file or os.devnull, "w", encoding="utf-8") as report_stream, \
+            ReportWriter(report_stream) as report_writer:
+        # map() keeps the input order, so the output file follows the manifest/directory order
+        evaluate = partial(evaluate_transcript, backend=backend, cache_dir=cache_dir, cache_max_bytes=cache_max_bytes,
+                           report=report_file is not None, policies=tuple(policies))
+        for result in pool.map(evaluate, pairs, chunksize=chunksize):
+            if "error" in result:
+                failures += 1
+            report = result.pop("report", None)
+            if report is not None:
+                report_writer.write(("\n" if reports else "") + report)
+                reports += 1
+            out.write(json.dumps(result) + "\n")
+    return failures
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Evaluate CGPA and scholarships for a whole cohort of transcripts.")
+    parser.add_argument("source",
+                        help="A directory of per-student folders, or a CSV manifest of grades/info file pairs")
+    parser.add_argument("-o", "--output", default="cohort_results.jsonl", help="Aggregated JSON Lines result file")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("-c", "--chunksize", type=int, default=16, help="Transcripts handed to a worker at a time")
+    parser.add_argument("-b", "--backend", choices=("list", "columnar", "compact"), default="list",
+                        help="Courses storage backend (columnar requires NumPy; compact saves memory)")
+    parser.add_argument("--report", default=None, help="Also write every student's printed report to this file")
+    parser.add_argument("--policies", default=None,
+                        help="A JSON file of scholarship policies to also evaluate every student under")
+    parser.add_argument("--cache-dir", default=None, help="Parse cache directory reused between runs")
+    parser.add_argument("--cache-max-mb", type=int, default=DEFAULT_MAX_BYTES >> 20,
+                        help="Size the parse cache is trimmed back under, in MiB")
+    args = parser.parse_args(argv)
+
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.chunksize < 1:
+        parser.error("--chunksize must be at least 1")
+    if args.cache_max_mb < 1:
+        parser.error("--cache-max-mb must be at least 1")
+
+    pairs = discover_transcripts(args.source) if os.path.isdir(args.source) else read_manifest(args.source)
+    if not pairs:
+        print(f"No transcripts found in {args.source}.")
+        return 1
+
+    failures = evaluate_cohort(pairs, args.output, workers=args.workers, chunksize=args.chunksize,
+                               backend=args.backend, cache_dir=args.cache_dir,
+                               cache_max_bytes=args.cache_max_mb << 20, report_file=args.report,
+                               policies=tuple(load_policies(args.policies).values()) if args.policies else ())
+    print(f"Evaluated {len(pairs) - failures}/{len(pairs)} transcripts → {args.output}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,174 @@
+"""
+Times the calculator's hot paths on synthetic transcripts and saves the results as JSON.
+
+Usage:
+    python benchmarks/bench_calculator.py [--sizes N ...] [--repeat R] [--output FILE] [--compare BASELINE]
+
+Sizes are course rows; the default runs one student's transcript and 1k to 1M rows (see benchmarks.synthetic).
+Every benchmark is run R times (default 3) and its best time is kept:
+
+    parse_grades_file         parsing a printer_friendly_grades.txt of that many rows
+    Mark.from_many            turning the raw grades into Marks
+    Courses.add_course        loading the rows into a Courses, one call per academic year like Main.py
+    calculate_scholarship     the scholarship of every academic year
+    calculate_cumulative_gpa  the cumulative GPA
+    Courses.__str__           rendering the course report
+    allocate_scholarships     allocating a budget across that many (student, year) scholarship candidates
+
+The results file (default bench_results.json) records the environment and every timing. With --compare, each
+timing is checked against a previous results file, and the exit code is 1 if any got slower than --tolerance
+times its baseline.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import DEFAULT_PROFILE, course_rows, synthetic_candidates, synthetic_cohort, synthetic_rows
+from Courses import Courses
+from extractor_common import write_grades_file
+from grades_parser import parse_grades_file
+from Mark import Mark
+from scholarship_allocation import allocate_scholarships
+from Student import Student
+
+RESULTS_FORMAT_VERSION = 1
+# The rows of one student's transcript, labs and tutorials included
+ONE_STUDENT = len(next(synthetic_cohort(1))["courses"])
+DEFAULT_SIZES = (ONE_STUDENT, 1_000, 10_000, 100_000, 1_000_000)
+
+
+def best_time(repeat: int, setup, run) -> list[float]:
+    """
+    Times run(setup()) repeat times, leaving setup out of the timing.
+
+    Returns:
+        list: The seconds of each run.
+    """
+    timings = []
+    for _ in range(repeat):
+        state = setup()
+        start = time.perf_counter()
+        run(state)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def load_courses(rows: list, marks: list) -> Courses:
+    courses = Courses(Student("Benchmark, Synthetic", 0, None, "Computer Science"))
+    by_year = {}
+    for (code, name, _, credits, year), mark in zip(rows, marks):
+        by_year.setdefault(year, []).append((code, name, mark, credits))
+    for year, year_courses in by_year.items():
+        courses.add_course(*year_courses, academic_year=year)
+    return courses
+
+
+def run_size(size: int, repeat: int, tmp: str) -> list[dict]:
+    """
+    Runs every benchmark at one size.
+
+    Returns:
+        list: A result dict per benchmark: benchmark, rows, seconds (the best run) and runs.
+    """
+    raw_rows = synthetic_rows(size)
+    grades_path = os.path.join(tmp, f"grades_{size}.txt")
+    write_grades_file(raw_rows, grades_path)
+    rows = course_rows(raw_rows)  # Only the rows the parser keeps, as the calculator sees them
+    grades = [grade for _, _, grade, _, _ in rows]
+    marks = Mark.from_many(grades)
+    courses = load_courses(rows, marks)
+    years = sorted({year for *_, year in rows})
+    candidates = synthetic_candidates(size)
+    budget = size * 100  # Funds roughly the top few percent
+
+    benchmarks = (
+        ("parse_grades_file", lambda: grades_path, parse_grades_file),
+        ("Mark.from_many", lambda: grades, Mark.from_many),
+        ("Courses.add_course", lambda: None, lambda _: load_courses(rows, marks)),
+        ("calculate_scholarship", lambda: courses,
+         lambda c: [c.calculate_scholarship(year) for year in years]),
+        ("calculate_cumulative_gpa", lambda: courses, Courses.calculate_cumulative_gpa),
+        ("Courses.__str__", lambda: courses, str),
+        ("allocate_scholarships", lambda: candidates, lambda c: allocate_scholarships(c, budget)),
+    )
+    results = []
+    for name, setup, run in benchmarks:
+        timings = best_time(repeat, setup, run)
+        results.append({"benchmark": name, "rows": size, "seconds": min(timings),
+                        "runs": [round(t, 6) for t in timings]})
+    return results
+
+
+def environment() -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {"created": datetime.datetime.now().isoformat(timespec="seconds"), "commit": commit,
+            "python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()}
+
+
+def compare(results: list, baseline_path: str, tolerance: float) -> list[str]:
+    """
+    Returns a line for every timing that got slower than tolerance times its baseline.
+    """
+    with open(baseline_path, "r", encoding="utf-8") as file:
+        baseline = json.load(file)
+    if baseline.get("version") != RESULTS_FORMAT_VERSION:
+        raise ValueError(f"{baseline_path} has results format {baseline.get('version')}, "
+                         f"expected {RESULTS_FORMAT_VERSION}")
+    previous = {(r["benchmark"], r["rows"]): r["seconds"] for r in baseline["results"]}
+    regressions = []
+    for result in results:
+        before = previous.get((result["benchmark"], result["rows"]))
+        if before and result["seconds"] > before * tolerance:
+            regressions.append(f"  {result['benchmark']} at {result['rows']} rows: {before:.6f} s -> "
+                               f"{result['seconds']:.6f} s ({result['seconds'] / before:.2f}x)")
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Time the calculator on synthetic transcripts.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES), help="Course rows per run")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per benchmark; the best one is kept")
+    parser.add_argument("--output", default="bench_results.json", help="Where to save the results")
+    parser.add_argument("--compare", metavar="BASELINE", help="A previous results file to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=1.25,
+                        help="Slowdown factor over the baseline that counts as a regression")
+    args = parser.parse_args(argv)
+    if args.repeat < 1:
+        parser.error("--repeat must be at least 1")
+
+    results = []
+    print(f"{'rows':>9}  {'benchmark':<26} {'best s':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            for result in run_size(size, args.repeat, tmp):
+                print(f"{size:>9}  {result['benchmark']:<26} {result['seconds']:10.6f}")
+                results.append(result)
+
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump({"version": RESULTS_FORMAT_VERSION, "environment": environment(), "repeat": args.repeat,
+                   "profile": DEFAULT_PROFILE, "results": results}, file, indent=1)
+    print(f"Results saved to {args.output}")
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.tolerance)
+        if regressions:
+            print(f"Slower than {args.tolerance}x {args.compare}:\n" + "\n".join(regressions))
+            return 1
+        print(f"No regressions against {args.compare}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,72 @@
+"""
+Compares the list-backed Courses with the NumPy-backed ColumnarCourses on synthetic transcripts.
+
+Usage:
+    python benchmarks/bench_columnar_courses.py [rows ...]
+
+Every size is checked for identical results before its timings are printed.
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import course_rows, synthetic_rows
+from ColumnarCourses import ColumnarCourses
+from Courses import Courses
+from Mark import Mark
+from Student import Student
+
+
+def calculator_rows(count: int, seed: int = 0) -> list[tuple]:
+    """
+    Generates (course_code, course_name, mark, credit_hours, academic_year) rows with retakes and special grades.
+    """
+    rows = course_rows(synthetic_rows(count, seed))
+    marks = Mark.from_many(grade for _, _, grade, _, _ in rows)
+    return [(code, name, mark, credits, year) for (code, name, _, credits, year), mark in zip(rows, marks)]
+
+
+def load(courses_cls, rows):
+    courses = courses_cls(Student("Benchmark", 0, None, "Computer Science"))
+    for code, name, mark, credits, year in rows:
+        courses.add_course((code, name, mark, credits), academic_year=year)
+    return courses
+
+
+def query(courses, years):
+    return ([courses.calculate_scholarship(year) for year in years],
+            courses.calculate_all_scholarships(),
+            courses.calculate_cumulative_gpa())
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main(sizes):
+    # "first" includes packing the columnar backend's buffered rows; "repeat" is a query on already-packed data
+    print(f"{'rows':>9} {'backend':>9} {'load s':>8} {'first s':>8} {'repeat s':>9} {'str s':>8} {'speedup':>8}")
+    for size in sizes:
+        rows = calculator_rows(size)
+        years = sorted({year for *_, year in rows})
+        baseline = None
+        for courses_cls in (Courses, ColumnarCourses):
+            courses, load_time = timed(load, courses_cls, rows)
+            answers, first_time = timed(query, courses, years)
+            _, query_time = timed(query, courses, years)
+            text, str_time = timed(str, courses)
+            if baseline is None:
+                baseline = (answers, text, query_time)
+            elif (answers, text) != baseline[:2]:
+                raise AssertionError(f"{courses_cls.__name__} disagrees with Courses at {size} rows")
+            speedup = baseline[2] / query_time
+            print(f"{size:>9} {courses_cls.__name__[:9]:>9} {load_time:8.3f} {first_time:8.4f} {query_time:9.4f} "
+                  f"{str_time:8.3f} {speedup:7.1f}x")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [10_000, 100_000, 1_000_000])
@@ -0,0 +1,72 @@
+"""
+Measures the browserless HTTP extractor against the local mock portal.
+
+Usage:
+    python benchmarks/bench_http_extractor.py [rows] [fetches]
+
+The mock portal serves a grades page with the given number of course rows (default 200). Each of the fetches
+(default 50) logs in with a fresh session, reads My Progress and the grades page and writes the two output files,
+exactly as the browser extractors do. Reports the time per fetch and the peak Python memory of a fetch; compare
+with a headless Chrome, which typically needs a few hundred MB and a few seconds per fetch.
+"""
+import contextlib
+import io
+import os
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import grades_extractor_http
+from benchmarks.synthetic import synthetic_rows
+from mock_portal import MockPortal, render_grades_page
+
+
+def synthetic_grades_page(rows: int, seed: int = 0) -> str:
+    courses = [(section, title, credits, grade) for _, section, title, credits, grade in synthetic_rows(rows, seed)]
+    return render_grades_page("Student, Synthetic", "0000001", courses)
+
+
+def fetch_once(base_url: str, output_dir: str) -> None:
+    session = grades_extractor_http.create_driver(base_url)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            grades_extractor_http.login(session, "student", "password")
+            grades_extractor_http.extract(session, os.path.join(output_dir, "student_information.txt"),
+                                          os.path.join(output_dir, "printer_friendly_grades.txt"))
+    finally:
+        session.quit()
+
+
+def main(rows: int, fetches: int) -> None:
+    with MockPortal(("127.0.0.1", 0), pages={"grades.html": synthetic_grades_page(rows)}) as portal, \
+            tempfile.TemporaryDirectory() as tmp:
+        portal.start()
+        fetch_once(portal.base_url, tmp)  # Warm up imports and the server
+
+        tracemalloc.start()
+        fetch_once(portal.base_url, tmp)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        timings = []
+        for _ in range(fetches):
+            start = time.perf_counter()
+            fetch_once(portal.base_url, tmp)
+            timings.append(time.perf_counter() - start)
+        portal.shutdown()
+
+    timings.sort()
+    max_rss_kib = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss  # Includes the mock portal thread
+    print(f"{rows} course rows, {fetches} fetches (login, My Progress, grades page, write files)")
+    print(f"  mean {sum(timings) / len(timings) * 1000:8.1f} ms   p50 {timings[len(timings) // 2] * 1000:8.1f} ms"
+          f"   max {timings[-1] * 1000:8.1f} ms")
+    print(f"  peak Python memory per fetch {peak / (1 << 20):6.2f} MiB, process max RSS {max_rss_kib / 1024:6.1f} MiB")
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:]]
+    main(args[0] if args else 200, args[1] if len(args) > 1 else 50)
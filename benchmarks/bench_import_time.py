@@ -0,0 +1,87 @@
+"""
+Measures the startup cost of Main.py and the extractors with `python -X importtime`.
+
+Usage:
+    python benchmarks/bench_import_time.py [runs]
+
+Each measurement starts a fresh interpreter (default 5 runs, median reported) and sums the cumulative import
+time of the top-level imports that -X importtime reports, minus what a bare interpreter imports at startup.
+Selenium is measured the way the browser extractors used to import it at module level; they now import it only
+when a browser is started, so a report from cached files (`Main.py --from-cache`) never pays for it. The last
+line runs that report end to end and checks that no extractor backend or Selenium module was loaded.
+"""
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TARGETS = (
+    ("import Main", "import Main"),
+    ("import grades_extractor_chrome", "import grades_extractor_chrome"),
+    ("Selenium, as imported up front before", "from selenium import webdriver\n"
+                                              "from selenium.webdriver.common.by import By\n"
+                                              "from selenium.webdriver.support.ui import WebDriverWait\n"
+                                              "from selenium.webdriver.support import expected_conditions\n"
+                                              "from selenium.webdriver.chrome.service import Service\n"
+                                              "from selenium.webdriver.chrome.options import Options"),
+)
+
+# Runs the cached report and lists the modules it should not have needed
+_FROM_CACHE_SCRIPT = """
+import runpy, sys
+sys.argv = ["Main.py", "--from-cache"]
+runpy.run_path("Main.py", run_name="__main__")
+loaded = sorted(m for m in sys.modules if m.startswith(("selenium", "grades_extractor", "extractor_service")))
+print("LOADED:" + ",".join(loaded), file=sys.stderr)
+"""
+
+
+def import_time_ms(code: str) -> float:
+    """
+    Returns the import time of code in a fresh interpreter, in ms, as reported by -X importtime.
+    """
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=REPO, capture_output=True,
+                            text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    total_us = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not name[1:].startswith(" "):  # Top-level imports only; nested ones are part of their cumulative time
+            total_us += int(cumulative)
+    return total_us / 1000
+
+
+def main(runs: int) -> None:
+    baseline = statistics.median(import_time_ms("pass") for _ in range(runs))
+    print(f"Import time, median of {runs} fresh interpreters (python -X importtime), "
+          f"beyond the {baseline:.1f} ms of interpreter startup")
+    for label, code in TARGETS:
+        try:
+            timings = [import_time_ms(code) for _ in range(runs)]
+        except RuntimeError as e:
+            print(f"  {label:<40} skipped: {e}")
+            continue
+        print(f"  {label:<40} {statistics.median(timings) - baseline:8.1f} ms")
+
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, "-c", _FROM_CACHE_SCRIPT], cwd=REPO, capture_output=True,
+                                text=True)
+        timings.append((time.perf_counter() - start) * 1000)
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip())
+    loaded = result.stderr.strip().splitlines()[-1].split(":", 1)[1]
+    print(f"Main.py --from-cache end to end (interpreter start, imports, report): "
+          f"{statistics.median(timings):.1f} ms")
+    print(f"  extractor and Selenium modules loaded: {loaded or 'none'}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
@@ -0,0 +1,88 @@
+"""
+Measures the memory a loaded cohort holds per course row, for each Courses storage backend, with tracemalloc.
+
+Usage:
+    python benchmarks/bench_memory.py [students] [backend ...]
+
+Builds the given number of synthetic students (default 100,000, about 5M course rows) the way Main.py does,
+one backend at a time (default: list and compact, plus columnar when NumPy is installed), and reports the
+memory still allocated once every student is loaded, per course row and per student. Each student's input rows
+are generated and freed while loading, so only what the loaded cohort keeps is counted. The compact backend's
+shared course catalog is counted with it.
+"""
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import course_rows, synthetic_cohort
+from Main import build_student
+
+
+def _backend(name: str):
+    if name == "columnar":
+        from ColumnarCourses import ColumnarCourses
+        return ColumnarCourses
+    if name == "compact":
+        from CompactCourses import CompactCourses
+        return CompactCourses
+    from Courses import Courses
+    return Courses
+
+
+def load_cohort(students: int, courses_cls) -> tuple[list, int]:
+    """
+    Builds every synthetic student with the given Courses backend.
+
+    Returns:
+        tuple: (the Student objects, the number of course rows they hold)
+    """
+    cohort, rows = [], 0
+    for student in synthetic_cohort(students):
+        courses_by_year = {}
+        for code, name, grade, credits, year in course_rows(student["courses"]):
+            courses_by_year.setdefault(year, []).append((code, name, grade, credits))
+        rows += sum(len(courses) for courses in courses_by_year.values())
+        cohort.append(build_student(courses_by_year, student["name"], int(student["student_id"]),
+                                    ("Computer Science",), (), courses_cls))
+    return cohort, rows
+
+
+def measure(students: int, backend: str) -> dict:
+    courses_cls = _backend(backend)  # Imported before tracing, so module objects are not counted
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    cohort, rows = load_cohort(students, courses_cls)
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    held = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    del cohort
+    return {"backend": backend, "rows": rows, "bytes": held, "seconds": elapsed}
+
+
+def main(students: int, backends: list) -> None:
+    print(f"{students} synthetic students, memory held once loaded (tracemalloc)")
+    print(f"{'backend':>9} {'rows':>10} {'MiB':>9} {'B/row':>7} {'B/student':>10} {'load s':>8}")
+    baseline = None
+    for backend in backends:
+        result = measure(students, backend)
+        per_row = result["bytes"] / max(result["rows"], 1)
+        baseline = baseline or per_row
+        print(f"{backend:>9} {result['rows']:>10} {result['bytes'] / (1 << 20):9.1f} {per_row:7.1f} "
+              f"{result['bytes'] / students:10.0f} {result['seconds']:8.2f}  ({baseline / per_row:.1f}x smaller)")
+
+
+if __name__ == "__main__":
+    default_backends = ["list", "compact"]
+    try:
+        import numpy  # noqa: F401
+        default_backends.append("columnar")
+    except ImportError:
+        pass
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000, sys.argv[2:] or default_backends)
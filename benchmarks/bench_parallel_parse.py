@@ -0,0 +1,64 @@
+"""
+Measures how parsing a large multi-student grades export scales with the number of worker processes.
+
+Usage:
+    python benchmarks/bench_parallel_parse.py [size_mb] [max_workers]
+
+A synthetic export of about size_mb megabytes (default 200) is written to a temporary file, parsed serially and
+then with 1..max_workers processes (default: the CPU count). Every parallel parse is checked against the serial one.
+"""
+import itertools
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import synthetic_cohort
+from extractor_common import format_course_line
+from grades_parser import iter_students, iter_students_parallel
+
+
+def write_export(path: str, size_bytes: int, seed: int = 0) -> int:
+    """
+    Writes a concatenated multi-student export of at least size_bytes and returns the number of students.
+    """
+    students = 0
+    with open(path, "w", encoding="utf-8") as file:
+        for student in synthetic_cohort(2 ** 31, seed):
+            if file.tell() >= size_bytes:
+                break
+            students += 1
+            file.write(f"=== Student ID: {student['student_id']} ===\n")
+            for year, rows in itertools.groupby(student["courses"], key=lambda row: row[0]):
+                file.write(f"--- Academic Year {year}-{year + 1} ---\n")
+                file.writelines(format_course_line(row) + "\n" for row in rows)
+                file.write("\n")
+    return students
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = list(fn(*args, **kwargs))
+    return result, time.perf_counter() - start
+
+
+def main(size_mb: int, max_workers: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "export.txt")
+        students = write_export(path, size_mb << 20)
+        print(f"{os.path.getsize(path) / (1 << 20):.0f} MiB export, {students} students, {os.cpu_count()} CPUs")
+
+        expected, serial = timed(iter_students, path)
+        print(f"{'serial':>10} {serial:8.2f} s")
+        for workers in range(1, max_workers + 1):
+            students_parsed, elapsed = timed(iter_students_parallel, path, workers=workers)
+            if students_parsed != expected:
+                raise AssertionError(f"Parallel parse with {workers} workers disagrees with the serial parse")
+            print(f"{workers:>3} worker{'s' if workers > 1 else ' '} {elapsed:8.2f} s  {serial / elapsed:5.2f}x")
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:]]
+    main(args[0] if args else 200, args[1] if len(args) > 1 else os.cpu_count() or 1)
@@ -0,0 +1,149 @@
+"""
+Generates realistic synthetic transcripts for the benchmarks.
+
+A synthetic student looks like an extraction from the portal (see the extractors' fetch_records), so it can be
+written as printer_friendly_grades.txt and student_information.txt with the extractors' own writer, or turned into
+course rows for Courses directly. Every transcript has fall and winter terms, and its courses come with 0-credit
+labs and tutorials with blank grades, retakes of earlier courses, DSC/P/E grades and blank (in progress) grades.
+All generators are deterministic for a given seed.
+"""
+import os
+import random
+
+from extractor_common import write_transcript_files
+from transcript_records import records_from_extraction
+
+SUBJECTS = ("CS", "MATH", "STAT", "PHIL", "CHEM", "ENV", "UPEI", "POLS", "BIOL", "ECON")
+PROGRAMS = ("Computer Science", "Mathematics", "Statistics", "Philosophy", "Chemistry", "Biology", "Economics")
+SPECIAL_GRADES = ("DSC", "P", "E")
+
+# The shape of a generated transcript. Rates are per course row.
+DEFAULT_PROFILE = {
+    "years": 4,
+    "courses_per_term": 5,
+    "retake_rate": 0.05,  # Courses that repeat an earlier course of the student, in a new section
+    "lab_rate": 0.3,  # Courses followed by a 0-credit lab or tutorial row with a blank grade
+    "special_rate": 0.03,  # Courses graded DSC, P or E
+    "blank_rate": 0.02,  # Courses without a grade yet
+}
+
+
+def synthetic_student(rng: random.Random, student_number: int, start_year: int = 2020, **profile) -> dict:
+    """
+    Generates one student.
+
+    Args:
+        rng (random.Random): The source of randomness.
+        student_number (int): Used for the name and the student ID.
+        start_year (int): The calendar year of the first fall term.
+        **profile: Overrides for DEFAULT_PROFILE.
+
+    Returns:
+        dict: name, student_id, information and courses, with courses as the extractors' (academic_year, section,
+              title, credits, grade) rows.
+    """
+    profile = {**DEFAULT_PROFILE, **profile}
+    rows, taken = [], []
+    for year in range(start_year, start_year + profile["years"]):
+        for start, end in ((f"{year}-09-06", f"{year}-12-22"), (f"{year + 1}-01-08", f"{year + 1}-04-25")):
+            for _ in range(profile["courses_per_term"]):
+                if taken and rng.random() < profile["retake_rate"]:
+                    subject, number = rng.choice(taken)
+                else:
+                    subject, number = rng.choice(SUBJECTS), rng.randrange(1000, 5000, 10)
+                    taken.append((subject, number))
+
+                chance = rng.random()
+                if chance < profile["blank_rate"]:
+                    grade = ""
+                elif chance < profile["blank_rate"] + profile["special_rate"]:
+                    grade = rng.choice(SPECIAL_GRADES)
+                else:
+                    grade = str(min(100, max(0, round(rng.gauss(78, 12)))))
+                credits = "4" if rng.random() < 0.15 else "3"
+                rows.append((year, f"{subject}-{number}-{rng.randrange(1, 6):02d} {start} - {end}",
+                             f"{subject} {number}", credits, grade))
+
+                if rng.random() < profile["lab_rate"]:
+                    kind, title = rng.choice((("L", "Lab"), ("T", "Tutorial")))
+                    rows.append((year, f"{subject}-{number}{kind}-{rng.randrange(1, 9):02d} {start} - {end}",
+                                 f"{subject} {number} {title}", "0", ""))
+
+    majors = rng.sample(PROGRAMS, rng.choice((1, 1, 2)))
+    minors = rng.sample([p for p in PROGRAMS if p not in majors], rng.choice((0, 0, 1)))
+    information = (f"Cumulative GPA: {rng.uniform(2.0, 4.3):.3f}\n"
+                   f"Majors: {', '.join(majors)}\n"
+                   f"Minors: {', '.join(minors) or 'None'}")
+    return {"name": f"Student, Synthetic {student_number}", "student_id": f"{student_number:07d}",
+            "information": information, "courses": rows}
+
+
+def synthetic_cohort(students: int, seed: int = 0, **profile):
+    """
+    Yields synthetic students, see synthetic_student. Start years vary between 2016 and 2020.
+    """
+    rng = random.Random(seed)
+    for number in range(1, students + 1):
+        yield synthetic_student(rng, number, rng.randint(2016, 2020), **profile)
+
+
+def synthetic_rows(count: int, seed: int = 0, **profile) -> list[tuple]:
+    """
+    Returns exactly count course rows, (academic_year, section, title, credits, grade), taken from consecutive
+    synthetic students.
+    """
+    rows = []
+    for student in synthetic_cohort(count, seed, **profile):  # Every student has at least one row
+        rows.extend(student["courses"])
+        if len(rows) >= count:
+            break
+    return rows[:count]
+
+
+def synthetic_candidates(count: int, seed: int = 0) -> list[tuple]:
+    """
+    Returns count scholarship candidates, (student_id, academic_year, weighted_average), two academic years per
+    student. Averages are weighted over 6 to 10 courses of 3 credit hours, so ties are as common as in a real
+    cohort.
+    """
+    rng = random.Random(seed)
+    candidates = []
+    for index in range(count):
+        year = 2020 + index % 2
+        courses = rng.randint(6, 10)
+        average = sum(min(100, max(0, round(rng.gauss(78, 12)))) for _ in range(courses)) / courses
+        candidates.append((index // 2 + 1, f"{year}-{year + 1}", average))
+    return candidates
+
+
+def course_rows(rows: list) -> list[tuple]:
+    """
+    Converts extractor rows the way the calculator reads them back from a grades file (see
+    transcript_records.records_from_extraction), numbering academic years from 1.
+
+    Returns:
+        list: (course_code, course_name, grade, credit_hours, academic_year) tuples, with the raw grade string
+              ('N/A' when blank), ready for Mark.from_many and Courses.add_course.
+    """
+    extraction = {"name": "", "student_id": "", "information": "", "courses": rows}
+    courses = [record for record in records_from_extraction(extraction) if record["type"] == "course"]
+    year_numbers = {year: number for number, year in enumerate(sorted({c["academic_year"] for c in courses}), 1)}
+    return [(c["code"], c["name"], c["grade"], c["credits"], year_numbers[c["academic_year"]]) for c in courses]
+
+
+def write_cohort(directory: str, students: int, seed: int = 0, **profile) -> list[tuple[str, str]]:
+    """
+    Writes one folder per synthetic student below directory, in the layout the extractors and batch_evaluator.py
+    use.
+
+    Returns:
+        list: The (grades file, information file) pair of each student.
+    """
+    pairs = []
+    for student in synthetic_cohort(students, seed, **profile):
+        folder = os.path.join(directory, student["student_id"])
+        os.makedirs(folder, exist_ok=True)
+        pair = (os.path.join(folder, "printer_friendly_grades.txt"), os.path.join(folder, "student_information.txt"))
+        write_transcript_files(student, pair[1], pair[0])
+        pairs.append(pair)
+    return pairs
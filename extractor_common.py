@@ -0,0 +1,614 @@
+import contextlib
+import importlib
+import json
+import os
+import re
+import sys
+import time
+from contextlib import contextmanager
+
+from term_sync import TermSync
+
+# Selenium is imported inside the browser helpers (and inside the browser backends' functions), so importing this
+# module or a backend stays cheap and the browserless HTTP backend does not need Selenium installed at all
+
+# Extractor module of each backend, imported on first use by load_backend
+BACKENDS = {"chrome": "grades_extractor_chrome", "safari": "grades_extractor_safari", "http": "grades_extractor_http"}
+
+# Seconds each extraction stage may wait for the portal before giving up. Tune per stage when the portal is slow.
+STAGE_TIMEOUTS = {
+    "login": 15,
+    "my_progress": 10,
+    "grades_page": 10,
+    "term_selection": 10,
+    "print_tab": 10,
+    "table_scrape": 10,
+}
+
+# Lean mode: the browser skips what the extractors never read. Enable it with EXTRACTOR_LEAN=1 or an extractor's
+# --lean flag. The browser backends apply what their browser supports, see their create_driver.
+LEAN_PROFILE = {
+    "enabled": os.environ.get("EXTRACTOR_LEAN", "") not in ("", "0"),
+    # URL patterns the browser does not request at all. Stylesheets stay: some waits check element visibility.
+    "blocked_urls": [
+        "*.png", "*.jpg", "*.jpeg", "*.gif", "*.svg", "*.ico", "*.webp",
+        "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+        "*.mp4", "*.webm", "*.mp3",
+        "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+    ],
+}
+
+
+class StageTimer(object):
+    """
+    Records how long each stage of an extraction takes.
+
+    Attributes:
+        __durations (dict): Stage name -> seconds, in the order the stages ran.
+        __pages (dict): Page name -> {"loads", "bytes", "ready_ms"} summed over the page's loads, see add_page.
+    """
+
+    def __init__(self):
+        self.__durations = {}
+        self.__pages = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        """
+        Times the enclosed block as the named stage. A stage that runs more than once accumulates its time.
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.__durations[name] = self.__durations.get(name, 0.0) + time.perf_counter() - started
+
+    def as_dict(self) -> dict:
+        """
+        Returns stage name -> seconds, rounded to milliseconds.
+        """
+        return {name: round(seconds, 3) for name, seconds in self.__durations.items()}
+
+    def report(self) -> str:
+        """
+        Returns a small table of the stage timings and their total.
+        """
+        width = max([len("total")] + [len(name) for name in self.__durations])
+        lines = [f"{name:<{width}}  {seconds:7.3f} s" for name, seconds in self.__durations.items()]
+        lines.append(f"{'total':<{width}}  {sum(self.__durations.values()):7.3f} s")
+        return "\n".join(lines)
+
+    def add_page(self, name: str, stats: dict) -> None:
+        """
+        Records one load of a page, as measured by record_page_load. A page loaded more than once accumulates.
+        """
+        page = self.__pages.setdefault(name, {"loads": 0, "bytes": 0, "ready_ms": 0.0})
+        page["loads"] += 1
+        page["bytes"] += stats["bytes"]
+        page["ready_ms"] += stats["ready_ms"]
+
+    def page_report(self) -> str:
+        """
+        Returns a small table of the bytes transferred and the load time of each page, or '' if none was recorded.
+        """
+        if not self.__pages:
+            return ""
+        width = max([len("total")] + [len(name) for name in self.__pages])
+        lines = [f"{'page':<{width}}  loads       KiB   ready ms"]
+        for name, page in self.__pages.items():
+            lines.append(f"{name:<{width}}  {page['loads']:5}  {page['bytes'] / 1024:8.1f}  {page['ready_ms']:9.0f}")
+        lines.append(f"{'total':<{width}}  {sum(p['loads'] for p in self.__pages.values()):5}  "
+                     f"{sum(p['bytes'] for p in self.__pages.values()) / 1024:8.1f}  "
+                     f"{sum(p['ready_ms'] for p in self.__pages.values()):9.0f}")
+        return "\n".join(lines)
+
+
+def wait_for_page_load(driver, timeout: float):
+    """
+    Waits until the current document has finished loading. In lean mode, a parsed document is enough: like the
+    'eager' page load strategy, it does not wait for images and other subresources.
+    """
+    from selenium.webdriver.support.ui import WebDriverWait
+    ready = ("interactive", "complete") if LEAN_PROFILE["enabled"] else ("complete",)
+    WebDriverWait(driver, timeout).until(lambda d: d.execute_script("return document.readyState") in ready)
+
+
+# Sums what the current page and its subresources transferred over the network (0 for cached responses) and reads
+# how long the document took until DOMContentLoaded, from the Navigation and Resource Timing APIs
+_PAGE_LOAD_SCRIPT = """
+const navigation = performance.getEntriesByType("navigation")[0];
+const resources = performance.getEntriesByType("resource");
+let bytes = navigation ? navigation.transferSize || 0 : 0;
+for (const entry of resources) bytes += entry.transferSize || 0;
+return JSON.stringify({
+    bytes: bytes,
+    resources: resources.length,
+    ready_ms: navigation ? navigation.domContentLoadedEventEnd - navigation.startTime : 0,
+});
+"""
+
+
+def record_page_load(driver, timer: StageTimer, name: str) -> dict:
+    """
+    Measures the current page with the Performance API and records it on the timer under name.
+
+    Returns:
+        dict: bytes (transferred), resources (the number of subresources) and ready_ms (until DOMContentLoaded).
+    """
+    stats = json.loads(driver.execute_script(_PAGE_LOAD_SCRIPT))
+    timer.add_page(name, stats)
+    return stats
+
+
+# Tells whether the portal has left the login page ("left"), has shown the login page again with its error banner
+# ("error:<banner text>"), or neither yet (null)
+_LOGIN_STATE_SCRIPT = """
+if (!location.pathname.includes("/Account/Login")) return "left";
+for (const alert of document.querySelectorAll(".esg-alert--error")) {
+    const text = alert.innerText.trim();
+    if (text) return "error:" + text;
+}
+return null;
+"""
+
+
+def wait_for_login(driver, timeout: float):
+    """
+    Waits until the portal has left the login page after the credentials were submitted.
+
+    Raises:
+        PermissionError: If the portal shows the login page again with its error banner, i.e. it rejected the
+                         credentials, as the HTTP backend reports it.
+        TimeoutException: If the portal neither leaves the login page nor shows an error in time.
+    """
+    from selenium.webdriver.support.ui import WebDriverWait
+    state = WebDriverWait(driver, timeout).until(lambda d: d.execute_script(_LOGIN_STATE_SCRIPT))
+    if state.startswith("error:"):
+        raise PermissionError(f"The portal rejected the username or password: {state[len('error:'):]}")
+    wait_for_page_load(driver, timeout)
+
+
+def login_with_form(driver, login_url: str, username: str, password: str, timer: StageTimer = None):
+    """
+    Logs in to Colleague Self-Service through its login form and waits until the portal has accepted the
+    credentials. Shared by the browser backends.
+
+    Raises:
+        PermissionError: If the portal rejects the credentials.
+    """
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.webdriver.support.ui import WebDriverWait
+
+    timer = timer or StageTimer()
+    with timer.stage("login"):
+        timeout = STAGE_TIMEOUTS["login"]
+        driver.get(login_url)
+        user_field = WebDriverWait(driver, timeout).until(EC.element_to_be_clickable((By.ID, "UserName")))
+        password_field = WebDriverWait(driver, timeout).until(EC.element_to_be_clickable((By.ID, "Password")))
+        record_page_load(driver, timer, "login")
+        user_field.clear()
+        password_field.clear()
+        user_field.send_keys(username)
+        password_field.send_keys(password)
+        try:
+            button = driver.find_element(By.XPATH, "//button[@type='submit']")
+            driver.execute_script("arguments[0].click();", button)
+        except Exception:
+            password_field.submit()
+        wait_for_login(driver, timeout)
+        record_page_load(driver, timer, "home")
+    print("Login submitted.")
+
+
+def read_progress_information(driver, my_progress_url: str | None, timer: StageTimer) -> str:
+    """
+    Opens the My Progress page and filters its 'at a glance' panel. Shared by the browser backends.
+
+    With my_progress_url None, the page is expected to be open (or loading) in the current window already, e.g. in
+    a BackgroundTab.
+
+    If the panel cannot be read, the full page is saved to 'debug_full_page.txt' for inspection before the error
+    is raised again.
+
+    Returns:
+        str: The filtered lines, as written to student_information.txt.
+    """
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.webdriver.support.ui import WebDriverWait
+
+    with timer.stage("my_progress"):
+        if my_progress_url is not None:
+            driver.get(my_progress_url)
+        try:
+            panel = WebDriverWait(driver, STAGE_TIMEOUTS["my_progress"]).until(
+                EC.presence_of_element_located((By.XPATH, "//*[contains(@id, 'programs-ataglance')]/div[2]/div[1]"))
+            )
+            print("Navigated to My Progress page.")
+            record_page_load(driver, timer, "my_progress")
+            information = filter_progress_text(panel.text)
+        except Exception as e:
+            print(f"Error during extraction: {e}")
+            with open("debug_full_page.txt", "w", encoding="utf-8") as debug_file:
+                debug_file.write(driver.page_source)
+            print("Saved full page content to 'debug_full_page.txt' for inspection.")
+            raise
+    print("Filtered the My Progress information.")
+    return information
+
+
+class BackgroundTab(object):
+    """
+    A page loading in a second tab of the same browser, and so the same login session, while the extractor keeps
+    working in the current tab.
+
+    The tab is opened and pointed at its URL without waiting for the page; the browser loads it alongside whatever
+    the other tab does. read() switches to it once its content is needed, then closes it.
+
+    Attributes:
+        handle (str): The window handle of the tab.
+        __result: What read() returned, once it ran.
+    """
+
+    def __init__(self, driver, url: str):
+        self.__driver = driver
+        opener = driver.current_window_handle
+        driver.switch_to.new_window("tab")
+        self.handle = driver.current_window_handle
+        # Assigning the location returns at once, unlike driver.get(), which waits for the page to load
+        driver.execute_script("window.location.href = arguments[0];", url)
+        driver.switch_to.window(opener)
+        self.__done = False
+        self.__result = None
+
+    def read(self, reader):
+        """
+        Runs reader(driver) on the tab, closes the tab and switches back to the window that was current.
+
+        Later calls return the first call's result without touching the browser, so callers that may or may not
+        have read the tab yet can simply call it again.
+        """
+        if self.__done:
+            return self.__result
+        driver = self.__driver
+        current = driver.current_window_handle
+        driver.switch_to.window(self.handle)
+        try:
+            self.__result = reader(driver)
+            self.__done = True
+        finally:
+            driver.close()
+            driver.switch_to.window(current)
+        return self.__result
+
+
+# Reads the header fields and every row of a table in one round trip. Each node is found with the same XPath the
+# element-by-element scrape used, and its innerText is what WebElement.text would have returned.
+_SCRAPE_PAGE_SCRIPT = """
+const [rowXPath, fieldXPaths] = arguments;
+const first = xpath => document.evaluate(xpath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null)
+    .singleNodeValue;
+const fields = {};
+for (const [name, xpath] of Object.entries(fieldXPaths)) {
+    const node = first(xpath);
+    fields[name] = node ? node.innerText : null;
+}
+const rows = [];
+if (rowXPath) {
+    const found = document.evaluate(rowXPath, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+    for (let i = 0; i < found.snapshotLength; i++) {
+        rows.push(Array.from(found.snapshotItem(i).querySelectorAll("td"), cell => cell.innerText));
+    }
+}
+return JSON.stringify({fields: fields, rows: rows});
+"""
+
+# Clicks every matching element in one round trip, skipping checkboxes that are already ticked if asked to. Works on
+# checkboxes and on labels of checkboxes, whose checkbox is the label's control.
+_CLICK_ALL_SCRIPT = """
+const [selector, skipChecked] = arguments;
+const clicked = [];
+for (const element of document.querySelectorAll(selector)) {
+    if (skipChecked && (element.control || element).checked) continue;
+    try {
+        element.scrollIntoView(true);
+        element.click();
+    } catch (e) {
+        continue;
+    }
+    const label = element.labels && element.labels.length ? element.labels[0] : element;
+    clicked.push(label.innerText);
+}
+return JSON.stringify(clicked);
+"""
+
+
+# Ticks exactly the wanted terms in one round trip and returns every term label. Works on checkboxes and on labels
+# of checkboxes; with wanted = null it only reads the labels.
+_SELECT_TERMS_SCRIPT = """
+const [selector, wanted] = arguments;
+const labels = [];
+for (const element of document.querySelectorAll(selector)) {
+    const label = element.labels && element.labels.length ? element.labels[0] : element;
+    const text = label.innerText.trim().replace(/\\s+/g, " ");
+    labels.push(text);
+    if (wanted === null) continue;
+    const box = element.control || element;
+    if (box.checked !== wanted.includes(text)) {
+        element.scrollIntoView(true);
+        element.click();
+    }
+}
+return JSON.stringify(labels);
+"""
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.split())
+
+
+def scrape_page(driver, row_xpath: str = None, **field_xpaths: str) -> tuple:
+    """
+    Reads named text fields and the cells of every table row of the current page with a single script call.
+
+    Scrape time no longer grows with the number of rows times the WebDriver latency, as it did when every row and
+    cell was a separate find_elements or .text round trip.
+
+    Args:
+        driver (WebDriver): The browser, on the page to scrape.
+        row_xpath (str, optional): XPath of the table rows. The 'td' cells of each row are returned.
+        **field_xpaths (str): Field name -> XPath of the element whose text is wanted.
+
+    Returns:
+        tuple: (fields, rows), where fields maps each field name to its whitespace-normalized text and rows is a
+               list of the whitespace-normalized cell texts of each row.
+
+    Raises:
+        NoSuchElementException: If a field's element is not on the page.
+    """
+    from selenium.common.exceptions import NoSuchElementException
+    page = json.loads(driver.execute_script(_SCRAPE_PAGE_SCRIPT, row_xpath, field_xpaths))
+    fields = {}
+    for name, text in page["fields"].items():
+        if text is None:
+            raise NoSuchElementException(f"No element for {name!r} at {field_xpaths[name]}")
+        fields[name] = _normalize(text)
+    return fields, [[_normalize(cell) for cell in row] for row in page["rows"]]
+
+
+def click_all(driver, css_selector: str, skip_checked: bool = False) -> list[str]:
+    """
+    Clicks every element matching a CSS selector with a single script call.
+
+    Args:
+        driver (WebDriver): The browser.
+        css_selector (str): The elements to click, e.g. the term labels of the grades page.
+        skip_checked (bool, optional): Leave checkboxes that are already ticked alone, also when the selector matches
+                                       their labels.
+
+    Returns:
+        list: The label text of each clicked element.
+    """
+    return json.loads(driver.execute_script(_CLICK_ALL_SCRIPT, css_selector, skip_checked))
+
+
+def select_terms(driver, css_selector: str, wanted: list = None) -> list[str]:
+    """
+    Ticks exactly the wanted terms and unticks the others, with a single script call.
+
+    Args:
+        driver (WebDriver): The browser, on the page with the term checkboxes.
+        css_selector (str): The term checkboxes, or the labels of the term checkboxes.
+        wanted (list, optional): The labels of the terms to tick. If None, nothing is clicked.
+
+    Returns:
+        list: The whitespace-normalized label of every term, in page order.
+    """
+    return json.loads(driver.execute_script(_SELECT_TERMS_SCRIPT, css_selector, wanted))
+
+
+def sync_terms(driver, sync, css_selector: str, print_selected) -> int:
+    """
+    Prints and stores, one term at a time, only the terms a TermSync does not have final grades for.
+
+    Args:
+        driver (WebDriver): The browser, on the page with the term checkboxes.
+        sync (TermSync): The terms captured by earlier syncs. Updated in place, but not saved.
+        css_selector (str): The term checkboxes, or their labels.
+        print_selected (callable): Prints the ticked terms and returns their scraped course rows.
+
+    Returns:
+        int: The number of terms whose courses changed.
+    """
+    labels = select_terms(driver, css_selector)
+    to_fetch = sync.terms_to_fetch(labels)
+    print(f"{len(labels) - len(to_fetch)} of {len(labels)} terms are final and already stored; "
+          f"fetching {len(to_fetch)}.")
+    changed = 0
+    for label in to_fetch:
+        select_terms(driver, css_selector, [label])
+        if sync.update(label, print_selected()):
+            changed += 1
+    sync.retain(labels)
+    return changed
+
+
+def infer_academic_year(start_date: str) -> int:
+    """
+    Infers the academic year from a 'YYYY-MM-DD' date: the year it started in, academic years starting in September.
+    """
+    year, month = map(int, start_date.split("-")[:2])
+    if month < 9:
+        year -= 1
+    return year
+
+
+def filter_progress_text(text: str) -> str:
+    """
+    Filters the text of the My Progress 'at a glance' panel down to the lines student_information.txt holds.
+
+    Returns:
+        str: The 'Cumulative GPA:', 'Majors:' and 'Minors:' lines, joined by newlines.
+    """
+    lines = [ln.strip() for ln in text.splitlines() if ln.strip()]
+
+    filtered, majors, current = [], [], None
+    has_minors = False
+    for line in lines:
+        if line.endswith(":"):
+            if current and not current.startswith("Majors:"):
+                filtered.append(current)
+            current = line
+        else:
+            if current and current.startswith("Majors:"):
+                majors.append(line)
+            elif current:
+                current += f" {line}"
+            else:
+                filtered.append(line)
+        if line.startswith("Minors:"):
+            has_minors = True
+
+    if majors:
+        filtered.append(f"Majors: {', '.join(majors)}")
+    if not has_minors:
+        filtered.append("Minors: None")
+
+    final = []
+    for ln in filtered:
+        if ln.startswith("Cumulative GPA:"):
+            m = re.search(r"Cumulative GPA: ([0-9.]+)", ln)
+            if m:
+                final.append(f"Cumulative GPA: {m.group(1)}")
+        elif ln.startswith("Majors:") or ln.startswith("Minors:"):
+            final.append(ln)
+    return "\n".join(final)
+
+
+def format_course_line(row: tuple) -> str:
+    """
+    Formats a scraped course row as a printer_friendly_grades.txt line.
+
+    Args:
+        row (tuple): (academic_year, section, title, credits, grade) as scraped, academic_year being the starting
+                     year (int) and the others the cell texts.
+    """
+    _, section, title, credits, grade = row
+    return f"{section} | {title} | {credits} credits | Final Grade: {grade}"
+
+
+def write_grades_file(rows: list, grades_path: str) -> None:
+    """
+    Writes scraped course rows grouped under '--- Academic Year YYYY-YYYY ---' headers.
+
+    Args:
+        rows (list): (academic_year, section, title, credits, grade) tuples, see format_course_line.
+        grades_path (str): The grades file to write.
+    """
+    rows = sorted(rows, key=lambda x: x[0])
+    with open(grades_path, "w", encoding="utf-8") as f:
+        cur_year = None
+        for row in rows:
+            yr = row[0]
+            if yr != cur_year:
+                if cur_year is not None:
+                    f.write("\n")
+                f.write(f"--- Academic Year {yr}-{yr+1} ---\n")
+                cur_year = yr
+            f.write(format_course_line(row) + "\n")
+
+
+def write_transcript_files(extraction: dict, info_path: str, grades_path: str) -> None:
+    """
+    Exports an extraction as the student_information.txt and printer_friendly_grades.txt text files.
+
+    Args:
+        extraction (dict): name, student_id, information (the filtered My Progress lines) and courses (the
+                           scraped course rows), as returned by the extractors' fetch_records.
+    """
+    with open(info_path, "w", encoding="utf-8") as info_file:
+        info_file.write(f"Name: {extraction['name']}\nStudent ID: {extraction['student_id']}\n"
+                        f"{extraction['information']}")
+    write_grades_file(extraction["courses"], grades_path)
+
+
+def load_backend(browser: str):
+    """
+    Imports an extractor backend by name ('chrome', 'safari' or 'http'). Importing a browser backend does not import
+    Selenium yet; that only happens once it starts a browser.
+
+    Raises:
+        ValueError: If there is no such backend.
+    """
+    if browser not in BACKENDS:
+        raise ValueError(f"browser must be one of {', '.join(BACKENDS)}, got {browser!r}")
+    return importlib.import_module(BACKENDS[browser])
+
+
+def fetch_transcript(backend, username: str, password: str, timer: StageTimer = None, sync=None) -> dict:
+    """
+    Fetches a student's transcript in-process: starts the backend's browser (or session), logs in, fetches the
+    records and quits again.
+
+    Args:
+        backend (module): An extractor backend, see load_backend.
+        sync (TermSync, optional): Only print the terms changed since the last sync (browser backends only).
+
+    Returns:
+        dict: The extraction, as returned by the backend's fetch_records.
+    """
+    timer = timer or StageTimer()
+    kwargs = {"sync": sync} if sync is not None else {}
+    driver = backend.create_driver()
+    try:
+        backend.login(driver, username, password, timer)
+        return backend.fetch_records(driver, timer, **kwargs)
+    finally:
+        driver.quit()
+
+
+def run_extractor(backend, argv: list) -> None:
+    """
+    Runs an extractor backend from the command line:
+    USERNAME PASSWORD [--incremental] [--lean] [--records [--export]].
+
+    By default the transcript is written to student_information.txt and printer_friendly_grades.txt. With
+    --records it is streamed to stdout as JSON Lines records instead (see transcript_records) and progress goes to
+    stderr; --export also writes the text files. --incremental only prints the terms changed since the last run,
+    merging them into the transcript stored next to the grades file. --lean turns on LEAN_PROFILE. The stage
+    timings are printed at the end, with the bytes and load time of each page a browser backend loaded.
+
+    Args:
+        backend (module): An extractor backend, see load_backend.
+        argv (list): The command line, as sys.argv.
+    """
+    username, password, options = argv[1], argv[2], argv[3:]
+    info_path, grades_path = "student_information.txt", "printer_friendly_grades.txt"
+    sync = None
+    if "--incremental" in options:
+        import inspect  # Slow to import, and only needed here
+        if "sync" not in inspect.signature(backend.fetch_records).parameters:
+            sys.exit(f"{os.path.basename(argv[0])} reads every term anyway; --incremental is not supported.")
+        sync = TermSync.beside(grades_path, username)
+    records = "--records" in options
+    if "--lean" in options:
+        LEAN_PROFILE["enabled"] = True
+
+    timer = StageTimer()
+    # The record stream owns stdout, so everything else printed meanwhile goes to stderr
+    with contextlib.redirect_stdout(sys.stderr) if records else contextlib.nullcontext():
+        try:
+            extraction = fetch_transcript(backend, username, password, timer, sync)
+            if not records or "--export" in options:
+                with timer.stage("write_files"):
+                    write_transcript_files(extraction, info_path, grades_path)
+                print(f"Grades extracted to '{grades_path}'.")
+        finally:
+            print("Stage timings:\n" + timer.report())
+            if timer.page_report():
+                print("Page loads:\n" + timer.page_report())
+
+    if records:
+        from transcript_records import records_from_extraction, write_records  # It imports this module
+        write_records(records_from_extraction(extraction), sys.stdout)
@@ -0,0 +1,459 @@
+import argparse
+import hashlib
+import json
+import os
+import socket
+import stat
+import sys
+import threading
+import time
+
+from extractor_common import BACKENDS, StageTimer, load_backend
+from term_sync import TermSync
+from transcript_records import records_from_extraction
+
+# The service listens on a Unix socket inside a directory only its owner can enter, so only that user's processes
+# can reach it; messages are JSON lines, so nothing a client sends is ever unpickled
+DEFAULT_SOCKET = os.path.join(os.path.expanduser("~"), ".scholarship_calculator", "extractor.sock")
+SOCKET_ENV = "EXTRACTOR_SERVICE_SOCKET"  # Overrides DEFAULT_SOCKET
+_MAX_REQUEST_BYTES = 1 << 20  # Longest request line the service reads
+DEFAULT_SESSION_TTL = 15 * 60  # Seconds an authenticated portal session is trusted before logging in again
+
+# Backends that can print single terms; the HTTP backend always receives every term at once
+_INCREMENTAL_BACKENDS = ("chrome", "safari")
+# Selenium errors (matched by name, so Selenium is not imported here) after which a clean login may succeed: a page
+# that timed out, or a browser whose WebDriver session was lost
+_TRANSIENT_WEBDRIVER_ERRORS = ("TimeoutException", "InvalidSessionIdException", "NoSuchWindowException")
+
+
+def _socket_path(path: str = None) -> str:
+    return path or os.environ.get(SOCKET_ENV) or DEFAULT_SOCKET
+
+
+def _check_private_directory(directory: str) -> None:
+    """
+    Makes sure a socket directory belongs to the current user and is closed to everyone else.
+
+    Raises:
+        PermissionError: If another user owns the directory or it is open to the group or others.
+    """
+    info = os.stat(directory)
+    if info.st_uid != os.getuid() or stat.S_IMODE(info.st_mode) & 0o077:
+        raise PermissionError(f"{directory} must belong to the current user and have no group or other access.")
+
+
+def _unix_socket() -> socket.socket:
+    if not hasattr(socket, "AF_UNIX"):
+        raise OSError("The extractor service needs Unix domain sockets, which this platform does not support.")
+    return socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+
+
+def _send(stream, message: dict) -> None:
+    stream.write(json.dumps(message) + "\n")
+    stream.flush()
+
+
+def _receive(stream, limit: int = -1) -> dict:
+    """
+    Reads one JSON message.
+
+    Raises:
+        EOFError: If the other side closed the connection.
+        ValueError: If the line is not a JSON object or is longer than limit.
+    """
+    line = stream.readline(limit)
+    if not line:
+        raise EOFError("The connection was closed.")
+    if not line.endswith("\n"):
+        raise ValueError("The message is incomplete or too long.")
+    message = json.loads(line)
+    if not isinstance(message, dict):
+        raise ValueError("A message must be a JSON object.")
+    return message
+
+
+def _is_transient(error: Exception) -> bool:
+    """
+    Whether a fetch that failed with error may succeed when started again: a timeout, a dropped connection or a
+    lost browser session.
+    """
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    return any(cls.__name__ in _TRANSIENT_WEBDRIVER_ERRORS for cls in type(error).__mro__)
+
+
+def _credential_fingerprint(username: str, password: str) -> str:
+    """
+    Identifies a set of credentials without keeping the password around.
+    """
+    return hashlib.sha256(f"{username}\0{password}".encode("utf-8")).hexdigest()
+
+
+class _BrowserSlot(object):
+    """
+    One pooled browser and the portal session it is logged in to, if any.
+    """
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.fingerprint = None  # Credentials the browser is logged in with
+        self.logged_in_at = 0.0
+
+
+class ExtractorService(object):
+    """
+    A pool of warm browsers that fetch grades for many requests, reusing authenticated sessions.
+
+    A fetch for credentials a pooled browser is already logged in with skips both browser launch and login, as long
+    as the session is younger than session_ttl. If a fetch on a reused session fails, e.g. because the session has
+    expired, or a fetch fails with a transient error (see _is_transient), it logs in again and retries once. A
+    failed login is never retried here: callers such as FetchScheduler own the retry policy for those.
+
+    Attributes:
+        __backend (module): The extractor module used to drive the browsers (create_driver, login, extract).
+        __pool_size (int): The maximum number of browsers.
+        __session_ttl (float): Seconds a login is reused for.
+        __idle (list): Browsers that are not running a fetch.
+        __created (int): Browsers started so far, including those being started.
+    """
+
+    def __init__(self, browser: str = "chrome", pool_size: int = 2, session_ttl: float = DEFAULT_SESSION_TTL):
+        if pool_size < 1:
+            raise ValueError("pool_size must be at least 1.")
+        self.browser = browser
+        self.__backend = load_backend(browser)
+        self.__pool_size = pool_size
+        self.__session_ttl = session_ttl
+        self.__idle = []
+        self.__created = 0
+        self.__available = threading.Condition()
+        self.__stats = {"fetches": 0, "logins": 0, "browser_launches": 0, "retries": 0}
+
+    def warm_up(self) -> None:
+        """
+        Launches every browser of the pool up front, so the first fetches do not pay for it.
+        """
+        while True:
+            with self.__available:
+                if self.__created >= self.__pool_size:
+                    return
+                self.__created += 1
+            slot = _BrowserSlot(self.__launch())
+            self.__release(slot)
+
+    def fetch(self, username: str, password: str, output_dir: str, incremental: bool = False,
+              records: bool = False) -> dict:
+        """
+        Fetches a student's information and grades into output_dir.
+
+        With incremental, only the terms changed since the last fetch into output_dir are printed, and merged into
+        the transcript stored there (see TermSync). With records, no text files are written and the transcript is
+        returned as records instead (see transcript_records).
+
+        Returns:
+            dict: info_file and grades_file (the written paths) or records, reused_session, seconds and stages
+                  (seconds spent in each extraction stage, summed over a retry).
+        """
+        if incremental and self.browser not in _INCREMENTAL_BACKENDS:
+            raise ValueError(f"The {self.browser} backend cannot sync terms incrementally.")
+        started = time.perf_counter()
+        timer = StageTimer()
+        fingerprint = _credential_fingerprint(username, password)
+        info_path = os.path.join(output_dir, "student_information.txt")
+        grades_path = os.path.join(output_dir, "printer_friendly_grades.txt")
+
+        slot = self.__acquire(fingerprint)
+        try:
+            reused_session = self.__has_session(slot, fingerprint)
+            for attempt in (1, 2):
+                logging_in = False
+                try:
+                    if not self.__has_session(slot, fingerprint):
+                        logging_in = True
+                        self.__login(slot, username, password, fingerprint, timer)
+                        logging_in = False
+                    # The sync state is reloaded on every attempt, so a failed attempt leaves no trace
+                    kwargs = {"sync": TermSync.beside(grades_path, username)} if incremental else {}
+                    if records:
+                        extraction = self.__backend.fetch_records(slot.driver, timer, **kwargs)
+                    else:
+                        self.__backend.extract(slot.driver, info_path, grades_path, timer=timer, **kwargs)
+                    break
+                except Exception as e:
+                    # Rejected credentials must not turn into another login, nor must errors a retry cannot fix
+                    if attempt == 2 or logging_in or not (reused_session or _is_transient(e)):
+                        raise
+                    # The session expired or the browser broke: start over from a clean login
+                    self.__count("retries")
+                    self.__reset(slot)
+        finally:
+            self.__release(slot)
+
+        self.__count("fetches")
+        reply = {"reused_session": reused_session, "seconds": round(time.perf_counter() - started, 3),
+                 "stages": timer.as_dict()}
+        if records:
+            reply["records"] = list(records_from_extraction(extraction))
+        else:
+            reply.update(info_file=info_path, grades_file=grades_path)
+        return reply
+
+    def stats(self) -> dict:
+        with self.__available:
+            return dict(self.__stats, browsers=self.__created, idle=len(self.__idle))
+
+    def close(self) -> None:
+        """
+        Quits every idle browser.
+        """
+        with self.__available:
+            idle, self.__idle = self.__idle, []
+            self.__created -= len(idle)
+        for slot in idle:
+            self.__quit(slot)
+
+    def __count(self, name: str) -> None:
+        with self.__available:
+            self.__stats[name] += 1
+
+    def __launch(self):
+        self.__count("browser_launches")
+        return self.__backend.create_driver()
+
+    def __has_session(self, slot: _BrowserSlot, fingerprint: str) -> bool:
+        return (slot.fingerprint == fingerprint
+                and time.monotonic() - slot.logged_in_at < self.__session_ttl)
+
+    def __login(self, slot: _BrowserSlot, username: str, password: str, fingerprint: str,
+                timer: StageTimer) -> None:
+        if slot.fingerprint is not None:
+            slot.driver.delete_all_cookies()  # Log the previous student out
+            slot.fingerprint = None
+        self.__backend.login(slot.driver, username, password, timer)
+        self.__count("logins")
+        slot.fingerprint, slot.logged_in_at = fingerprint, time.monotonic()
+
+    def __reset(self, slot: _BrowserSlot) -> None:
+        """
+        Drops a browser's session, replacing the browser if it no longer responds. If the replacement cannot be
+        launched, the slot is left without a browser, and __release takes it out of the pool.
+        """
+        slot.fingerprint = None
+        try:
+            slot.driver.delete_all_cookies()
+        except Exception:
+            self.__quit(slot)
+            slot.driver = None  # The quit browser must never go back into the pool
+            slot.driver = self.__launch()
+
+    def __acquire(self, fingerprint: str) -> _BrowserSlot:
+        """
+        Takes a browser for a fetch, preferring one already logged in with the same credentials.
+        """
+        with self.__available:
+            while True:
+                if self.__idle:
+                    for i, slot in enumerate(self.__idle):
+                        if self.__has_session(slot, fingerprint):
+                            return self.__idle.pop(i)
+                    # Otherwise take the browser whose session is oldest, it is the least likely to be reused
+                    oldest = min(range(len(self.__idle)), key=lambda i: self.__idle[i].logged_in_at)
+                    return self.__idle.pop(oldest)
+                if self.__created < self.__pool_size:
+                    self.__created += 1
+                    break
+                self.__available.wait()
+
+        try:
+            return _BrowserSlot(self.__launch())  # Launched outside the lock so other fetches keep going
+        except BaseException:
+            with self.__available:
+                self.__created -= 1
+                self.__available.notify()
+            raise
+
+    def __release(self, slot: _BrowserSlot) -> None:
+        with self.__available:
+            if slot.driver is None:  # Its browser could not be relaunched: make room for a new one instead
+                self.__created -= 1
+            else:
+                self.__idle.append(slot)
+            self.__available.notify()
+
+    @staticmethod
+    def __quit(slot: _BrowserSlot) -> None:
+        try:
+            slot.driver.quit()
+        except Exception:
+            pass
+
+
+def _handle_connection(service: ExtractorService, connection: socket.socket, shutdown) -> None:
+    """
+    Answers the requests of one client connection until it closes.
+    """
+    with connection, connection.makefile("rw", encoding="utf-8", newline="\n") as stream:
+        while True:
+            try:
+                request = _receive(stream, _MAX_REQUEST_BYTES)
+            except (EOFError, OSError, ValueError):  # ValueError: not a JSON object, or too long
+                return
+
+            op = request.get("op")
+            try:
+                if op == "fetch" and request.get("browser", service.browser) != service.browser:
+                    # Refused before any login, so the client can safely fetch some other way
+                    reply = {"ok": False, "refused": True,
+                             "error": f"This service drives {service.browser}, not {request['browser']}."}
+                elif op == "fetch":
+                    reply = {"ok": True, **service.fetch(request["username"], request["password"],
+                                                         request["output_dir"], request.get("incremental", False),
+                                                         request.get("records", False))}
+                elif op == "stats":
+                    reply = {"ok": True, **service.stats()}
+                elif op == "shutdown":
+                    _send(stream, {"ok": True})
+                    shutdown()
+                    return
+                else:
+                    raise ValueError(f"Unknown request: {op!r}")
+            except Exception as e:
+                reply = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+            _send(stream, reply)
+
+
+def serve(service: ExtractorService, path: str = None) -> None:
+    """
+    Accepts fetch requests from the current user's processes until a shutdown request arrives.
+
+    The socket is created in a directory only the current user can enter and is itself readable and writable by
+    that user only; it is removed again when the service stops.
+
+    Raises:
+        PermissionError: If the socket directory is open to other users.
+        FileExistsError: If something other than a socket already exists at the path.
+    """
+    path = _socket_path(path)
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    _check_private_directory(directory)
+    if os.path.lexists(path):
+        if not stat.S_ISSOCK(os.lstat(path).st_mode):
+            raise FileExistsError(f"{path} exists and is not a socket.")
+        os.unlink(path)  # Left behind by a service that did not stop cleanly
+
+    stop = threading.Event()
+    listener = _unix_socket()
+    previous_umask = os.umask(0o177)  # The socket is created owner-only, there is no window before the chmod
+    try:
+        listener.bind(path)
+    finally:
+        os.umask(previous_umask)
+    os.chmod(path, 0o600)
+    try:
+        listener.listen()
+        print(f"Extractor service ({service.browser}) listening on {path}")
+
+        def shutdown():
+            stop.set()
+            with _unix_socket() as wake_up:  # Wakes up the accept() below
+                wake_up.settimeout(1)
+                wake_up.connect(path)
+
+        while True:
+            try:
+                connection, _ = listener.accept()
+            except OSError:
+                connection = None
+            if stop.is_set():
+                if connection is not None:
+                    connection.close()
+                break
+            if connection is None:
+                continue
+            threading.Thread(target=_handle_connection, args=(service, connection, shutdown), daemon=True).start()
+    finally:
+        listener.close()
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+
+def request(message: dict, path: str = None) -> dict:
+    """
+    Sends one request to a running service and returns its reply.
+
+    Raises:
+        FileNotFoundError, ConnectionRefusedError: If no service is running at the path.
+        PermissionError: If the socket directory is open to other users, so the listener cannot be trusted.
+        EOFError: If the service closed the connection without replying.
+        ValueError: If the reply is not a JSON message.
+    """
+    path = _socket_path(path)
+    _check_private_directory(os.path.dirname(os.path.abspath(path)))
+    with _unix_socket() as connection:
+        connection.connect(path)
+        with connection.makefile("rw", encoding="utf-8", newline="\n") as stream:
+            _send(stream, message)
+            return _receive(stream)
+
+
+def fetch_via_service(username: str, password: str, output_dir: str = ".", browser: str = None,
+                      path: str = None, incremental: bool = False, records: bool = False) -> dict:
+    """
+    Asks a running service to fetch a student's files into output_dir, or with records, their transcript records.
+
+    Raises:
+        OSError, EOFError, ValueError: If no trusted service is running at the path or its reply is malformed, see
+                                       request.
+        ConnectionRefusedError: If the service refused the request without trying it, e.g. because it drives
+                                another browser.
+        RuntimeError: If the service tried and could not fetch the grades, e.g. because the portal rejected the
+                      credentials. Fetching again some other way would only repeat the failed login.
+    """
+    message = {"op": "fetch", "username": username, "password": password, "output_dir": os.path.abspath(output_dir)}
+    if browser:
+        message["browser"] = browser
+    if incremental:
+        message["incremental"] = True
+    if records:
+        message["records"] = True
+    reply = request(message, path)
+    if reply.get("ok") is True:
+        return reply
+    if not isinstance(reply.get("error"), str):
+        raise ValueError(f"Malformed reply from the extractor service: {reply!r}")
+    if reply.get("refused"):
+        raise ConnectionRefusedError(reply["error"])
+    raise RuntimeError(reply["error"])
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Long-lived grade extractor with a pool of warm browsers.")
+    parser.add_argument("command", choices=("serve", "stats", "shutdown"))
+    parser.add_argument("--browser", choices=tuple(BACKENDS), default="chrome")
+    parser.add_argument("--pool-size", type=int, default=2, help="Maximum number of browsers")
+    parser.add_argument("--session-ttl", type=float, default=DEFAULT_SESSION_TTL,
+                        help="Seconds a portal login is reused for")
+    parser.add_argument("--socket", default=None, help=f"The service's Unix socket (default: ${SOCKET_ENV} or "
+                                                       f"{DEFAULT_SOCKET})")
+    args = parser.parse_args(argv)
+
+    if args.command != "serve":
+        print(request({"op": args.command}, args.socket))
+        return 0
+
+    service = ExtractorService(args.browser, args.pool_size, args.session_ttl)
+    try:
+        service.warm_up()
+        serve(service, args.socket)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,261 @@
+import argparse
+import csv
+import json
+import math
+import os
+import queue
+import random
+import re
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
+from extractor_common import load_backend
+from extractor_service import ExtractorService
+
+FETCH_LOG_NAME = "fetch_log.jsonl"
+DEFAULT_RATE = 2.0  # Fetches started per second against one portal host
+DEFAULT_RETRIES = 2
+DEFAULT_BACKOFF = 2.0  # Seconds before the first retry, doubled for each further retry
+
+# Errors a retry cannot fix, e.g. wrong credentials
+_PERMANENT_ERRORS = (PermissionError, ValueError)
+
+
+def read_credentials(manifest_path: str) -> list[tuple[str, str, str | None]]:
+    """
+    Reads a CSV manifest of 'username,password[,output_dir]' rows.
+
+    A 'username,password' header row, blank lines and lines starting with '#' are skipped. Relative output
+    directories are resolved later, against the run's output directory.
+
+    Returns:
+        list: (username, password, output_dir or None) tuples.
+    """
+    accounts = []
+    with open(manifest_path, "r", encoding="utf-8", newline="") as file:
+        for row in csv.reader(file):
+            if not row or row[0].strip().startswith("#"):
+                continue
+            if [cell.strip().lower() for cell in row[:2]] == ["username", "password"]:
+                continue
+            if len(row) not in (2, 3):
+                raise ValueError(f"Credential rows must be 'username,password[,output_dir]', got {len(row)} columns")
+            username, password = row[0].strip(), row[1]
+            accounts.append((username, password, row[2].strip() if len(row) == 3 else None))
+    return accounts
+
+
+def student_directory(output_root: str, username: str) -> str:
+    """
+    Returns the directory a student's files are written to: one folder per account, named after the username.
+    """
+    return os.path.join(output_root, re.sub(r"[^\w.-]", "_", username))
+
+
+def portal_host(browser: str) -> str:
+    """
+    Returns the host an extractor backend talks to, which is what rate limiting is keyed by.
+    """
+    backend = load_backend(browser)
+    return urlsplit(getattr(backend, "PORTAL_URL", None) or backend.LOGIN_URL).netloc
+
+
+def percentile(sorted_values: list, fraction: float) -> float:
+    """
+    Returns the nearest-rank percentile of an ascending list, e.g. fraction=0.99 for p99.
+    """
+    if not sorted_values:
+        return 0.0
+    return sorted_values[max(1, math.ceil(len(sorted_values) * fraction)) - 1]
+
+
+class RateLimiter(object):
+    """
+    Spaces out the start of fetches against each host, so a cohort refresh does not hammer the portal.
+
+    Attributes:
+        __interval (float): Minimum seconds between two starts against the same host.
+        __next_start (dict): Host -> the earliest time the next fetch may start.
+    """
+
+    def __init__(self, rate: float):
+        if rate <= 0:
+            raise ValueError("rate must be positive.")
+        self.__interval = 1.0 / rate
+        self.__next_start = {}
+        self.__lock = threading.Lock()
+
+    def wait(self, host: str) -> float:
+        """
+        Blocks until a fetch may start against host and returns the seconds waited.
+        """
+        with self.__lock:
+            now = time.monotonic()
+            start = max(now, self.__next_start.get(host, now))
+            self.__next_start[host] = start + self.__interval  # Reserve the slot before sleeping
+        delay = start - now
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+
+class FetchScheduler(object):
+    """
+    Fetches many students' grades concurrently through a bounded pool of extractor workers.
+
+    Jobs wait in a queue and are taken by `workers` threads that share one ExtractorService, so at most that many
+    browsers (or HTTP sessions) exist at a time. Starts are rate limited per portal host. A failed fetch is retried
+    with exponential backoff and jitter unless the error is permanent, e.g. rejected credentials.
+
+    Attributes:
+        __service (ExtractorService): The pool of warm extractors the workers fetch through.
+        __host (str): The portal host of the backend, used as the rate limiting key.
+    """
+
+    def __init__(self, browser: str = "http", workers: int = 4, rate: float = DEFAULT_RATE,
+                 retries: int = DEFAULT_RETRIES, backoff: float = DEFAULT_BACKOFF, incremental: bool = False):
+        if workers < 1:
+            raise ValueError("workers must be at least 1.")
+        if retries < 0:
+            raise ValueError("retries must not be negative.")
+        self.workers = workers
+        self.retries = retries
+        self.backoff = backoff
+        self.incremental = incremental
+        self.__service = ExtractorService(browser, pool_size=workers)
+        self.__host = portal_host(browser)
+        self.__limiter = RateLimiter(rate)
+
+    def run(self, accounts: list, output_root: str, log_file=None) -> list[dict]:
+        """
+        Fetches every account into its own directory below output_root.
+
+        Args:
+            accounts (list): (username, password, output_dir or None) tuples, as read_credentials returns.
+            output_root (str): The directory holding one sub-directory per student.
+            log_file (file, optional): Receives one JSON line per finished job, as soon as it finishes.
+
+        Returns:
+            list: One result dict per account, in manifest order: username, output_dir, ok, attempts, seconds
+                  (including retries and rate limiting), and stages or error.
+        """
+        jobs = queue.Queue()
+        for index, (username, password, output_dir) in enumerate(accounts):
+            directory = (os.path.join(output_root, output_dir) if output_dir
+                         else student_directory(output_root, username))
+            jobs.put((index, username, password, directory))
+
+        results = [None] * len(accounts)
+        log_lock = threading.Lock()
+
+        def work():
+            while True:
+                try:
+                    index, username, password, directory = jobs.get_nowait()
+                except queue.Empty:
+                    return
+                result = self.__fetch(username, password, directory)
+                results[index] = result
+                if log_file is not None:
+                    with log_lock:
+                        log_file.write(json.dumps(result) + "\n")
+                        log_file.flush()
+
+        threads = [threading.Thread(target=work, daemon=True) for _ in range(min(self.workers, len(accounts)))]
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            self.__service.close()
+        return results
+
+    def __fetch(self, username: str, password: str, directory: str) -> dict:
+        started = time.perf_counter()
+        result = {"username": username, "output_dir": directory, "ok": False, "attempts": 0}
+        os.makedirs(directory, exist_ok=True)
+        for attempt in range(1, self.retries + 2):
+            result["attempts"] = attempt
+            self.__limiter.wait(self.__host)
+            try:
+                reply = self.__service.fetch(username, password, directory, self.incremental)
+            except Exception as e:
+                result["error"] = f"{type(e).__name__}: {e}"
+                if isinstance(e, _PERMANENT_ERRORS) or attempt > self.retries:
+                    break
+                # Back off exponentially, with jitter so failed jobs do not retry in lockstep
+                time.sleep(self.backoff * 2 ** (attempt - 1) * random.uniform(0.5, 1.5))
+                continue
+            result.pop("error", None)
+            result.update(ok=True, stages=reply["stages"])
+            break
+        result["seconds"] = round(time.perf_counter() - started, 3)
+        return result
+
+
+def summarize(results: list, wall_seconds: float) -> str:
+    """
+    Returns the end-of-run report: successes, throughput in students per minute and fetch latency percentiles.
+    """
+    succeeded = [r for r in results if r["ok"]]
+    latencies = sorted(r["seconds"] for r in succeeded)
+    lines = [f"Fetched {len(succeeded)}/{len(results)} students in {wall_seconds:.1f} s "
+             f"({len(succeeded) / wall_seconds * 60 if wall_seconds else 0.0:.1f} students/minute)"]
+    if latencies:
+        lines.append("Latency per student: " + "  ".join(
+            f"{name} {percentile(latencies, fraction):.2f} s"
+            for name, fraction in (("p50", 0.5), ("p90", 0.9), ("p99", 0.99), ("max", 1.0))))
+    retried = sum(1 for r in results if r["attempts"] > 1)
+    if retried:
+        lines.append(f"{retried} student(s) needed more than one attempt")
+    for r in results:
+        if not r["ok"]:
+            lines.append(f"  failed: {r['username']} after {r['attempts']} attempt(s): {r['error']}")
+    return "\n".join(lines)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Fetch the grades of many accounts concurrently.")
+    parser.add_argument("manifest", help="CSV of username,password[,output_dir] rows")
+    parser.add_argument("-o", "--output", default="transcripts",
+                        help="Directory receiving one folder per student (batch_evaluator.py reads this layout)")
+    parser.add_argument("-b", "--browser", choices=("chrome", "safari", "http"), default="http")
+    parser.add_argument("-w", "--workers", type=int, default=4, help="Concurrent extractors (browsers or sessions)")
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE,
+                        help="Fetches started per second against the portal")
+    parser.add_argument("--retries", type=int, default=DEFAULT_RETRIES, help="Retries per student after a failure")
+    parser.add_argument("--backoff", type=float, default=DEFAULT_BACKOFF,
+                        help="Seconds before the first retry, doubled for each further retry")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only print the terms changed since the last run into each student's folder "
+                             "(chrome and safari)")
+    args = parser.parse_args(argv)
+
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.rate <= 0:
+        parser.error("--rate must be positive")
+    if args.retries < 0:
+        parser.error("--retries must not be negative")
+    if args.incremental and args.browser == "http":
+        parser.error("--incremental needs a browser backend; the http backend always reads every term")
+
+    accounts = read_credentials(args.manifest)
+    if not accounts:
+        print(f"No accounts found in {args.manifest}.")
+        return 1
+
+    os.makedirs(args.output, exist_ok=True)
+    scheduler = FetchScheduler(args.browser, args.workers, args.rate, args.retries, args.backoff, args.incremental)
+    started = time.perf_counter()
+    with open(os.path.join(args.output, FETCH_LOG_NAME), "w", encoding="utf-8") as log_file:
+        results = scheduler.run(accounts, args.output, log_file)
+    print(summarize(results, time.perf_counter() - started))
+    return 0 if all(r["ok"] for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,71 +1,37 @@
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-import time
-import sys
 import re
+import sys
 
-def extract_and_filter_information(output_file: str):
-    """
-    Extracts GPA, Majors, and Minors from the My Progress page exactly as the Safari extractor does.
-    """
-    parent = WebDriverWait(driver, 10).until(
-        EC.presence_of_element_located(
-            (By.XPATH, "//*[contains(@id, 'programs-ataglance')]/div[2]/div[1]")
-        )
-    )
-    text = parent.text
-    lines = [ln.strip() for ln in text.splitlines() if ln.strip()]
-
-    filtered, majors, current = [], [], None
-    has_minors = False
-    for line in lines:
-        if line.endswith(":"):
-            if current and not current.startswith("Majors:"):
-                filtered.append(current)
-            current = line
-        else:
-            if current and current.startswith("Majors:"):
-                majors.append(line)
-            elif current:
-                current += f" {line}"
-            else:
-                filtered.append(line)
-        if line.startswith("Minors:"):
-            has_minors = True
-
-    if majors:
-        filtered.append(f"Majors: {', '.join(majors)}")
-    if not has_minors:
-        filtered.append("Minors: None")
-
-    final = []
-    for ln in filtered:
-        if ln.startswith("Cumulative GPA:"):
-            m = re.search(r"Cumulative GPA: ([0-9.]+)", ln)
-            if m:
-                final.append(f"Cumulative GPA: {m.group(1)}")
-        elif ln.startswith("Majors:") or ln.startswith("Minors:"):
-            final.append(ln)
-
-    with open(output_file, "w", encoding="utf-8") as f:
-        f.write("\n".join(final))
-    print(f"Filtered information saved to {output_file}.")
-
-def infer_academic_year(start_date: str) -> int:
-    """
-    Infers the academic year from a 'YYYY-MM-DD' start date.
+from extractor_common import (LEAN_PROFILE, STAGE_TIMEOUTS, BackgroundTab, StageTimer, click_all, infer_academic_year,
+                              login_with_form, read_progress_information, record_page_load, run_extractor, scrape_page,
+                              sync_terms, wait_for_page_load, write_transcript_files)
+from term_sync import TermSync
+
+LOGIN_URL = "https://collprodss.colleague.upei.ca/Student/Account/Login"
+MY_PROGRESS_URL = "https://collprodss.colleague.upei.ca/Student/Planning/Programs/MyProgress"
+GRADES_URL = "https://collprodss.colleague.upei.ca/Student/Student/Grades"
+
+# Chrome switches for lean mode: nothing runs or downloads in the background while the extractor works
+LEAN_ARGUMENTS = (
+    "--disable-extensions",
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-default-apps",
+    "--disable-sync",
+    "--no-first-run",
+    "--mute-audio",
+)
+
+
+def create_driver():
     """
-    year, month = map(int, start_date.split("-")[:2])
-    if month < 9:
-        year -= 1
-    return year
+    Starts a headless Chrome.
 
-if __name__ == "__main__":
-    username, password = sys.argv[1], sys.argv[2]
+    In lean mode (see LEAN_PROFILE) it uses the 'eager' page load strategy, runs without extensions and background
+    networking, never loads images and blocks LEAN_PROFILE["blocked_urls"] through the DevTools protocol.
+    """
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.chrome.service import Service
 
     chrome_opts = Options()
     chrome_opts.add_argument("--headless")
@@ -73,124 +39,189 @@ if __name__ == "__main__":
     chrome_opts.add_argument("--no-sandbox")
     chrome_opts.add_argument("--disable-dev-shm-usage")
     chrome_opts.add_argument("--window-size=1920,1080")
+    lean = LEAN_PROFILE["enabled"]
+    if lean:
+        chrome_opts.page_load_strategy = "eager"
+        for argument in LEAN_ARGUMENTS:
+            chrome_opts.add_argument(argument)
+        # Unlike the DevTools blocking below, this also covers the printer-friendly tab
+        chrome_opts.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
 
     driver = webdriver.Chrome(service=Service(), options=chrome_opts)
-    try:
-        # 1) Login
-        driver.get("https://collprodss.colleague.upei.ca/Student/Account/Login")
-        WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.ID, "UserName")))
-        driver.find_element(By.ID, "UserName").clear()
-        driver.find_element(By.ID, "Password").clear()
-        time.sleep(0.5)
-        driver.find_element(By.ID, "UserName").send_keys(username)
-        time.sleep(0.5)
-        driver.find_element(By.ID, "Password").send_keys(password)
-        time.sleep(0.5)
-        try:
-            btn = driver.find_element(By.XPATH, "//button[@type='submit']")
-            driver.execute_script("arguments[0].click();", btn)
-        except:
-            driver.find_element(By.ID, "Password").submit()
-        time.sleep(1.5)
-        print("Login submitted.")
-
-        # 2) Extract student info
-        driver.get("https://collprodss.colleague.upei.ca/Student/Planning/Programs/MyProgress")
-        WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.XPATH, "//*[contains(@id, 'programs-ataglance')]/div[2]/div[1]"))
-        )
-        print("Navigated to My Progress page.")
-        extract_and_filter_information("student_information.txt")
+    if lean:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": LEAN_PROFILE["blocked_urls"]})
+    return driver
 
-        # 3) Navigate to Grades page
-        driver.get("https://collprodss.colleague.upei.ca/Student/Student/Grades")
-        WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.ID, "print-grade-label")))
-        print("Navigated to Grades page.")
 
-        # 4) Open term selection panel
-        toggle = WebDriverWait(driver, 10).until(EC.element_to_be_clickable((By.ID, "print-grade-label")))
-        toggle.click()
-        print("Opened term selection panel.")
+def login(driver, username: str, password: str, timer: StageTimer = None):
+    """
+    Logs in to Colleague Self-Service and waits until the portal has accepted the credentials.
+
+    Raises:
+        PermissionError: If the portal rejects the credentials.
+    """
+    login_with_form(driver, LOGIN_URL, username, password, timer)
 
-        # 5) Select all term checkboxes via labels
-        terms_ul = WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.ID, "student-terms-ul")))
-        labels = terms_ul.find_elements(By.TAG_NAME, "label")
-        for lbl in labels:
-            try:
-                driver.execute_script("arguments[0].scrollIntoView(true);", lbl)
-                driver.execute_script("arguments[0].click();", lbl)
-            except:
-                continue
-        print("All term checkboxes toggled.")
 
+def print_selected_terms(driver, timer: StageTimer, while_rendering=None) -> tuple:
+    """
+    Prints the ticked terms into a new tab, scrapes it and closes it again.
+
+    Args:
+        while_rendering (callable, optional): Called without arguments after Print was clicked, while the
+                                              printer-friendly tab opens and renders.
+
+    Returns:
+        tuple: (student, results), where student holds the printed name and student_id and results the
+               (academic_year, section, title, credits, grade) rows of the printed courses.
+    """
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.webdriver.support.ui import WebDriverWait
+
+    with timer.stage("print_tab"):
         # 6) Click final Print (opens new tab)
-        orig_handles = driver.window_handles
-        final_btn = WebDriverWait(driver, 10).until(
+        timeout = STAGE_TIMEOUTS["print_tab"]
+        main_handle = driver.current_window_handle
+        orig_handles = set(driver.window_handles)
+        final_btn = WebDriverWait(driver, timeout).until(
             EC.element_to_be_clickable((By.XPATH, "//*[@id='print-grades']/div[1]/div[3]/div[2]/button"))
         )
         final_btn.click()
         print("Clicked final Print, awaiting new window...")
 
-        # 7) Switch to new printer-friendly tab
-        WebDriverWait(driver, 10).until(lambda d: len(d.window_handles) > len(orig_handles))
+    if while_rendering is not None:
+        while_rendering()
+
+    with timer.stage("print_tab"):
+        # 7) Switch to new printer-friendly tab and wait for it to finish loading
+        WebDriverWait(driver, timeout).until(lambda d: set(d.window_handles) - orig_handles)
         new = [h for h in driver.window_handles if h not in orig_handles][0]
         driver.switch_to.window(new)
         print("Switched to printer-friendly window.")
-        time.sleep(1)
-
-        # ——— extract student name & ID from the printed page ———
-        name_elem = WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.XPATH,
-                "//*[@id='student-grades']//span[text()='Student Name:']/following-sibling::span"
-            ))
-        )
-        student_name = name_elem.text.strip()
-        id_elem = driver.find_element(
-            By.XPATH,
-            "//*[@id='student-grades']//span[text()='Student ID:']/following-sibling::span"
-        )
-        student_id = id_elem.text.strip()
+        wait_for_page_load(driver, timeout)
+        record_page_load(driver, timer, "print_tab")
 
-        # prepend to student_information.txt
-        with open("student_information.txt", "r+", encoding="utf-8") as info_file:
-            existing = info_file.read()
-            info_file.seek(0)
-            info_file.write(f"Name: {student_name}\nStudent ID: {student_id}\n{existing}")
-        print(f"Prepended Name: {student_name}, ID: {student_id} to student_information.txt")
-
-        # 8) Scrape table rows
-        WebDriverWait(driver, 10).until(
+    with timer.stage("table_scrape"):
+        timeout = STAGE_TIMEOUTS["table_scrape"]
+        # ——— wait for the printed page, then read the student name & ID and every table row at once ———
+        WebDriverWait(driver, timeout).until(
             EC.presence_of_element_located((By.XPATH, "//table[contains(@class,'student-grade-table')]"))
         )
-        rows = driver.find_elements(By.XPATH, "//table[contains(@class,'student-grade-table')]/tbody/tr")
+        student, rows = scrape_page(
+            driver,
+            "//table[contains(@class,'student-grade-table')]/tbody/tr",
+            name="//*[@id='student-grades']//span[text()='Student Name:']/following-sibling::span",
+            student_id="//*[@id='student-grades']//span[text()='Student ID:']/following-sibling::span",
+        )
 
+        # 8) Group the scraped table rows by academic year
         results = []
-        for row in rows:
-            cols = row.find_elements(By.TAG_NAME, "td")
+        for cols in rows:
             if len(cols) < 4:
                 continue
-            section = " ".join(cols[0].text.split())
+            section = cols[0]
             m = re.search(r"\d{4}-\d{2}-\d{2}", section)
             if not m:
                 continue
             year = infer_academic_year(m.group(0))
-            title = " ".join(cols[1].text.split())
-            cred = " ".join(cols[2].text.split())
-            grade = " ".join(cols[3].text.split())
-            results.append((year, f"{section} | {title} | {cred} credits | Final Grade: {grade}"))
-
-        # 9) Write to file
-        results.sort(key=lambda x: x[0])
-        with open("printer_friendly_grades.txt", "w", encoding="utf-8") as f:
-            cur_year = None
-            for yr, line in results:
-                if yr != cur_year:
-                    if cur_year is not None:
-                        f.write("\n")
-                    f.write(f"--- Academic Year {yr}-{yr+1} ---\n")
-                    cur_year = yr
-                f.write(line + "\n")
-        print("Grades extracted to 'printer_friendly_grades.txt'.")
-
-    finally:
-        driver.quit()
+            title, cred, grade = cols[1], cols[2], cols[3]
+            results.append((year, section, title, cred, grade))
+
+    # Close the printer-friendly tab so the browser can be reused for another print or fetch
+    driver.close()
+    driver.switch_to.window(main_handle)
+    return student, results
+
+
+def fetch_records(driver, timer: StageTimer = None, sync: TermSync = None) -> dict:
+    """
+    Fetches the logged-in student's information and grades without writing any file.
+
+    With a TermSync, only the terms that are new or not final yet are printed (one at a time), and the courses of
+    every stored term are returned.
+
+    Returns:
+        dict: name, student_id, information (the filtered My Progress lines, as in student_information.txt) and
+              courses, the (academic_year, section, title, credits, grade) rows in page order.
+    """
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.webdriver.support.ui import WebDriverWait
+
+    timer = timer or StageTimer()
+
+    # 2) Load My Progress in a second tab while this one goes through the grades print flow. Its information is
+    # read while the first printer-friendly tab renders (or at the end, if nothing was printed).
+    progress_tab = BackgroundTab(driver, MY_PROGRESS_URL)
+
+    def read_information():
+        return progress_tab.read(lambda d: read_progress_information(d, None, timer))
+
+    # 3) Navigate to Grades page
+    with timer.stage("grades_page"):
+        driver.get(GRADES_URL)
+        WebDriverWait(driver, STAGE_TIMEOUTS["grades_page"]).until(
+            EC.presence_of_element_located((By.ID, "print-grade-label")))
+        print("Navigated to Grades page.")
+        record_page_load(driver, timer, "grades_page")
+
+    with timer.stage("term_selection"):
+        # 4) Open term selection panel
+        toggle = WebDriverWait(driver, STAGE_TIMEOUTS["term_selection"]).until(
+            EC.element_to_be_clickable((By.ID, "print-grade-label")))
+        toggle.click()
+        print("Opened term selection panel.")
+
+        # 5) Select all term checkboxes via labels, in one script call
+        WebDriverWait(driver, STAGE_TIMEOUTS["term_selection"]).until(
+            EC.presence_of_element_located((By.ID, "student-terms-ul")))
+        if sync is None:
+            terms = click_all(driver, "#student-terms-ul label")
+            print(f"All {len(terms)} term checkboxes toggled.")
+
+    if sync is None:
+        student, courses = print_selected_terms(driver, timer, read_information)
+    else:
+        printed = []
+
+        def print_term():
+            student, results = print_selected_terms(driver, timer, read_information)
+            printed.append(student)
+            return results
+
+        changed = sync_terms(driver, sync, "#student-terms-ul label", print_term)
+        print(f"{changed} term(s) changed since the last sync.")
+        if printed:
+            sync.student = printed[-1]
+        elif sync.student is None:  # No terms at all: print once anyway for the name and ID
+            sync.student, _ = print_selected_terms(driver, timer, read_information)
+        sync.save()
+        student, courses = sync.student, sync.rows()
+    information = read_information()
+
+    print(f"Fetched {student['name']} ({student['student_id']}): {len(courses)} courses.")
+    return {"name": student["name"], "student_id": student["student_id"], "information": information,
+            "courses": courses}
+
+
+def extract(driver, info_path: str = "student_information.txt", grades_path: str = "printer_friendly_grades.txt",
+            timer: StageTimer = None, sync: TermSync = None):
+    """
+    Extracts the student information and all grades of the logged-in student into the two output files.
+    """
+    timer = timer or StageTimer()
+    extraction = fetch_records(driver, timer, sync)
+    # 9) Write to file
+    with timer.stage("write_files"):
+        write_transcript_files(extraction, info_path, grades_path)
+    print(f"Grades extracted to '{grades_path}'.")
+
+
+def main(argv):
+    run_extractor(sys.modules[__name__], argv)
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,411 @@
+import gzip
+import http.client
+import http.cookiejar
+import os
+import re
+import sys
+import zlib
+from html.parser import HTMLParser
+from urllib.parse import urlencode, urljoin, urlsplit
+from urllib.request import Request
+
+from extractor_common import (StageTimer, filter_progress_text, infer_academic_year, run_extractor,
+                              write_transcript_files)
+
+# Point PORTAL_BASE_URL at mock_portal.py to run against recorded pages instead of the real portal
+PORTAL_URL = os.environ.get("PORTAL_BASE_URL", "https://collprodss.colleague.upei.ca")
+LOGIN_PATH = "/Student/Account/Login"
+MY_PROGRESS_PATH = "/Student/Planning/Programs/MyProgress"
+GRADES_PATH = "/Student/Student/Grades"
+
+REQUEST_TIMEOUT = 15  # Seconds to wait for the portal on each request
+MAX_REDIRECTS = 10
+
+# Elements that start a new line in the rendered text, as innerText would show them
+_BLOCK_TAGS = frozenset(("address", "article", "aside", "blockquote", "dd", "div", "dl", "dt", "fieldset",
+                         "footer", "form", "h1", "h2", "h3", "h4", "h5", "h6", "header", "hr", "li", "main",
+                         "nav", "ol", "p", "section", "table", "tbody", "td", "tfoot", "th", "thead", "tr", "ul"))
+_VOID_TAGS = frozenset(("area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source",
+                        "track", "wbr"))
+_HIDDEN_TAGS = frozenset(("script", "style", "template", "noscript"))
+
+
+class PortalSession(object):
+    """
+    A browserless session with the portal: cookies plus one kept-alive connection per host.
+
+    It has the delete_all_cookies() and quit() methods of a WebDriver, so the extractor service can pool it like
+    a browser.
+
+    Attributes:
+        base_url (str): The portal address, e.g. 'https://collprodss.colleague.upei.ca'.
+        __cookies (http.cookiejar.CookieJar): The cookies set so far, each only sent back to the hosts and paths
+                                              its domain and path allow, so a redirect to another host never
+                                              receives the portal's session cookie.
+        __connections (dict): (scheme, host) -> open HTTP connection.
+    """
+
+    def __init__(self, base_url: str = PORTAL_URL, timeout: float = REQUEST_TIMEOUT):
+        self.base_url = base_url.rstrip("/")
+        self.__timeout = timeout
+        self.__cookies = http.cookiejar.CookieJar()
+        self.__connections = {}
+
+    def url(self, path: str) -> str:
+        return self.base_url + path
+
+    def get(self, url: str) -> tuple:
+        """
+        Fetches a page, following redirects.
+
+        Returns:
+            tuple: (final_url, html)
+        """
+        return self.__request("GET", url)
+
+    def post(self, url: str, form: dict) -> tuple:
+        """
+        Submits a form, following the redirects that answer it.
+
+        Returns:
+            tuple: (final_url, html)
+        """
+        return self.__request("POST", url, urlencode(form).encode("utf-8"))
+
+    def delete_all_cookies(self) -> None:
+        self.__cookies.clear()
+
+    def quit(self) -> None:
+        for connection in self.__connections.values():
+            connection.close()
+        self.__connections.clear()
+
+    def __request(self, method: str, url: str, body: bytes = None) -> tuple:
+        for _ in range(MAX_REDIRECTS + 1):
+            response, data = self.__send(method, url, body)
+            location = response.getheader("Location")
+            if response.status in (301, 302, 303, 307, 308) and location:
+                url = urljoin(url, location)
+                if response.status in (301, 302, 303):
+                    method, body = "GET", None
+                continue
+            if response.status >= 400:
+                raise ConnectionError(f"{method} {url} failed with HTTP {response.status} {response.reason}")
+            charset = response.headers.get_content_charset() or "utf-8"
+            return url, data.decode(charset, errors="replace")
+        raise ConnectionError(f"More than {MAX_REDIRECTS} redirects from {url}")
+
+    def __send(self, method: str, url: str, body: bytes):
+        parts = urlsplit(url)
+        key = (parts.scheme, parts.netloc)
+        headers = {"Accept-Encoding": "gzip, deflate", "Connection": "keep-alive", "User-Agent": "grades-extractor"}
+        cookie_request = Request(url, method=method)  # Only carries the URL the cookie jar matches cookies against
+        self.__cookies.add_cookie_header(cookie_request)
+        if cookie_request.has_header("Cookie"):
+            headers["Cookie"] = cookie_request.get_header("Cookie")
+        if body is not None:
+            headers["Content-Type"] = "application/x-www-form-urlencoded"
+        target = parts.path or "/"
+        if parts.query:
+            target += "?" + parts.query
+
+        for attempt in (1, 2):
+            connection = self.__connections.get(key)
+            if connection is None:
+                connection_cls = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+                connection = self.__connections[key] = connection_cls(parts.netloc, timeout=self.__timeout)
+            try:
+                connection.request(method, target, body, headers)
+                response = connection.getresponse()
+                data = response.read()
+                break
+            except Exception as e:
+                connection.close()
+                del self.__connections[key]
+                # Reconnect once if the server closed the kept-alive connection in the meantime
+                stale = isinstance(e, (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError))
+                if attempt == 2 or not stale:
+                    raise
+
+        if response.getheader("Connection", "").lower() == "close":
+            connection.close()
+            del self.__connections[key]
+        self.__cookies.extract_cookies(response, cookie_request)
+
+        encoding = response.getheader("Content-Encoding", "").lower()
+        if encoding == "gzip":
+            data = gzip.decompress(data)
+        elif encoding == "deflate":
+            data = zlib.decompress(data)
+        return response, data
+
+
+class _Element(object):
+    """
+    An element of a parsed page.
+    """
+
+    __slots__ = ("tag", "attrs", "children", "parent")
+
+    def __init__(self, tag: str, attrs: dict, parent):
+        self.tag = tag
+        self.attrs = attrs
+        self.children = []  # Child _Elements and text strings, in document order
+        self.parent = parent
+
+    def elements(self, tag: str = None) -> list:
+        """
+        Returns the child elements, optionally only those with a tag.
+        """
+        return [c for c in self.children if isinstance(c, _Element) and (tag is None or c.tag == tag)]
+
+    def iter(self):
+        """
+        Yields this element and all its descendant elements in document order.
+        """
+        stack = [self]
+        while stack:
+            element = stack.pop()
+            yield element
+            stack.extend(reversed(element.elements()))
+
+    def find(self, predicate):
+        return next((element for element in self.iter() if predicate(element)), None)
+
+    def own_text(self) -> str:
+        return "".join(c for c in self.children if isinstance(c, str))
+
+    def text(self) -> str:
+        """
+        Returns the element's text with a line break around each block element, like innerText.
+        """
+        parts = []
+        self.__collect_text(parts)
+        return "\n".join(" ".join(line.split()) for line in "".join(parts).split("\n"))
+
+    def __collect_text(self, parts: list) -> None:
+        for child in self.children:
+            if isinstance(child, str):
+                parts.append(child.replace("\n", " "))
+            elif child.tag == "br":
+                parts.append("\n")
+            elif child.tag not in _HIDDEN_TAGS:
+                block = child.tag in _BLOCK_TAGS
+                if block:
+                    parts.append("\n")
+                child.__collect_text(parts)
+                if block:
+                    parts.append("\n")
+
+
+class _TreeBuilder(HTMLParser):
+    """
+    Builds a tree of _Elements from a page, tolerating the unclosed tags real pages have.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.root = _Element("#document", {}, None)
+        self.__current = self.root
+
+    def handle_starttag(self, tag, attrs):
+        element = _Element(tag, {name: value or "" for name, value in attrs}, self.__current)
+        self.__current.children.append(element)
+        if tag not in _VOID_TAGS:
+            self.__current = element
+
+    def handle_startendtag(self, tag, attrs):
+        self.__current.children.append(_Element(tag, {name: value or "" for name, value in attrs}, self.__current))
+
+    def handle_endtag(self, tag):
+        element = self.__current
+        while element is not self.root and element.tag != tag:
+            element = element.parent
+        if element is not self.root:  # Ignore end tags that were never opened
+            self.__current = element.parent
+
+    def handle_data(self, data):
+        self.__current.children.append(data)
+
+
+def parse_html(html: str) -> _Element:
+    builder = _TreeBuilder()
+    builder.feed(html)
+    builder.close()
+    return builder.root
+
+
+def _has_class(element: _Element, name: str) -> bool:
+    return name in element.attrs.get("class", "")
+
+
+def parse_login_form(html: str) -> tuple:
+    """
+    Finds the login form of the login page.
+
+    Returns:
+        tuple: (action, fields), where fields holds the form's hidden inputs, e.g. the anti-forgery token.
+
+    Raises:
+        ValueError: If the page has no login form.
+    """
+    page = parse_html(html)
+    form = page.find(lambda e: e.tag == "form" and e.find(
+        lambda i: i.tag == "input" and i.attrs.get("name") == "UserName"))
+    if form is None:
+        raise ValueError("The login page has no login form.")
+    fields = {i.attrs["name"]: i.attrs.get("value", "") for i in form.iter()
+              if i.tag == "input" and i.attrs.get("type", "").lower() == "hidden" and "name" in i.attrs}
+    return form.attrs.get("action", ""), fields
+
+
+def parse_progress_page(html: str) -> str:
+    """
+    Returns the text of the 'at a glance' panel of the My Progress page, as the browser extractors read it.
+
+    Raises:
+        ValueError: If the page has no such panel.
+    """
+    page = parse_html(html)
+    glance = page.find(lambda e: "programs-ataglance" in e.attrs.get("id", ""))
+    # The panel is at programs-ataglance/div[2]/div[1]
+    divs = glance.elements("div") if glance is not None else []
+    inner = divs[1].elements("div") if len(divs) > 1 else []
+    if not inner:
+        raise ValueError("The My Progress page has no 'at a glance' panel.")
+    return inner[0].text()
+
+
+def parse_grades_page(html: str) -> tuple:
+    """
+    Reads the student header and the grade table of the grades page.
+
+    Returns:
+        tuple: (student_name, student_id, rows), where rows holds the whitespace-normalized cell texts of each
+               row of the grade table.
+
+    Raises:
+        ValueError: If the page has no student name or ID.
+    """
+    page = parse_html(html)
+    header = {}
+    for label, key in (("Student Name:", "name"), ("Student ID:", "student_id")):
+        span = page.find(lambda e: e.tag == "span" and e.own_text().strip() == label)
+        if span is not None:
+            siblings = span.parent.elements("span")
+            following = siblings[siblings.index(span) + 1:]
+            if following:
+                header[key] = " ".join(following[0].text().split())
+                continue
+        container = page.find(lambda e: label in e.own_text())
+        if container is None:
+            raise ValueError(f"The grades page has no '{label}'.")
+        # As on the Safari page, the value shares a parent element with its label
+        header[key] = (container.parent.text().replace("\n", " ")).split(":", 1)[1].strip()
+
+    rows = []
+    for table in page.iter():
+        if table.tag != "table" or not _has_class(table, "student-grade-table"):
+            continue
+        for tbody in table.elements("tbody"):
+            for row in tbody.elements("tr"):
+                cells = [cell for cell in row.iter() if cell.tag == "td"]
+                rows.append([" ".join(cell.text().split()) for cell in cells])
+    return header["name"], header["student_id"], rows
+
+
+def _get_logged_in_page(session: PortalSession, path: str) -> str:
+    """
+    Fetches a page that needs a login.
+
+    Raises:
+        PermissionError: If the portal redirects to the login page because the session is not (or no longer)
+                         logged in.
+    """
+    final_url, html = session.get(session.url(path))
+    if LOGIN_PATH in urlsplit(final_url).path:
+        raise PermissionError("The portal session is not logged in.")
+    return html
+
+
+def create_driver(base_url: str = None) -> PortalSession:
+    """
+    Starts a browserless portal session, by default with PORTAL_URL. Named like the browser backends' create_driver
+    so they are interchangeable.
+    """
+    return PortalSession(base_url or PORTAL_URL)
+
+
+def login(session: PortalSession, username: str, password: str, timer: StageTimer = None):
+    """
+    Logs in to Colleague Self-Service by submitting the login form.
+
+    Raises:
+        PermissionError: If the portal rejects the credentials.
+    """
+    timer = timer or StageTimer()
+    with timer.stage("login"):
+        login_url, html = session.get(session.url(LOGIN_PATH))
+        action, form = parse_login_form(html)
+        form.update(UserName=username, Password=password)
+        final_url, _ = session.post(urljoin(login_url, action), form)
+        if LOGIN_PATH in urlsplit(final_url).path:
+            raise PermissionError("The portal rejected the username or password.")
+    print("Login submitted.")
+
+
+def fetch_records(session: PortalSession, timer: StageTimer = None) -> dict:
+    """
+    Fetches the logged-in student's information and grades as structured records.
+
+    Returns:
+        dict: name, student_id, information (the filtered My Progress lines, as in student_information.txt) and
+              courses, the (academic_year, section, title, credits, grade) rows in page order, where
+              academic_year is the starting year.
+
+    Raises:
+        PermissionError: If the session is not logged in.
+    """
+    timer = timer or StageTimer()
+    with timer.stage("my_progress"):
+        html = _get_logged_in_page(session, MY_PROGRESS_PATH)
+        information = filter_progress_text(parse_progress_page(html))
+
+    with timer.stage("grades_page"):
+        html = _get_logged_in_page(session, GRADES_PATH)
+
+    with timer.stage("table_scrape"):
+        student_name, student_id, rows = parse_grades_page(html)
+        courses = []
+        for cols in rows:
+            if len(cols) < 4:
+                continue
+            section = cols[0]
+            m = re.search(r"\d{4}-\d{2}-\d{2}", section)
+            if not m:
+                continue
+            year = infer_academic_year(m.group(0))
+            title, cred, grade = cols[1], cols[2], cols[3]
+            courses.append((year, section, title, cred, grade))
+
+    return {"name": student_name, "student_id": student_id, "information": information, "courses": courses}
+
+
+def extract(session: PortalSession, info_path: str = "student_information.txt",
+            grades_path: str = "printer_friendly_grades.txt", timer: StageTimer = None):
+    """
+    Extracts the student information and all grades of the logged-in student into the two output files.
+    """
+    timer = timer or StageTimer()
+    extraction = fetch_records(session, timer)
+    with timer.stage("write_files"):
+        write_transcript_files(extraction, info_path, grades_path)
+    print(f"Grades extracted to '{grades_path}'.")
+
+
+def main(argv):
+    run_extractor(sys.modules[__name__], argv)
+
+
+if __name__ == "__main__":
+    main(sys.argv)
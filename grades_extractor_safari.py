@@ -1,201 +1,188 @@
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import StaleElementReferenceException
-import time
 import sys
-import re
 
+from extractor_common import (LEAN_PROFILE, STAGE_TIMEOUTS, BackgroundTab, StageTimer, click_all, infer_academic_year,
+                              login_with_form, read_progress_information, record_page_load, run_extractor, scrape_page,
+                              sync_terms, wait_for_page_load, write_transcript_files)
+from term_sync import TermSync
 
-def extract_and_filter_information(output_file: str):
+
+LOGIN_URL = "https://collprodss.colleague.upei.ca/Student/Account/Login"
+MY_PROGRESS_URL = "https://collprodss.colleague.upei.ca/Student/Planning/Programs/MyProgress"
+GRADES_URL = "https://collprodss.colleague.upei.ca/Student/Student/Grades"
+
+
+def create_driver():
+    """
+    Starts a Safari session.
+
+    Safari has no request interception, so in lean mode (see LEAN_PROFILE) it only uses the 'eager' page load
+    strategy: navigation returns once the document is parsed instead of waiting for images, fonts and scripts.
     """
-    Extracts and formats relevant information dynamically from the 'My Progress' page and filters it.
+    from selenium import webdriver
+    from selenium.webdriver.safari.options import Options
+
+    options = Options()
+    if LEAN_PROFILE["enabled"]:
+        options.page_load_strategy = "eager"
+    return webdriver.Safari(options=options)
+
+
+def login(driver, username: str, password: str, timer: StageTimer = None):
+    """
+    Logs in to Colleague Self-Service and waits until the portal has accepted the credentials.
+
+    Raises:
+        PermissionError: If the portal rejects the credentials.
     """
-    try:
-        parent_container = WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.XPATH, "//*[contains(@id, 'programs-ataglance')]/div[2]/div[1]"))
+    login_with_form(driver, LOGIN_URL, username, password, timer)
+
+
+def fetch_records(driver, timer: StageTimer = None, sync: TermSync = None) -> dict:
+    """
+    Fetches the logged-in student's information and grades without writing any file.
+
+    With a TermSync, only the semesters that are new or not final yet are printed (one at a time), and the courses
+    of every stored semester are returned.
+
+    Returns:
+        dict: name, student_id, information (the filtered My Progress lines, as in student_information.txt) and
+              courses, the (academic_year, section, title, credits, grade) rows in page order.
+    """
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.webdriver.support.ui import WebDriverWait
+
+    timer = timer or StageTimer()
+
+    # Step 3-4: Load My Progress in a second tab while this one goes through the grades print flow, and extract
+    # the relevant information while the printable page renders (or at the end, if nothing was printed)
+    progress_tab = BackgroundTab(driver, MY_PROGRESS_URL)
+
+    def read_information():
+        return progress_tab.read(lambda d: read_progress_information(d, None, timer))
+
+    with timer.stage("grades_page"):
+        # Step 5: Navigate directly to Grades page and let the header and content fully load
+        timeout = STAGE_TIMEOUTS["grades_page"]
+        driver.get(GRADES_URL)
+        WebDriverWait(driver, timeout).until(
+            EC.presence_of_element_located((By.XPATH, "//input[@type='checkbox']"))
+        )
+        wait_for_page_load(driver, timeout)
+        print("Navigated directly to Grades page.")
+        record_page_load(driver, timer, "grades_page")
+
+        # —— NEW: explicitly locate Student Name and ID containers ——
+        WebDriverWait(driver, timeout).until(
+            EC.presence_of_element_located((By.XPATH, "//*[contains(text(),'Student Name:')]"))
         )
-        at_a_glance_text = parent_container.text
-
-        lines = at_a_glance_text.splitlines()
-        filtered_lines = []
-        current_title = None
-        majors_list = []
-        has_minors = False
-
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-
-            if line.endswith(":"):
-                if current_title and not current_title.startswith("Majors:"):
-                    filtered_lines.append(current_title)
-                current_title = line
-            else:
-                if current_title and current_title.startswith("Majors:"):
-                    majors_list.append(line.strip())
-                elif current_title:
-                    current_title += f" {line}"
-                else:
-                    filtered_lines.append(line)
-
-            if line.startswith("Minors:"):
-                has_minors = True
-
-        if majors_list:
-            majors_combined = ", ".join(majors_list)
-            filtered_lines.append(f"Majors: {majors_combined}")
-
-        if not has_minors:
-            filtered_lines.append("Minors: None")
-
-        final_filtered_lines = []
-        for line in filtered_lines:
-            if line.startswith("Cumulative GPA:"):
-                gpa_match = re.search(r"Cumulative GPA: ([0-9.]+)", line)
-                if gpa_match:
-                    final_filtered_lines.append(f"Cumulative GPA: {gpa_match.group(1)}")
-            elif line.startswith("Majors:") or line.startswith("Minors:"):
-                final_filtered_lines.append(line.strip())
-
-        with open(output_file, "w", encoding="utf-8") as file:
-            file.write("\n".join(final_filtered_lines))
-
-        print(f"Filtered information saved to {output_file}.")
-    except Exception as e:
-        print(f"Error during extraction: {e}")
-        with open("debug_full_page.txt", "w", encoding="utf-8") as debug_file:
-            debug_file.write(driver.page_source)
-        print("Saved full page content to 'debug_full_page.txt' for inspection.")
-
-
-def infer_academic_year(start_date):
+        # The actual text (value) is in the same parent element; read both parents in one script call
+        student, _ = scrape_page(
+            driver,
+            name="//*[contains(text(),'Student Name:')]/..",
+            student_id="//*[contains(text(),'Student ID:')]/..",
+        )
+        student_name = student["name"].split(":", 1)[1].strip()
+        student_id   = student["student_id"].split(":", 1)[1].strip()
+        print(f"Fetched Name: {student_name}, ID: {student_id}")
+
+    if sync is None:
+        with timer.stage("term_selection"):
+            # Step 6: Select all semesters in one script call
+            semesters = click_all(driver, "input[type='checkbox']", skip_checked=True)
+            print(f"All semesters selected ({len(semesters)} newly ticked).")
+        courses = print_selected_terms(driver, timer, read_information)
+    else:
+        # Step 6-8, one semester at a time for the semesters without final grades
+        changed = sync_terms(driver, sync, "input[type='checkbox']",
+                             lambda: print_selected_terms(driver, timer, read_information))
+        print(f"{changed} semester(s) changed since the last sync.")
+
+        # Keep the merged grades of every stored semester
+        sync.student = {"name": student_name, "student_id": student_id}
+        sync.save()
+        courses = sync.rows()
+
+    information = read_information()
+    return {"name": student_name, "student_id": student_id, "information": information, "courses": courses}
+
+
+def extract(driver, info_path: str = "student_information.txt", grades_path: str = "printer_friendly_grades.txt",
+            timer: StageTimer = None, sync: TermSync = None):
+    """
+    Extracts the student information and all grades of the logged-in student into the two output files.
     """
-    Infers the academic year from the start date.
+    timer = timer or StageTimer()
+    extraction = fetch_records(driver, timer, sync)
+
+    # Step 9: Save the information and grades
+    with timer.stage("write_files"):
+        write_transcript_files(extraction, info_path, grades_path)
+    print(f"Grades successfully extracted and saved to '{grades_path}'.")
+
+
+def print_selected_terms(driver, timer: StageTimer, while_rendering=None) -> list:
     """
-    year = int(start_date.split("-")[0])
-    month = int(start_date.split("-")[1])
-    if month < 9:
-        year -= 1
-    return year
-
-
-# Get credentials from command-line arguments
-username = sys.argv[1]
-password = sys.argv[2]
-
-driver = webdriver.Safari()
-
-try:
-    # Step 1: Open the login page
-    driver.get("https://collprodss.colleague.upei.ca/Student/Account/Login")
-
-    # Step 2: Log in
-    WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.ID, "UserName")))
-    username_input = driver.find_element(By.ID, "UserName")
-    password_input = driver.find_element(By.ID, "Password")
-
-    username_input.clear()
-    password_input.clear()
-    time.sleep(0.5)
-    username_input.send_keys(username)
-    time.sleep(0.5)
-    password_input.send_keys(password)
-    time.sleep(0.5)
-
-    # Explicitly click the submit button
-    login_button = driver.find_element(By.XPATH, "//button[@type='submit']")
-    driver.execute_script("arguments[0].click();", login_button)
-
-    # Give the site a moment to process login and redirect
-    time.sleep(1.5)
-    print("Login submitted.")
-
-    # Step 3: Navigate directly to My Progress
-    driver.get("https://collprodss.colleague.upei.ca/Student/Planning/Programs/MyProgress")
-    WebDriverWait(driver, 10).until(
-        EC.presence_of_element_located((By.XPATH, "//*[contains(@id, 'programs-ataglance')]/div[2]/div[1]"))
-    )
-    print("Navigated directly to My Progress page.")
-
-    # Step 4: Extract relevant information
-    extract_and_filter_information("student_information.txt")
-
-    # Step 5: Navigate directly to Grades page
-    driver.get("https://collprodss.colleague.upei.ca/Student/Student/Grades")
-    WebDriverWait(driver, 10).until(
-        EC.presence_of_element_located((By.XPATH, "//input[@type='checkbox']"))
-    )
-    time.sleep(2)  # let the header and content fully load
-    print("Navigated directly to Grades page.")
-
-    # —— NEW: explicitly locate Student Name and ID containers ——
-    name_label = WebDriverWait(driver, 10).until(
-        EC.presence_of_element_located((By.XPATH, "//*[contains(text(),'Student Name:')]"))
-    )
-    id_label = driver.find_element(By.XPATH, "//*[contains(text(),'Student ID:')]")
-
-    # The actual text (value) is in the same parent element; grab parent.text
-    name_container = name_label.find_element(By.XPATH, "..")
-    id_container = id_label.find_element(By.XPATH, "..")
-
-    student_name = name_container.text.split(":", 1)[1].strip()
-    student_id   = id_container.text.split(":", 1)[1].strip()
-
-    # Prepend to the student_information.txt
-    with open("student_information.txt", "r+", encoding="utf-8") as info_file:
-        existing = info_file.read()
-        info_file.seek(0)
-        info_file.write(f"Name: {student_name}\nStudent ID: {student_id}\n{existing}")
-    print(f"Fetched Name: {student_name}, ID: {student_id} → prepended to student_information.txt")
-
-    # Step 6: Select all semesters
-    checkboxes = driver.find_elements(By.XPATH, "//input[@type='checkbox']")
-    for checkbox in checkboxes:
+    Prints the ticked semesters and scrapes the printable grade table.
+
+    Args:
+        while_rendering (callable, optional): Called without arguments after Print was clicked, while the
+                                              printable page renders.
+
+    Returns:
+        list: The (academic_year, section, title, credits, grade) rows of the printed courses.
+    """
+    from selenium.common.exceptions import StaleElementReferenceException
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.webdriver.support.ui import WebDriverWait
+
+    table_xpath = "//table[contains(@class, 'student-grade-table')]"
+    row_xpath = table_xpath + "/tbody/tr"
+    # When semesters are printed one at a time, the previous semester's table is still on the page
+    previous_tables = driver.find_elements(By.XPATH, table_xpath)
+    previous_text = previous_tables[0].text if previous_tables else None
+
+    def table_replaced(d) -> bool:
         try:
-            if not checkbox.is_selected():
-                driver.execute_script("arguments[0].click();", checkbox)
+            return previous_tables[0].text != previous_text
         except StaleElementReferenceException:
-            continue
-    print("All semesters selected.")
-
-    # Step 7: Click the "Print" button
-    print_button = WebDriverWait(driver, 10).until(
-        EC.presence_of_element_located((By.ID, "print-grades-link"))
-    )
-    driver.execute_script("arguments[0].click();", print_button)
-    print("Clicked the Print button.")
-
-    # Step 8: Extract all grades
-    time.sleep(1)
-    course_rows = driver.find_elements(By.XPATH, "//table[contains(@class, 'student-grade-table')]/tbody/tr")
-    results = []
-
-    for row in course_rows:
-        cols = row.find_elements(By.TAG_NAME, "td")
-        if len(cols) >= 4:
-            section     = " ".join(cols[0].text.split())
-            title       = " ".join(cols[1].text.split())
-            credit      = " ".join(cols[2].text.split())
-            final_grade = " ".join(cols[3].text.split())
-            start_date  = section.split(" ")[-1]
-            year        = infer_academic_year(start_date)
-            results.append((year, f"{section} | {title} | {credit} credits | Final Grade: {final_grade}"))
-
-    # Step 9: Save grades
-    results.sort(key=lambda x: x[0])
-    with open("printer_friendly_grades.txt", "w", encoding="utf-8") as file:
-        current_year = None
-        for yr, details in results:
-            if yr != current_year:
-                if current_year is not None:
-                    file.write("\n")
-                file.write(f"--- Academic Year {yr}-{yr + 1} ---\n")
-                current_year = yr
-            file.write(f"{details}\n")
-
-    print("Grades successfully extracted and saved to 'printer_friendly_grades.txt'.")
-finally:
-    driver.quit()
+            return True
+
+    with timer.stage("print_tab"):
+        # Step 7: Click the "Print" button
+        print_button = WebDriverWait(driver, STAGE_TIMEOUTS["print_tab"]).until(
+            EC.presence_of_element_located((By.ID, "print-grades-link"))
+        )
+        driver.execute_script("arguments[0].click();", print_button)
+        print("Clicked the Print button.")
+
+    if while_rendering is not None:
+        while_rendering()
+
+    with timer.stage("table_scrape"):
+        # Step 8: Extract all grades once the printable table has rows, and is no longer the previous print's
+        if previous_tables:
+            WebDriverWait(driver, STAGE_TIMEOUTS["table_scrape"]).until(table_replaced)
+        WebDriverWait(driver, STAGE_TIMEOUTS["table_scrape"]).until(
+            EC.presence_of_element_located((By.XPATH, row_xpath))
+        )
+        record_page_load(driver, timer, "print_tab")
+        _, course_rows = scrape_page(driver, row_xpath)
+        results = []
+
+        for cols in course_rows:
+            if len(cols) >= 4:
+                section, title, credit, final_grade = cols[:4]
+                start_date  = section.split(" ")[-1]
+                year        = infer_academic_year(start_date)
+                results.append((year, section, title, credit, final_grade))
+    return results
+
+
+def main(argv):
+    run_extractor(sys.modules[__name__], argv)
+
+
+if __name__ == "__main__":
+    main(sys.argv)
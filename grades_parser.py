@@ -0,0 +1,259 @@
+import io
+import mmap
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+# Compiled once at import time and shared by every parse
+ACADEMIC_YEAR_PATTERN = re.compile(r"--- Academic Year (\d{4}-\d{4}) ---")
+COURSE_PATTERN = re.compile(r"^(.*?) \| (.*?) \| (\d+) credits \| Final Grade: (.*)$")
+# Starts each student's block in a concatenated multi-student export, e.g. "=== Student ID: 0373007 ==="
+STUDENT_HEADER_PATTERN = re.compile(r"=== Student ID: (.*?) ===")
+
+READ_BUFFER_SIZE = 1 << 20  # 1 MiB reads keep system calls rare on registrar-sized exports
+
+# Files smaller than this are parsed in-process; starting workers would cost more than it saves
+PARALLEL_MIN_FILE_SIZE = 8 << 20
+# Byte prefixes of the lines a file can safely be split in front of
+_SPLIT_MARKERS = (b"\n--- Academic Year ", b"\n=== Student ID: ")
+
+
+def iter_parsed_lines(lines, student_id: str = None, academic_year: str = None):
+    """
+    Parses grade file lines one at a time and yields what each meaningful line contains.
+
+    Args:
+        lines (iterable): The lines of a grades file (str).
+        student_id (str, optional): The student the first lines belong to, if known.
+        academic_year (str, optional): The academic year the first lines belong to, if known.
+
+    Yields:
+        tuple: ("student", student_id) for a student header,
+               ("year", student_id, academic_year) for an academic year header and
+               ("course", (student_id, academic_year, code, name, grade, credits)) for a course.
+               Courses before the first academic year header are skipped.
+    """
+    match_year = ACADEMIC_YEAR_PATTERN.match
+    match_course = COURSE_PATTERN.match
+    match_student = STUDENT_HEADER_PATTERN.match
+
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+
+        course = match_course(line)
+        if course:
+            if academic_year:
+                code = course.group(1).split()[0]
+                grade = course.group(4) or "N/A"
+                yield "course", (student_id, academic_year, code, course.group(2), grade, int(course.group(3)))
+            continue
+
+        year = match_year(line)
+        if year:
+            academic_year = year.group(1)
+            yield "year", student_id, academic_year
+            continue
+
+        student = match_student(line)
+        if student:
+            student_id, academic_year = student.group(1).strip(), None
+            yield "student", student_id
+
+
+def _iter_file_lines(file_path: str, use_mmap: bool = False):
+    """
+    Yields the lines of a UTF-8 text file through a large read buffer, or through a memory map.
+    """
+    if not use_mmap:
+        with open(file_path, "r", encoding="utf-8", buffering=READ_BUFFER_SIZE) as file:
+            yield from file
+        return
+
+    with open(file_path, "rb") as file:
+        try:
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # Empty files cannot be mapped
+            return
+        with mapped:
+            for line in iter(mapped.readline, b""):
+                yield line.decode("utf-8")
+
+
+def iter_grade_records(file_path: str, use_mmap: bool = False):
+    """
+    Streams the course records of a grades file without loading the whole file.
+
+    Args:
+        file_path (str): The grades file, holding one student or a concatenated multi-student export.
+        use_mmap (bool, optional): Read the file through a memory map instead of buffered reads.
+
+    Yields:
+        tuple: (student_id, academic_year, code, name, grade, credits). student_id is None until the first
+               student header, so it is always None for a single student's 'printer_friendly_grades.txt'.
+    """
+    for event in iter_parsed_lines(_iter_file_lines(file_path, use_mmap)):
+        if event[0] == "course":
+            yield event[1]
+
+
+def iter_students(file_path: str, use_mmap: bool = False):
+    """
+    Streams a concatenated multi-student export one student at a time.
+
+    Only one student's courses are held in memory at a time, so exports of any size can be processed.
+
+    Args:
+        file_path (str): The multi-student grades file.
+        use_mmap (bool, optional): Read the file through a memory map instead of buffered reads.
+
+    Yields:
+        tuple: (student_id, courses_by_year), where courses_by_year has the same shape parse_grades_file returns.
+               Courses before the first student header are yielded with a student_id of None.
+    """
+    return _group_by_student(iter_parsed_lines(_iter_file_lines(file_path, use_mmap)))
+
+
+def parse_grades_file(file_path: str, use_mmap: bool = False) -> dict:
+    """
+    Parses the grades file and organizes the courses by academic year.
+
+    Returns:
+        dict: Academic year (e.g. '2023-2024') -> list of (code, name, grade, credits), in file order.
+    """
+    return _group_by_year(iter_parsed_lines(_iter_file_lines(file_path, use_mmap)))
+
+
+def _group_by_year(events) -> dict:
+    """
+    Folds parsed-line events into {academic_year: [(code, name, grade, credits)]}.
+    """
+    parsed_courses_by_year = {}
+    for event in events:
+        if event[0] == "course":
+            _, academic_year, code, name, grade, credits = event[1]
+            parsed_courses_by_year[academic_year].append((code, name, grade, credits))
+        elif event[0] == "year":
+            parsed_courses_by_year.setdefault(event[2], [])
+    return parsed_courses_by_year
+
+
+def _group_by_student(events):
+    """
+    Folds parsed-line events into (student_id, courses_by_year) pairs, yielding each student once their block ends.
+    """
+    student_id, courses_by_year = None, {}
+    for event in events:
+        kind = event[0]
+        if kind == "course":
+            _, academic_year, code, name, grade, credits = event[1]
+            courses_by_year[academic_year].append((code, name, grade, credits))
+        elif kind == "year":
+            courses_by_year.setdefault(event[2], [])
+        else:
+            if student_id is not None or courses_by_year:
+                yield student_id, courses_by_year
+            student_id, courses_by_year = event[1], {}
+
+    if student_id is not None or courses_by_year:
+        yield student_id, courses_by_year
+
+
+def find_chunk_boundaries(mapped, chunk_count: int) -> list[int]:
+    """
+    Picks byte offsets that split a grades file into about chunk_count pieces, each starting at a header line.
+
+    Args:
+        mapped (mmap.mmap | bytes): The whole grades file.
+        chunk_count (int): The number of pieces wanted.
+
+    Returns:
+        list: Increasing offsets, starting with 0 and ending with the file size.
+    """
+    size = len(mapped)
+    boundaries = [0]
+    for i in range(1, chunk_count):
+        target = max(size * i // chunk_count, boundaries[-1]) - 1  # -1 so a header right at target is found
+        found = [pos for pos in (mapped.find(marker, target) for marker in _SPLIT_MARKERS) if pos != -1]
+        if not found:
+            break
+        boundary = min(found) + 1  # Start the chunk on the header line itself, after its newline
+        if boundary > boundaries[-1]:
+            boundaries.append(boundary)
+    boundaries.append(size)
+    return boundaries
+
+
+def _student_before(mapped, offset: int) -> str | None:
+    """
+    Returns the student ID of the last student header before an offset, or None if there is none.
+    """
+    marker = _SPLIT_MARKERS[1]
+    pos = mapped.rfind(marker, 0, offset)
+    if pos != -1:
+        line_start = pos + 1
+    elif mapped[:len(marker) - 1] == marker[1:]:  # The file itself starts with a student header
+        line_start = 0
+    else:
+        return None
+    line_end = mapped.find(b"\n", line_start)
+    header = mapped[line_start:line_end if line_end != -1 else len(mapped)].decode("utf-8").strip()
+    student = STUDENT_HEADER_PATTERN.match(header)
+    return student.group(1).strip() if student else None
+
+
+def _parse_chunk(job: tuple) -> list:
+    """
+    Parses the bytes [start, end) of a grades file in a worker process and returns their events.
+    """
+    file_path, start, end, student_id = job
+    with open(file_path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        text = mapped[start:end].decode("utf-8")
+    # Split into lines exactly as iterating the file in text mode does (only \n, \r\n and \r end a line), not with
+    # str.splitlines, which also splits on \x0b, \x0c, \x1c-\x1e, \x85 and \u2028
+    return list(iter_parsed_lines(io.StringIO(text, newline=None), student_id=student_id))
+
+
+def iter_parsed_lines_parallel(file_path: str, workers: int = None, chunk_count: int = None):
+    """
+    Parses a grades file in chunks across worker processes and yields its events in file order.
+
+    The file is memory-mapped and split only in front of academic year or student header lines, so each chunk
+    can be parsed on its own. Each chunk is told which student it starts in.
+
+    Args:
+        file_path (str): The grades file.
+        workers (int, optional): The number of worker processes. Defaults to the number of CPUs.
+        chunk_count (int, optional): The number of chunks. Defaults to four per worker.
+
+    Yields:
+        tuple: The same events as iter_parsed_lines.
+    """
+    workers = workers or os.cpu_count() or 1
+    if os.path.getsize(file_path) < PARALLEL_MIN_FILE_SIZE or workers == 1:
+        yield from iter_parsed_lines(_iter_file_lines(file_path))
+        return
+
+    with open(file_path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        boundaries = find_chunk_boundaries(mapped, chunk_count or workers * 4)
+        jobs = [(file_path, start, end, _student_before(mapped, start))
+                for start, end in zip(boundaries, boundaries[1:])]
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for events in pool.map(_parse_chunk, jobs):  # map() yields the chunks back in file order
+            yield from events
+
+
+def parse_grades_file_parallel(file_path: str, workers: int = None, chunk_count: int = None) -> dict:
+    """
+    Parses a (large) grades file across worker processes into the same structure as parse_grades_file.
+    """
+    return _group_by_year(iter_parsed_lines_parallel(file_path, workers, chunk_count))
+
+
+def iter_students_parallel(file_path: str, workers: int = None, chunk_count: int = None):
+    """
+    Parses a multi-student export across worker processes and yields the same pairs as iter_students.
+    """
+    return _group_by_student(iter_parsed_lines_parallel(file_path, workers, chunk_count))
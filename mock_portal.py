@@ -0,0 +1,227 @@
+import argparse
+import gzip
+import html
+import os
+import secrets
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from string import Template
+from urllib.parse import parse_qs, quote, urlsplit
+
+from grades_extractor_http import GRADES_PATH, LOGIN_PATH, MY_PROGRESS_PATH
+
+DEFAULT_PAGES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "mock_portal_pages")
+DEFAULT_ADDRESS = ("127.0.0.1", 8765)
+AUTH_COOKIE = ".ColleagueSelfServiceAuth"
+HOME_PATH = "/Student/"
+
+# Recorded page file for each portal path that needs a login
+_PAGE_FILES = {HOME_PATH: "home.html", MY_PROGRESS_PATH: "my_progress.html", GRADES_PATH: "grades.html"}
+
+
+def render_grades_page(student_name: str, student_id: str, courses) -> str:
+    """
+    Renders a printer-friendly grades page in the portal's markup.
+
+    Args:
+        student_name (str): The name in the page header.
+        student_id (str): The student ID in the page header.
+        courses (iterable): (section, title, credits, grade) of each row, e.g.
+                            ('CS-1910-01 2024-01-08 - 2024-04-25', 'Computer Science I', '3', '100').
+    """
+    rows = "".join(
+        f"""        <tr>
+          <td><span class="section">{html.escape(section)}</span></td>
+          <td>{html.escape(title)}</td>
+          <td>{html.escape(str(credits))}</td>
+          <td>{html.escape(grade)}</td>
+        </tr>
+""" for section, title, credits, grade in courses)
+    return f"""<!DOCTYPE html>
+<html lang="en">
+<head><meta charset="utf-8"><title>Grades - Colleague Self-Service</title></head>
+<body>
+  <div id="student-grades">
+    <div class="student-header">
+      <span>Student Name:</span> <span>{html.escape(student_name)}</span>
+    </div>
+    <div class="student-header">
+      <span>Student ID:</span> <span>{html.escape(student_id)}</span>
+    </div>
+    <table class="esg-table student-grade-table">
+      <thead>
+        <tr><th>Section</th><th>Title</th><th>Credits</th><th>Final Grade</th></tr>
+      </thead>
+      <tbody>
+{rows}      </tbody>
+    </table>
+  </div>
+</body>
+</html>
+"""
+
+
+class MockPortal(ThreadingHTTPServer):
+    """
+    A local stand-in for Colleague Self-Service that serves recorded pages, for offline tests and benchmarks.
+
+    It implements the parts of the portal the HTTP extractor relies on: the login form with its anti-forgery token,
+    the authentication cookie, redirects to the login page without it, keep-alive connections and gzip.
+
+    Attributes:
+        pages (dict): File name -> page HTML, e.g. 'grades.html'. The login page is a Template with a $token.
+        accounts (dict): Username -> password. If empty, any non-empty credentials log in.
+        requests (int): The number of requests answered so far.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address=DEFAULT_ADDRESS, pages_dir: str = DEFAULT_PAGES_DIR, pages: dict = None,
+                 accounts: dict = None):
+        self.pages = {}
+        for name in ("login.html", *_PAGE_FILES.values()):
+            with open(os.path.join(pages_dir, name), encoding="utf-8") as file:
+                self.pages[name] = file.read()
+        self.pages.update(pages or {})
+        self.accounts = accounts or {}
+        self.requests = 0
+        self.__tokens = set()
+        self.__sessions = set()
+        self.__lock = threading.Lock()
+        super().__init__(address, _PortalHandler)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def issue_token(self) -> str:
+        token = secrets.token_urlsafe(16)
+        with self.__lock:
+            self.__tokens.add(token)
+        return token
+
+    def log_in(self, form: dict) -> str | None:
+        """
+        Checks a submitted login form and returns a new session ID, or None if it is rejected.
+        """
+        username, password = form.get("UserName", ""), form.get("Password", "")
+        with self.__lock:
+            if form.get("__RequestVerificationToken") not in self.__tokens:
+                return None
+            self.__tokens.discard(form["__RequestVerificationToken"])
+            if self.accounts:
+                accepted = username in self.accounts and self.accounts[username] == password
+            else:
+                accepted = bool(username and password)
+            if not accepted:
+                return None
+            session = secrets.token_hex(16)
+            self.__sessions.add(session)
+        return session
+
+    def is_logged_in(self, session: str) -> bool:
+        with self.__lock:
+            return session in self.__sessions
+
+    def count_request(self) -> None:
+        with self.__lock:
+            self.requests += 1
+
+    def start(self) -> threading.Thread:
+        """
+        Serves requests on a background thread until shutdown() is called.
+        """
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return thread
+
+
+class _PortalHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep connections alive like the real portal
+    disable_nagle_algorithm = True  # Otherwise every kept-alive response waits for a delayed ACK
+
+    def do_GET(self):
+        self.server.count_request()
+        path = urlsplit(self.path).path
+        if path == LOGIN_PATH:
+            self.__send_page(Template(self.server.pages["login.html"]).safe_substitute(
+                token=self.server.issue_token(), error=""))
+        elif path in _PAGE_FILES:
+            if self.server.is_logged_in(self.__cookies().get(AUTH_COOKIE, "")):
+                self.__send_page(self.server.pages[_PAGE_FILES[path]])
+            else:
+                self.__redirect(f"{LOGIN_PATH}?ReturnUrl={quote(path)}")
+        else:
+            self.__send_page("<html><body><h1>Not Found</h1></body></html>", 404)
+
+    def do_POST(self):
+        self.server.count_request()
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0))).decode("utf-8")
+        if urlsplit(self.path).path != LOGIN_PATH:
+            self.__send_page("<html><body><h1>Method Not Allowed</h1></body></html>", 405)
+            return
+
+        form = {name: values[0] for name, values in parse_qs(body, keep_blank_values=True).items()}
+        session = self.server.log_in(form)
+        if session is None:
+            self.__send_page(Template(self.server.pages["login.html"]).safe_substitute(
+                token=self.server.issue_token(), error="The username or password is incorrect."))
+            return
+        self.__redirect(HOME_PATH, {"Set-Cookie": f"{AUTH_COOKIE}={session}; path=/; HttpOnly"})
+
+    def log_message(self, format, *args):
+        pass  # Keep benchmark and test output clean
+
+    def __cookies(self) -> dict:
+        cookies = {}
+        for pair in self.headers.get("Cookie", "").split(";"):
+            name, _, value = pair.strip().partition("=")
+            if name:
+                cookies[name] = value
+        return cookies
+
+    def __redirect(self, location: str, headers: dict = None) -> None:
+        self.send_response(302)
+        self.send_header("Location", location)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def __send_page(self, page: str, status: int = 200) -> None:
+        data = page.encode("utf-8")
+        gzipped = "gzip" in self.headers.get("Accept-Encoding", "")
+        if gzipped:
+            data = gzip.compress(data, compresslevel=5)
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        if gzipped:
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Serve recorded Colleague Self-Service pages for offline testing.")
+    parser.add_argument("--port", type=int, default=DEFAULT_ADDRESS[1])
+    parser.add_argument("--pages", default=DEFAULT_PAGES_DIR, help="Directory of recorded pages")
+    parser.add_argument("--account", action="append", default=[], metavar="USER:PASSWORD",
+                        help="Accepted credentials (repeatable). By default any non-empty credentials log in")
+    args = parser.parse_args(argv)
+
+    accounts = dict(account.split(":", 1) for account in args.account)
+    with MockPortal((DEFAULT_ADDRESS[0], args.port), args.pages, accounts=accounts) as portal:
+        print(f"Mock portal serving {args.pages} at {portal.base_url}")
+        print(f"Run an extractor against it with PORTAL_BASE_URL={portal.base_url}")
+        try:
+            portal.serve_forever()
+        except KeyboardInterrupt:
+            pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,258 @@
+import bisect
+import json
+
+# UPEI's grade bands as (lowest percentage, GPA, letter), highest band first. Anything below the last band is 0 / "F".
+UPEI_GRADE_BANDS = (
+    (91, 4.3, "A+"), (85, 4.0, "A"), (80, 3.7, "A-"),
+    (77, 3.3, "B+"), (74, 3.0, "B"), (70, 2.7, "B-"),
+    (67, 2.3, "C+"), (64, 2.0, "C"), (60, 1.7, "C-"),
+    (57, 1.3, "D+"), (54, 1.0, "D"), (50, 0.7, "D-"),
+)
+# UPEI's scholarship tiers as (minimum weighted average, amount), highest tier first
+UPEI_SCHOLARSHIP_TIERS = ((95, 3000), (90, 2000), (85, 1000), (80, 500))
+UPEI_MINIMUM_YEAR_CREDITS = 18  # Credit hours a year needs before it can earn a scholarship
+
+
+class GradingScale(object):
+    """
+    A percentage -> (GPA, letter) scale, compiled into a sorted threshold array searched with bisect.
+
+    Attributes:
+        name (str): The scale's name.
+        bands (tuple): (lowest percentage, GPA, letter) bands, highest band first, as configured.
+        failing (tuple): The (GPA, letter) below the lowest band and outside 0-100.
+        __thresholds (list): The lowest percentage of each band, ascending.
+        __grades (list): The (GPA, letter) below the first threshold, then of each band, in the same order.
+    """
+
+    def __init__(self, name: str, bands, failing: tuple = (0, "F")):
+        """
+        Compiles a grading scale.
+
+        Args:
+            name (str): The scale's name.
+            bands (iterable): (lowest percentage, GPA, letter) bands, in any order.
+            failing (tuple, optional): The (GPA, letter) of a percentage below every band.
+
+        Raises:
+            ValueError: If the scale has no bands, two bands start at the same percentage, or a band starts
+                        outside 0-100 or has a negative GPA.
+        """
+        bands = tuple(sorted(((int(lowest), gpa, str(letter)) for lowest, gpa, letter in bands), reverse=True))
+        if not bands:
+            raise ValueError(f"Grading scale {name!r} has no bands.")
+        thresholds = [lowest for lowest, _, _ in reversed(bands)]
+        if len(set(thresholds)) != len(thresholds):
+            raise ValueError(f"Grading scale {name!r} has two bands starting at the same percentage.")
+        if thresholds[0] < 0 or thresholds[-1] > 100 or any(gpa < 0 for _, gpa, _ in bands):
+            raise ValueError(f"Grading scale {name!r} has a band outside 0-100 or a negative GPA.")
+
+        self.name = name
+        self.bands = bands
+        self.failing = tuple(failing)
+        self.__thresholds = thresholds
+        self.__grades = [self.failing] + [(gpa, letter) for _, gpa, letter in reversed(bands)]
+
+    def grade(self, percentage: int) -> tuple:
+        """
+        Returns the (GPA, letter) of a numeric percentage; percentages outside 0-100 fail.
+        """
+        if 0 <= percentage <= 100:
+            return self.__grades[bisect.bisect_right(self.__thresholds, percentage)]
+        return self.failing
+
+    def gpa(self, percentage: int) -> float:
+        return self.grade(percentage)[0]
+
+    def letter(self, percentage: int) -> str:
+        return self.grade(percentage)[1]
+
+
+class ScholarshipPolicy(object):
+    """
+    A scholarship policy: the grading scale its GPAs use, the tier table and the year's credit minimum. The tier
+    table is compiled into a sorted threshold array searched with bisect.
+
+    Attributes:
+        name (str): The policy's name, e.g. 'upei-2024'.
+        grading_scale (GradingScale): The scale GPAs are computed with.
+        tiers (tuple): (minimum weighted average, amount) tiers, highest tier first.
+        minimum_credits (int): The credit hours a year needs before it can earn a scholarship.
+        __minimums (list): The minimum average of each tier, ascending.
+        __amounts (list): The amount of each tier, in the same order.
+    """
+
+    def __init__(self, name: str, grading_scale: GradingScale, tiers, minimum_credits: int):
+        """
+        Compiles a scholarship policy.
+
+        Raises:
+            ValueError: If the policy has no tiers, two tiers share a minimum, or minimum_credits is negative.
+        """
+        tiers = tuple(sorted(((minimum, int(amount)) for minimum, amount in tiers), reverse=True))
+        if not tiers:
+            raise ValueError(f"Scholarship policy {name!r} has no tiers.")
+        minimums = [minimum for minimum, _ in reversed(tiers)]
+        if len(set(minimums)) != len(minimums):
+            raise ValueError(f"Scholarship policy {name!r} has two tiers with the same minimum average.")
+        if minimum_credits < 0:
+            raise ValueError(f"Scholarship policy {name!r} has a negative credit minimum.")
+
+        self.name = name
+        self.grading_scale = grading_scale
+        self.tiers = tiers
+        self.minimum_credits = minimum_credits
+        self.__minimums = minimums
+        self.__amounts = [amount for _, amount in reversed(tiers)]
+
+    def tier_for(self, weighted_average: float) -> tuple | None:
+        """
+        Returns the (minimum weighted average, amount) tier an average reaches, or None.
+        """
+        index = bisect.bisect_right(self.__minimums, weighted_average) - 1
+        return (self.__minimums[index], self.__amounts[index]) if index >= 0 else None
+
+    def scholarship_result(self, academic_year: int, total_weighted_marks: float, total_credit_hours: int) -> dict:
+        """
+        Decides the scholarship for a year from its weighted mark total and credit hours.
+
+        Args:
+            academic_year (int): The academic year the totals belong to.
+            total_weighted_marks (float): The sum of percentage times credit hours for the year.
+            total_credit_hours (int): The credit hours counted for the year.
+
+        Returns:
+            dict: The scholarship result with the keys
+                  academic_year, credit_hours,
+                  weighted_average (float, or None without credit hours),
+                  status ("no_courses", "insufficient_credits", "no_scholarship" or "awarded"),
+                  tier (the minimum average of the awarded tier, or None) and amount (0 if nothing is awarded).
+        """
+        result = {
+            "academic_year": academic_year,
+            "credit_hours": total_credit_hours,
+            "weighted_average": total_weighted_marks / total_credit_hours if total_credit_hours else None,
+            "status": "no_scholarship",
+            "tier": None,
+            "amount": 0,
+        }
+        if total_credit_hours == 0:
+            result["status"] = "no_courses"
+        elif total_credit_hours < self.minimum_credits:
+            result["status"] = "insufficient_credits"
+        elif result["weighted_average"] <= 100:
+            tier = self.tier_for(result["weighted_average"])
+            if tier is not None:
+                result.update(status="awarded", tier=tier[0], amount=tier[1])
+        return result
+
+    def format_scholarship(self, result: dict, label: str = None) -> str:
+        """
+        Formats a scholarship result as a message.
+
+        Args:
+            result (dict): A result from scholarship_result.
+            label (str, optional): How to name the year. Defaults to "Year <academic_year>".
+        """
+        label = label or f"Year {result['academic_year']}"
+        if result["status"] == "no_courses":
+            return f"{label} - No courses taken in the academic year to calculate scholarship."
+        elif result["status"] == "insufficient_credits":
+            return (f"{label} - Not enough courses taken in the academic year to calculate scholarship."
+                    f" Minimum year credits required: {self.minimum_credits}, current credits: {result['credit_hours']}"
+                    )
+        elif result["status"] == "awarded":
+            return f"{label} - Weighted Average: {result['weighted_average']:.2f}, ${result['amount']} Scholarship"
+        else:
+            lowest_tier = self.__minimums[0]
+            return (f"{label} - No Scholarship: Weighted Average must be higher than {lowest_tier - 1}%. Current:"
+                    f" {result['weighted_average']:.2f}")
+
+
+DEFAULT_GRADING_SCALE = GradingScale("upei", UPEI_GRADE_BANDS)
+DEFAULT_POLICY = ScholarshipPolicy("upei", DEFAULT_GRADING_SCALE, UPEI_SCHOLARSHIP_TIERS, UPEI_MINIMUM_YEAR_CREDITS)
+
+
+def load_policies(path: str) -> dict:
+    """
+    Loads and compiles the scholarship policies of a JSON config file of the form
+
+        {"grading_scales": {"upei": {"bands": [[91, 4.3, "A+"], ...], "failing": [0, "F"]}},
+         "policies": {"upei-2024": {"grading_scale": "upei", "tiers": [[95, 3000], ...], "minimum_credits": 18}}}
+
+    "failing" is optional, and a policy without "grading_scale" uses the default UPEI scale.
+
+    Returns:
+        dict: Policy name -> ScholarshipPolicy, in the order of the file.
+
+    Raises:
+        ValueError: If the file is not valid JSON, has no policies or an invalid scale or policy.
+        KeyError: If a policy names a grading scale the file does not define.
+    """
+    with open(path, "r", encoding="utf-8") as file:
+        config = json.load(file)
+    scales = {name: GradingScale(name, scale["bands"], scale.get("failing", (0, "F")))
+              for name, scale in config.get("grading_scales", {}).items()}
+    policies = {}
+    for name, policy in config.get("policies", {}).items():
+        scale_name = policy.get("grading_scale")
+        if scale_name is not None and scale_name not in scales:
+            raise KeyError(f"Policy {name!r} uses the undefined grading scale {scale_name!r}")
+        policies[name] = ScholarshipPolicy(name, scales[scale_name] if scale_name else DEFAULT_GRADING_SCALE,
+                                           policy["tiers"], policy["minimum_credits"])
+    if not policies:
+        raise ValueError(f"{path} defines no policies.")
+    return policies
+
+
+def evaluate_policies(courses, policies, academic_years=None) -> dict:
+    """
+    Evaluates one student's courses under several policies in a single pass over the courses.
+
+    The year totals and the best attempt at each course do not depend on the policy (attempts are compared by
+    percentage), so they are collected once; each policy then only looks up the GPA of the best attempts in its
+    own scale and its tiers for each year. The courses' Mark objects are never rebuilt.
+
+    Args:
+        courses: A Courses or ColumnarCourses.
+        policies (iterable): The ScholarshipPolicy objects to evaluate.
+        academic_years (iterable, optional): The academic years to report. Defaults to every year with courses.
+
+    Returns:
+        dict: Policy name -> {"cumulative_gpa": the CGPA (float, or None without counted courses), "credit_hours":
+              the CGPA's credit hours, "scholarships": academic year -> scholarship result}.
+    """
+    from Courses import EXCLUDED_FROM_GPA, base_course_code  # Lazy import, as Courses builds on this module
+
+    year_totals, best_attempts = {}, {}
+    for course_code, _, mark, credit_hours, academic_year in courses.get_courses():
+        totals = year_totals.setdefault(academic_year, [0, 0])
+        if isinstance(mark.percentage, (int, float)):
+            totals[0] += mark.percentage * credit_hours
+            totals[1] += credit_hours
+        elif mark.percentage == "E":
+            totals[1] += credit_hours
+
+        # The same best-attempt rule as Courses: only a strictly higher mark replaces an earlier attempt
+        if mark.percentage in EXCLUDED_FROM_GPA or not isinstance(mark.gpa, (int, float)):
+            continue
+        base_code = base_course_code(course_code)
+        best = best_attempts.get(base_code)
+        if best is None or mark.get_comparable_percentage() > best[0]:
+            best_attempts[base_code] = (mark.get_comparable_percentage(), credit_hours)
+
+    if academic_years is None:
+        academic_years = sorted(year_totals)
+    academic_years = list(academic_years)
+    credit_hours = sum(credits for _, credits in best_attempts.values())
+    results = {}
+    for policy in policies:
+        scale = policy.grading_scale
+        total_weighted_gpa = sum(scale.gpa(percentage) * credits for percentage, credits in best_attempts.values())
+        results[policy.name] = {
+            "cumulative_gpa": round(total_weighted_gpa, 9) / credit_hours if credit_hours else None,
+            "credit_hours": credit_hours,
+            "scholarships": {year: policy.scholarship_result(year, *year_totals.get(year, (0, 0)))
+                             for year in academic_years},
+        }
+    return results
@@ -0,0 +1,176 @@
+import io
+
+SEPARATOR = "=" * 100
+DEFAULT_BUFFER_SIZE = 1 << 16  # Characters collected before they are passed on to the stream
+
+
+class ReportWriter(object):
+    """
+    A write buffer in front of a text stream (stdout, a file, a pipe), so a report made of many short lines
+    reaches the stream in a few large writes.
+
+    Use it as a context manager, or call flush() when done; the stream itself is never closed.
+
+    Attributes:
+        __stream (TextIO): The stream the report goes to.
+        __buffer_size (int): The number of buffered characters that triggers a flush.
+        __parts (list): The strings written since the last flush.
+        __size (int): Their total length.
+    """
+
+    def __init__(self, stream, buffer_size: int = DEFAULT_BUFFER_SIZE):
+        self.__stream = stream
+        self.__buffer_size = buffer_size
+        self.__parts = []
+        self.__size = 0
+
+    def write(self, text: str) -> None:
+        self.__parts.append(text)
+        self.__size += len(text)
+        if self.__size >= self.__buffer_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Passes the buffered text on to the stream and flushes it.
+        """
+        if self.__parts:
+            self.__stream.write("".join(self.__parts))
+            self.__parts.clear()
+            self.__size = 0
+        self.__stream.flush()
+
+    def __enter__(self) -> "ReportWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.flush()
+
+
+def sort_courses_by_year(courses) -> dict:
+    """
+    Groups course rows by academic year, each year sorted by subject prefix (e.g. 'CS', 'MATH') and then best
+    mark first, keeping the order the courses were added on ties.
+
+    The sort keys are computed once per course while grouping, and each year is ordered by two stable sorts on
+    those plain keys (mark, then prefix) instead of comparing a key tuple per course.
+
+    Args:
+        courses (iterable): (course_code, course_name, mark, credit_hours, academic_year) tuples.
+
+    Returns:
+        dict: Academic year -> list of (course_code, course_name, mark, credit_hours), in ascending year order.
+    """
+    grouped = {}  # Academic year -> (courses, prefixes, negated comparable percentages)
+    for code, name, mark, credits, year in courses:
+        if year not in grouped:
+            grouped[year] = ([], [], [])
+        year_courses, prefixes, percentages = grouped[year]
+        year_courses.append((code, name, mark, credits))
+        prefixes.append(code.split('-', 1)[0])
+        percentages.append(-mark.get_comparable_percentage())
+
+    courses_by_year = {}
+    for year in sorted(grouped):
+        year_courses, prefixes, percentages = grouped[year]
+        order = sorted(range(len(year_courses)), key=percentages.__getitem__)
+        order.sort(key=prefixes.__getitem__)
+        courses_by_year[year] = [year_courses[i] for i in order]
+    return courses_by_year
+
+
+def write_courses(stream, courses) -> None:
+    """
+    Writes the 'Completed Courses by year' report of Courses.__str__, see sort_courses_by_year for the order.
+
+    Args:
+        stream: A text stream or ReportWriter.
+        courses (iterable): (course_code, course_name, mark, credit_hours, academic_year) tuples.
+    """
+    stream.write("Completed Courses by year:\n")
+    for year, year_courses in sort_courses_by_year(courses).items():
+        stream.write(f"\nYear {year}:\n{SEPARATOR}\n")
+        width = len(str(len(year_courses)))
+        stream.write("".join([f"{i:>{width}}. Course: {code} ({name}), {mark}, Credit Hours: {credits}\n"
+                              for i, (code, name, mark, credits) in enumerate(year_courses, start=1)]))
+        stream.write(SEPARATOR + "\n")
+
+
+def write_student_header(stream, name: str, student_id, majors: str, minors: str, cumulative_gpa: str) -> None:
+    """
+    Writes the name, ID, programs and cumulative GPA that head a student's report, closed by a separator line.
+
+    Args:
+        majors (str): The majors as displayed, e.g. 'Computer Science, Mathematics'.
+        minors (str): The minors as displayed, or 'None'.
+        cumulative_gpa (str): The message of calculate_cumulative_gpa.
+    """
+    stream.write(f"Name: {name}\nStudent ID: {student_id}\nMajor(s): {majors}\nMinor(s): {minors}\n"
+                 f"{cumulative_gpa}\n{SEPARATOR}\n")
+
+
+def write_transcript(stream, transcript: dict) -> None:
+    """
+    Writes the report Main.py prints for a transcript loaded by load_transcript: the student header, the courses of
+    each academic year in the order they were read, and the scholarship of each year.
+
+    Args:
+        stream: A text stream or ReportWriter.
+        transcript (dict): A transcript as returned by Main.load_transcript or Main.transcript_from_records.
+    """
+    from Courses import Courses  # Lazy import, as Courses renders its own report through this module
+    academic_years = transcript["academic_years"]
+    courses_obj = transcript["student"].get_courses()
+    write_student_header(stream, transcript["name"], transcript["student_id"],
+                         ", ".join(m.title() for m in transcript["majors"]),
+                         ", ".join(m.title() for m in transcript["minors"]) or "None",
+                         courses_obj.calculate_cumulative_gpa())
+
+    stream.write("Completed Courses by year:\n")
+    courses_by_idx = {}
+    for code, cname, mark, creds, year_idx in courses_obj.get_courses():
+        courses_by_idx.setdefault(year_idx, []).append((code, cname, mark, creds))
+    for idx, span in enumerate(academic_years, start=1):
+        stream.write(f"\nAcademic Year {span} (year {idx}):\n{SEPARATOR}\n")
+        for i, (code, cname, mark, creds) in enumerate(courses_by_idx.get(idx, ()), start=1):
+            stream.write(f"{i}. Course: {code} ({cname}), {mark}, Credit Hours: {creds}\n")
+        stream.write(SEPARATOR + "\n")
+
+    stream.write(f"\nScholarship Eligibility:\n{SEPARATOR}\n")
+    scholarships = courses_obj.calculate_all_scholarships(range(1, len(academic_years) + 1))
+    for idx, span in enumerate(academic_years, start=1):
+        stream.write(Courses.format_scholarship(scholarships[idx], f"Academic Year {span} (year {idx})") + "\n")
+
+
+def write_cohort_report(stream, transcripts, buffer_size: int = DEFAULT_BUFFER_SIZE) -> int:
+    """
+    Writes the report of every transcript, one after the other with a blank line in between.
+
+    Transcripts are rendered as they come, so a generator of transcripts is reported with only one of them in
+    memory at a time.
+
+    Args:
+        stream: A text stream, e.g. a file opened for writing.
+        transcripts (iterable): Transcripts as returned by Main.load_transcript.
+        buffer_size (int, optional): See ReportWriter.
+
+    Returns:
+        int: The number of transcripts written.
+    """
+    count = 0
+    with ReportWriter(stream, buffer_size) as writer:
+        for transcript in transcripts:
+            if count:
+                writer.write("\n")
+            write_transcript(writer, transcript)
+            count += 1
+    return count
+
+
+def render(write, *args) -> str:
+    """
+    Returns what a write_* function of this module writes, as a string, e.g. render(write_transcript, transcript).
+    """
+    stream = io.StringIO()
+    write(stream, *args)
+    return stream.getvalue()
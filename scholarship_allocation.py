@@ -0,0 +1,134 @@
+import argparse
+import csv
+import heapq
+import sys
+
+from policies import DEFAULT_POLICY, ScholarshipPolicy, load_policies
+
+TIE_POLICIES = ("rank", "group")
+
+
+def tier_amount(weighted_average: float, policy: ScholarshipPolicy = DEFAULT_POLICY) -> int:
+    """
+    Returns the amount of the highest tier of a policy a weighted average reaches, or 0, with the same rules as
+    ScholarshipPolicy.scholarship_result (an average above 100 is never awarded).
+
+    Args:
+        weighted_average (float): The year's weighted average.
+        policy (ScholarshipPolicy, optional): The policy whose tiers apply. Defaults to the UPEI policy.
+    """
+    if weighted_average is None or weighted_average > 100:
+        return 0
+    tier = policy.tier_for(weighted_average)
+    return tier[1] if tier is not None else 0
+
+
+def allocate_scholarships(candidates, budget: int, policy: ScholarshipPolicy = DEFAULT_POLICY,
+                          ties: str = "rank") -> dict:
+    """
+    Awards scholarships across a cohort in merit order until a fixed budget runs out.
+
+    Candidates are ranked by weighted average, best first; equal averages are ordered by student ID and then
+    academic year, so the same cohort always gets the same awards. Each candidate in rank order gets the amount
+    of their tier until the next award no longer fits the remaining budget; nobody ranked below that candidate
+    is funded either, so a lower average never takes an award from a higher one.
+
+    The ranking is a partial sort: the candidates are heapified in linear time and only the funded ones (plus the
+    one that stops the allocation) are popped, which is what keeps hundreds of thousands of candidates fast.
+
+    Args:
+        candidates (iterable): (student_id, academic_year, weighted_average) tuples, one per student and year
+                               with enough credit hours for the policy (see TranscriptStore.scholarship_candidates).
+                               Candidates below the lowest tier are ignored.
+        budget (int): The total amount available.
+        policy (ScholarshipPolicy, optional): The policy whose tiers decide the amounts. Defaults to the UPEI
+                                              policy.
+        ties (str, optional): "rank" funds a tie in student ID order as far as the budget goes; "group" funds
+                              everyone with the same average or none of them.
+
+    Returns:
+        dict: awards (dicts with rank, student_id, academic_year, weighted_average and amount, in rank order),
+              spent, remaining, eligible (the number of candidates reaching a tier) and cutoff (the weighted
+              average of the last award, or None).
+
+    Raises:
+        ValueError: If the budget is negative or ties is not a known policy.
+    """
+    if budget < 0:
+        raise ValueError("The budget cannot be negative.")
+    if ties not in TIE_POLICIES:
+        raise ValueError(f"ties must be one of {', '.join(TIE_POLICIES)}, got {ties!r}")
+
+    lowest_tier = policy.tiers[-1][0]
+    heap = [(-weighted_average, student_id, academic_year)
+            for student_id, academic_year, weighted_average in candidates
+            if weighted_average is not None and lowest_tier <= weighted_average <= 100]
+    eligible = len(heap)
+    heapq.heapify(heap)
+
+    awards, remaining = [], budget
+    while heap:
+        negated_average, student_id, academic_year = heapq.heappop(heap)
+        amount = tier_amount(-negated_average, policy)
+        group = [(student_id, academic_year)]
+        if ties == "group":
+            while heap and heap[0][0] == negated_average:
+                group.append(heapq.heappop(heap)[1:])
+        if amount * len(group) > remaining:
+            break
+        for student_id, academic_year in group:
+            awards.append({"rank": len(awards) + 1, "student_id": student_id, "academic_year": academic_year,
+                           "weighted_average": -negated_average, "amount": amount})
+        remaining -= amount * len(group)
+
+    return {
+        "awards": awards,
+        "spent": budget - remaining,
+        "remaining": remaining,
+        "eligible": eligible,
+        "cutoff": awards[-1]["weighted_average"] if awards else None,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Allocate a fixed scholarship budget across a stored cohort.")
+    parser.add_argument("budget", type=int, help="The total amount available")
+    parser.add_argument("--db", default=None, help="The transcript database (default: transcripts.db)")
+    parser.add_argument("--academic-year", default=None, help="Only allocate awards for this year, e.g. 2023-2024")
+    parser.add_argument("--policies", default=None, help="A JSON file of scholarship policies (see policies.py)")
+    parser.add_argument("--policy", default=None,
+                        help="The policy of --policies to allocate under (default: the first in the file)")
+    parser.add_argument("--ties", choices=TIE_POLICIES, default="rank",
+                        help="rank: fund ties in student ID order; group: fund a whole tie or none of it")
+    parser.add_argument("-o", "--output", default="scholarship_awards.csv", help="The CSV file of awards")
+    args = parser.parse_args(argv)
+    if args.budget < 0:
+        parser.error("budget cannot be negative")
+    if args.policy and not args.policies:
+        parser.error("--policy needs --policies")
+
+    policy = DEFAULT_POLICY
+    if args.policies:
+        policies = load_policies(args.policies)
+        if args.policy and args.policy not in policies:
+            parser.error(f"{args.policies} has no policy {args.policy!r}")
+        policy = policies[args.policy] if args.policy else next(iter(policies.values()))
+
+    from transcript_store import DEFAULT_DATABASE, TranscriptStore
+    with TranscriptStore(args.db or DEFAULT_DATABASE) as store:
+        candidates = store.scholarship_candidates(args.academic_year, policy.minimum_credits)
+    allocation = allocate_scholarships(candidates, args.budget, policy, ties=args.ties)
+
+    with open(args.output, "w", encoding="utf-8", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(("rank", "student_id", "academic_year", "weighted_average", "amount"))
+        writer.writerows((a["rank"], a["student_id"], a["academic_year"], f"{a['weighted_average']:.2f}", a["amount"])
+                         for a in allocation["awards"])
+    cutoff = f"{allocation['cutoff']:.2f}" if allocation["cutoff"] is not None else "none"
+    print(f"Awarded {len(allocation['awards'])} of {allocation['eligible']} eligible candidates, "
+          f"${allocation['spent']} spent, ${allocation['remaining']} left, cutoff average {cutoff} → {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
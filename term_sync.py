@@ -0,0 +1,144 @@
+import datetime
+import hashlib
+import json
+import os
+import re
+import tempfile
+
+SYNC_STATE_NAME = ".term_sync.json"
+SYNC_FORMAT_VERSION = 2  # Bump whenever the stored rows change shape, so old state is simply refetched
+_DATE_PATTERN = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+
+def _rows_hash(rows: list) -> str:
+    return hashlib.sha256(json.dumps(rows).encode("utf-8")).hexdigest()
+
+
+def _owner_fingerprint(owner: str) -> str:
+    """
+    Identifies the account a sync state belongs to without writing the username into the state file.
+    """
+    return hashlib.sha256(owner.encode("utf-8")).hexdigest()
+
+
+def is_term_final(rows: list, today: datetime.date = None) -> bool:
+    """
+    Tells whether a term's grades can no longer change: every section has ended and has a final grade.
+
+    Sections without credits (e.g. labs) never get a grade, so they do not keep a term open. A term without any
+    sections is never final, since its courses may not have been posted yet.
+
+    Args:
+        rows (list): The term's (academic_year, section, title, credits, grade) course rows.
+        today (datetime.date, optional): Defaults to the current date.
+    """
+    if not rows:
+        return False
+    today = (today or datetime.date.today()).isoformat()
+    for _, section, _, credits, grade in rows:
+        dates = _DATE_PATTERN.findall(section)
+        if not dates or dates[-1] >= today:  # ISO dates compare correctly as strings
+            return False
+        if credits.strip() not in ("0", "") and not grade.strip():
+            return False
+    return True
+
+
+class TermSync(object):
+    """
+    Remembers the terms already captured from the portal, so a sync only prints the new and in-progress ones.
+
+    For each term label (as shown on the print page) it keeps the scraped course rows, a content hash and whether
+    the term is final. The stored terms are merged back into a complete transcript after each sync.
+    The state is a JSON file, by default '.term_sync.json' next to the grades file. It belongs to one account: a
+    state saved by another account (e.g. a second student fetched into the same directory) is thrown away, so that
+    account's sync fetches every term and never sees the first account's rows or name.
+
+    Attributes:
+        __state_path (str): The JSON state file.
+        __owner (str): A fingerprint of the username the state belongs to.
+        __terms (dict): Term label -> {"hash", "final", "rows"}, in page order.
+        student (dict | None): {"name", "student_id"} as last printed, or None before the first sync.
+    """
+
+    def __init__(self, state_path: str, owner: str):
+        """
+        Loads the sync state of an account.
+
+        Args:
+            state_path (str): The JSON state file.
+            owner (str): The portal username the transcript is fetched for.
+        """
+        self.__state_path = state_path
+        self.__owner = _owner_fingerprint(owner)
+        self.__terms = {}
+        self.student = None
+        try:
+            with open(state_path, "r", encoding="utf-8") as file:
+                state = json.load(file)
+        except (FileNotFoundError, ValueError):  # No usable state yet: the first sync fetches every term
+            return
+        if state.get("version") != SYNC_FORMAT_VERSION or state.get("owner") != self.__owner:
+            return  # Another account's (or an older format's) state: start over with a full fetch
+        self.student = state.get("student")
+        self.__terms = {label: {"hash": term["hash"], "final": term["final"],
+                                "rows": [tuple(row) for row in term["rows"]]}
+                        for label, term in state["terms"].items()}
+
+    @staticmethod
+    def beside(grades_path: str, owner: str) -> "TermSync":
+        """
+        Returns an account's sync state kept next to a grades file.
+        """
+        return TermSync(os.path.join(os.path.dirname(os.path.abspath(grades_path)), SYNC_STATE_NAME), owner)
+
+    def terms_to_fetch(self, labels: list) -> list:
+        """
+        Returns the labels, in page order, of the terms that are new or not final yet.
+        """
+        return [label for label in labels if not self.__terms.get(label, {}).get("final", False)]
+
+    def update(self, label: str, rows: list) -> bool:
+        """
+        Stores a freshly scraped term.
+
+        Args:
+            label (str): The term label.
+            rows (list): The term's (academic_year, section, title, credits, grade) course rows.
+
+        Returns:
+            bool: True if the term is new or its courses changed since the last sync.
+        """
+        digest = _rows_hash(rows)
+        changed = self.__terms.get(label, {}).get("hash") != digest
+        self.__terms[label] = {"hash": digest, "final": is_term_final(rows), "rows": list(rows)}
+        return changed
+
+    def retain(self, labels: list) -> None:
+        """
+        Keeps only the terms still listed on the portal, in the order the portal lists them.
+        """
+        self.__terms = {label: self.__terms[label] for label in labels if label in self.__terms}
+
+    def rows(self) -> list:
+        """
+        Returns the stored course rows of every term, in term order.
+        """
+        return [row for term in self.__terms.values() for row in term["rows"]]
+
+    def save(self) -> None:
+        """
+        Writes the state atomically, so an interrupted sync keeps the previous state.
+        """
+        state = {"version": SYNC_FORMAT_VERSION, "owner": self.__owner, "student": self.student,
+                 "terms": {label: {"hash": term["hash"], "final": term["final"], "rows": term["rows"]}
+                           for label, term in self.__terms.items()}}
+        directory = os.path.dirname(os.path.abspath(self.__state_path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as file:
+                json.dump(state, file, indent=1)
+            os.replace(tmp_path, self.__state_path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
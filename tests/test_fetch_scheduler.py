@@ -0,0 +1,110 @@
+import json
+import os
+import sys
+import tempfile
+import types
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import extractor_common
+import extractor_service
+import fetch_scheduler
+from extractor_common import login_with_form
+
+LOGIN_URL = "https://portal.example/Student/Account/Login"
+
+
+class _Element(object):
+    def is_displayed(self):
+        return True
+
+    def is_enabled(self):
+        return True
+
+    def clear(self):
+        pass
+
+    def send_keys(self, text):
+        pass
+
+    def submit(self):
+        pass
+
+
+class _LoginPage(object):
+    """
+    Stands in for a browser on the portal's login page. The portal answers every login with the page again and
+    the error banner, unless rejected is False, in which case it stays on the login page without any answer.
+    """
+
+    def __init__(self, rejected: bool = True):
+        self.rejected = rejected
+        self.current_url = None
+
+    def get(self, url):
+        self.current_url = url
+
+    def find_element(self, by, value):
+        return _Element()
+
+    def execute_script(self, script, *args):
+        if script == extractor_common._LOGIN_STATE_SCRIPT:
+            return "error:The username or password is incorrect." if self.rejected else None
+        if script == extractor_common._PAGE_LOAD_SCRIPT:
+            return json.dumps({"bytes": 0, "resources": 0, "ready_ms": 0})
+        if "readyState" in script:
+            return "complete"
+        return None
+
+    def delete_all_cookies(self):
+        pass
+
+    def quit(self):
+        pass
+
+
+def _browser_backend(logins: list, rejected: bool = True):
+    """
+    Returns a browser backend that logs in through the shared login form, counting its logins.
+    """
+    def login(driver, username, password, timer=None):
+        logins.append(username)
+        driver.rejected = rejected
+        login_with_form(driver, LOGIN_URL, username, password, timer)
+
+    def extract(driver, info_path, grades_path, timer=None, **kwargs):
+        raise AssertionError("A rejected login must not reach the extraction.")
+
+    return types.SimpleNamespace(LOGIN_URL=LOGIN_URL, create_driver=_LoginPage, login=login, extract=extract)
+
+
+class FetchSchedulerTest(unittest.TestCase):
+
+    def run_scheduler(self, backend, retries: int = 2) -> list:
+        with mock.patch.object(extractor_service, "load_backend", lambda browser: backend), \
+                mock.patch.object(fetch_scheduler, "load_backend", lambda browser: backend), \
+                mock.patch.dict(extractor_common.STAGE_TIMEOUTS, login=0.2):
+            scheduler = fetch_scheduler.FetchScheduler("chrome", workers=1, rate=1000, retries=retries, backoff=0)
+            return scheduler.run([("student1", "wrong-password", None)], tempfile.mkdtemp())
+
+    def test_rejected_login_is_not_retried(self):
+        logins = []
+        [result] = self.run_scheduler(_browser_backend(logins))
+        self.assertFalse(result["ok"])
+        self.assertEqual(result["attempts"], 1)
+        self.assertEqual(logins, ["student1"])
+        self.assertTrue(result["error"].startswith("PermissionError"), result["error"])
+
+    def test_login_timeout_is_retried(self):
+        logins = []
+        [result] = self.run_scheduler(_browser_backend(logins, rejected=False), retries=1)
+        self.assertFalse(result["ok"])
+        self.assertEqual(result["attempts"], 2)
+        self.assertEqual(logins, ["student1", "student1"])
+        self.assertTrue(result["error"].startswith("TimeoutException"), result["error"])
+
+
+if __name__ == "__main__":
+    unittest.main()
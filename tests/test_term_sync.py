@@ -0,0 +1,83 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from extractor_common import sync_terms
+from term_sync import SYNC_STATE_NAME, TermSync
+
+_LABELS = ["Fall 2022", "Winter 2023"]
+_ROWS = {
+    "Fall 2022": [(2022, "CS-1910-01 2022-09-06 - 2022-12-02", "Computer Science I", "3", "91")],
+    "Winter 2023": [(2022, "CS-1920-01 2023-01-09 - 2023-04-14", "Computer Science II", "3", "88")],
+}
+
+
+class _TermPage(object):
+    """
+    Stands in for the browser on the grades page: lists the term labels and remembers which term is ticked.
+    """
+
+    def __init__(self):
+        self.ticked = None
+
+    def execute_script(self, script, css_selector, wanted=None):
+        if wanted:
+            self.ticked = wanted[0]
+        return json.dumps(_LABELS)
+
+
+def _sync(state_path: str, username: str, student: dict) -> tuple:
+    """
+    Runs an incremental sync for an account as the browser backends do, and returns (printed terms, sync).
+    """
+    page, printed = _TermPage(), []
+
+    def print_selected():
+        printed.append(page.ticked)
+        return _ROWS[page.ticked]
+
+    sync = TermSync(state_path, username)
+    sync_terms(page, sync, "#student-terms-ul label", print_selected)
+    if printed:
+        sync.student = student
+    sync.save()
+    return printed, sync
+
+
+class TermSyncTest(unittest.TestCase):
+
+    def setUp(self):
+        self.state_path = os.path.join(tempfile.mkdtemp(), SYNC_STATE_NAME)
+
+    def test_same_account_skips_final_terms(self):
+        alice = {"name": "Alice", "student_id": "1000001"}
+        self.assertEqual(_sync(self.state_path, "alice", alice)[0], _LABELS)
+        printed, sync = _sync(self.state_path, "alice", alice)
+        self.assertEqual(printed, [])
+        self.assertEqual(sync.student, alice)
+        self.assertEqual(sync.rows(), _ROWS["Fall 2022"] + _ROWS["Winter 2023"])
+
+    def test_two_students_sharing_a_state_path(self):
+        _sync(self.state_path, "alice", {"name": "Alice", "student_id": "1000001"})
+
+        bob_state = TermSync(self.state_path, "bob")
+        self.assertIsNone(bob_state.student)
+        self.assertEqual(bob_state.rows(), [])
+        self.assertEqual(bob_state.terms_to_fetch(_LABELS), _LABELS)
+
+        bob = {"name": "Bob", "student_id": "1000002"}
+        printed, sync = _sync(self.state_path, "bob", bob)
+        self.assertEqual(printed, _LABELS)  # A full fetch, nothing of Alice's state is reused
+        self.assertEqual(sync.student, bob)
+
+        # Bob's sync replaced the state, so Alice starts over too instead of seeing Bob's rows
+        self.assertIsNone(TermSync(self.state_path, "alice").student)
+        self.assertEqual(TermSync(self.state_path, "bob").student, bob)
+
+
+if __name__ == "__main__":
+    unittest.main()
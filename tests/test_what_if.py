@@ -0,0 +1,87 @@
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Courses import Courses, GPA_TARGETS, SCHOLARSHIP_TIERS
+from Mark import Mark
+from Student import Student
+from policies import DEFAULT_POLICY, evaluate_policies
+
+_BASE_CODES = ("CS-101", "MA-101", "PH-101", "EN-101")
+_TARGETS = GPA_TARGETS + (3.5, 2.5, 1.0)
+
+
+def _courses(taken: list) -> Courses:
+    courses = Courses(Student("Test Student", 1, None, "Computer Science"))
+    for course_code, mark, credit_hours, academic_year in taken:
+        courses.add_course((course_code, "N/A", Mark(mark), credit_hours), academic_year=academic_year)
+    return courses
+
+
+def _brute_force(taken: list, pending: list, academic_year: int) -> tuple[list, list]:
+    """
+    Grades the pending courses at every percentage from 0 to 100 with real Courses, and returns the lowest
+    percentage reaching each scholarship tier and each CGPA target.
+    """
+    tiers, cgpas = [None] * len(SCHOLARSHIP_TIERS), [None] * len(_TARGETS)
+    for percentage in range(101):
+        graded = [(course[0], course[2] if len(course) == 3 else percentage, course[1], academic_year)
+                  for course in pending]
+        courses = _courses(taken + graded)
+        evaluation = evaluate_policies(courses, (DEFAULT_POLICY,), (academic_year,))[DEFAULT_POLICY.name]
+        cgpa = evaluation["cumulative_gpa"] or 0.0
+        awarded = evaluation["scholarships"][academic_year]["tier"]
+        for i, (minimum_average, _) in enumerate(SCHOLARSHIP_TIERS):
+            if tiers[i] is None and awarded is not None and awarded >= minimum_average:
+                tiers[i] = percentage
+        for i, target in enumerate(_TARGETS):
+            if cgpas[i] is None and cgpa >= target - 1e-9:
+                cgpas[i] = percentage
+    return tiers, cgpas
+
+
+class WhatIfTest(unittest.TestCase):
+
+    def assert_matches_brute_force(self, taken: list, pending: list, academic_year: int) -> None:
+        result = _courses(taken).what_if(pending, academic_year, _TARGETS)
+        tiers, cgpas = _brute_force(taken, pending, academic_year)
+        context = f"taken={taken} pending={pending} academic_year={academic_year}"
+        self.assertEqual([tier["percentage"] for tier in result["scholarships"]], tiers, context)
+        self.assertEqual([target["percentage"] for target in result["cumulative_gpa"]], cgpas, context)
+
+    def test_free_course_before_fixed_attempt_ties_at_the_fixed_percentage(self):
+        taken = [("CS-101", 60, 3, 1)]
+        pending = [("MA-101", 3), ("MA-101", 0, 87)]
+        result = _courses(taken).what_if(pending, 1, (2.5,))
+        self.assertEqual(result["cumulative_gpa"], [{"target": 2.5, "percentage": 87}])
+        self.assert_matches_brute_force(taken, pending, 1)
+
+    def test_cgpa_target_can_be_missed_above_the_lowest_percentage(self):
+        taken = [("CS-101", 60, 3, 1)]
+        pending = [("MA-101", 0), ("MA-101", 6, 87)]
+        result = _courses(taken).what_if(pending, 1, (3.0,))
+        self.assertEqual(result["cumulative_gpa"], [{"target": 3.0, "percentage": 0}])
+        # At 87 the free course ties with the fixed 87 and keeps it from counting, so the CGPA falls below 3.0
+        graded = _courses(taken + [("MA-101", 87, 0, 1), ("MA-101", 87, 6, 1)])
+        self.assertLess(evaluate_policies(graded, (DEFAULT_POLICY,))[DEFAULT_POLICY.name]["cumulative_gpa"], 3.0)
+        self.assert_matches_brute_force(taken, pending, 1)
+
+    def test_matches_brute_force_on_random_transcripts(self):
+        rng = random.Random(2024)
+        for _ in range(300):
+            taken = [(f"{rng.choice(_BASE_CODES)}-0{rng.randint(1, 3)}",
+                      rng.choice((rng.randint(0, 100), rng.randint(40, 100), "E", "P")),
+                      rng.choice((0, 3, 3, 3, 6)), rng.randint(1, 2))
+                     for _ in range(rng.randint(0, 8))]
+            pending = []
+            for _ in range(rng.randint(1, 4)):
+                course = (rng.choice(_BASE_CODES), rng.choice((0, 3, 3, 6, 9)))
+                pending.append(course + (rng.randint(0, 100),) if rng.random() < 0.4 else course)
+            self.assert_matches_brute_force(taken, pending, rng.randint(1, 2))
+
+
+if __name__ == "__main__":
+    unittest.main()
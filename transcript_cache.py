@@ -0,0 +1,178 @@
+import hashlib
+import os
+import pickle
+import tempfile
+import zlib
+
+CACHE_FORMAT_VERSION = 2  # Bump whenever the pickled classes change shape, so old entries simply miss
+DEFAULT_MAX_BYTES = 256 << 20
+_READ_CHUNK_SIZE = 1 << 20
+
+
+class TranscriptCache(object):
+    """
+    A size-bounded, on-disk cache of already-built transcripts, keyed by the input files they were built from.
+
+    Entries are zlib-compressed pickles stored under a two-character fan-out directory, so a cohort's worth of
+    tens of thousands of entries stays cheap to list. When the cache grows past max_bytes the least recently used
+    entries are evicted. Entries are unpickled, so only point it at a directory you control.
+
+    Attributes:
+        __cache_dir (str): The directory holding the cache entries.
+        __max_bytes (int): The size the cache is trimmed back under once exceeded.
+        __key_mode (str): "content" hashes the input files, "stat" only uses their path, size and mtime.
+        __size (int): The cache size as last seen by this process, scanned lazily.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = DEFAULT_MAX_BYTES, key_mode: str = "content"):
+        """
+        Initializes the cache. The directory is created on the first store.
+
+        Raises:
+            ValueError: If key_mode is not "content" or "stat", or max_bytes is not positive.
+        """
+        if key_mode not in ("content", "stat"):
+            raise ValueError(f"key_mode must be 'content' or 'stat', got {key_mode!r}")
+        if max_bytes <= 0:
+            raise ValueError("max_bytes must be positive.")
+        self.__cache_dir = cache_dir
+        self.__max_bytes = max_bytes
+        self.__key_mode = key_mode
+        self.__size = None
+
+    @staticmethod
+    def beside(input_file: str, **kwargs) -> "TranscriptCache":
+        """
+        Returns a cache stored in a '.transcript_cache' directory next to an input file.
+        """
+        return TranscriptCache(os.path.join(os.path.dirname(os.path.abspath(input_file)), ".transcript_cache"),
+                               **kwargs)
+
+    def key_for(self, *input_files: str, variant: str = "") -> str:
+        """
+        Returns the cache key for a set of input files.
+
+        Args:
+            *input_files (str): The files the cached value is built from.
+            variant (str, optional): Tells apart different values built from the same files, e.g. the backend.
+
+        Raises:
+            FileNotFoundError: If an input file does not exist.
+        """
+        digest = hashlib.sha256(f"{CACHE_FORMAT_VERSION}\0{variant}".encode("utf-8"))
+        for path in input_files:
+            if self.__key_mode == "stat":
+                stat = os.stat(path)
+                digest.update(f"\0{os.path.abspath(path)}\0{stat.st_size}\0{stat.st_mtime_ns}".encode("utf-8"))
+                continue
+            with open(path, "rb") as file:
+                file_digest = hashlib.sha256()
+                for chunk in iter(lambda: file.read(_READ_CHUNK_SIZE), b""):
+                    file_digest.update(chunk)
+            digest.update(file_digest.digest())  # Fixed-size per file, so file boundaries cannot be confused
+        return digest.hexdigest()
+
+    def load(self, *input_files: str, variant: str = ""):
+        """
+        Returns the value cached for the input files, or None on a miss.
+        """
+        path = self.__entry_path(self.key_for(*input_files, variant=variant))
+        try:
+            with open(path, "rb") as file:
+                data = file.read()
+        except FileNotFoundError:
+            return None
+
+        try:
+            value = pickle.loads(zlib.decompress(data))
+        except (zlib.error, pickle.UnpicklingError, EOFError, AttributeError, ImportError, TypeError):
+            self.__remove(path)  # Corrupt or written by an incompatible version
+            return None
+
+        try:
+            os.utime(path)  # Mark as recently used for eviction
+        except FileNotFoundError:  # Evicted by another process in the meantime
+            pass
+        return value
+
+    def store(self, *input_files: str, value, variant: str = "") -> None:
+        """
+        Caches a value for the input files, then evicts old entries if the cache has grown too large.
+        """
+        path = self.__entry_path(self.key_for(*input_files, variant=variant))
+        data = zlib.compress(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # Write to a temporary file and rename it, so readers never see a half-written entry
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            self.__remove(tmp_path)
+            raise
+
+        if self.__size is None:
+            self.__size = self.__scan_size()
+        else:
+            self.__size += len(data)
+        if self.__size > self.__max_bytes:
+            self.evict()
+
+    def evict(self, target_bytes: int = None) -> int:
+        """
+        Removes the least recently used entries until the cache is under target_bytes.
+
+        Args:
+            target_bytes (int, optional): Defaults to 90% of max_bytes, so eviction does not run on every store.
+
+        Returns:
+            int: The number of entries removed.
+        """
+        if target_bytes is None:
+            target_bytes = self.__max_bytes * 9 // 10
+        entries = sorted(self.__iter_entries())  # Oldest access time first
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in entries:
+            if total <= target_bytes:
+                break
+            if self.__remove(path):
+                removed += 1
+            total -= size
+        self.__size = total
+        return removed
+
+    def __entry_path(self, key: str) -> str:
+        return os.path.join(self.__cache_dir, key[:2], key + ".bin")
+
+    def __iter_entries(self):
+        """
+        Yields (mtime, size, path) of every cache entry.
+        """
+        try:
+            fan_out_dirs = list(os.scandir(self.__cache_dir))
+        except FileNotFoundError:
+            return
+        for fan_out in fan_out_dirs:
+            if not fan_out.is_dir():
+                continue
+            for entry in os.scandir(fan_out.path):
+                if entry.name.endswith(".bin"):
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    yield stat.st_mtime_ns, stat.st_size, entry.path
+
+    def __scan_size(self) -> int:
+        return sum(size for _, size, _ in self.__iter_entries())
+
+    @staticmethod
+    def __remove(path: str) -> bool:
+        try:
+            os.remove(path)
+            return True
+        except FileNotFoundError:
+            return False
@@ -0,0 +1,120 @@
+import json
+
+from extractor_common import format_course_line
+from grades_parser import COURSE_PATTERN
+
+RECORDS_FORMAT_VERSION = 1
+
+
+def parse_student_information(lines) -> tuple:
+    """
+    Reads the name, student ID, majors and minors out of student_information.txt style lines.
+
+    Returns:
+        tuple: (name, student_id, majors, minors), with 'Unknown', 0 and empty tuples for missing lines.
+    """
+    name, student_id, majors, minors = "Unknown", 0, (), ()
+    for line in lines:
+        if line.startswith("Name:"):
+            name = line.split(":", 1)[1].strip()
+        elif line.startswith("Student ID:"):
+            student_id = int(line.split(":", 1)[1].strip())
+        elif line.startswith("Majors:"):
+            majors = tuple(x.strip() for x in line.split(":", 1)[1].split(","))
+        elif line.startswith("Minors:"):
+            minors = tuple(x.strip() for x in line.split(":", 1)[1].split(","))
+
+    return name, student_id, majors, minors
+
+
+def records_from_extraction(extraction: dict):
+    """
+    Converts an extraction into the typed records an extractor streams to the calculator.
+
+    Args:
+        extraction (dict): name, student_id, information and courses, as returned by the extractors' fetch_records.
+
+    Yields:
+        dict: A 'header' record, one 'student' record, a 'year' record starting each academic year, a 'course'
+              record per course and an 'end' record holding the course count, so a reader can tell a complete
+              stream from a truncated one.
+              Courses get exactly the fields parse_grades_file would have read from printer_friendly_grades.txt:
+              academic_year ('2023-2024'), code, name, grade and credits (int), and the rows that parser skips
+              (e.g. credits that are not a whole number) are skipped here too.
+    """
+    yield {"type": "header", "version": RECORDS_FORMAT_VERSION}
+
+    _, _, majors, minors = parse_student_information(extraction["information"].splitlines())
+    yield {"type": "student", "name": extraction["name"], "student_id": extraction["student_id"],
+           "majors": list(majors), "minors": list(minors)}
+
+    count, current_year = 0, None
+    # Sorted by year like the grades file, so the courses of a year keep the order that file would have
+    for year, section, title, credits, grade in sorted(extraction["courses"], key=lambda row: row[0]):
+        if year != current_year:
+            current_year = year
+            yield {"type": "year", "academic_year": f"{year}-{year + 1}"}
+        # Matched like a line of the grades file, so both routes into the calculator keep the same courses
+        course = COURSE_PATTERN.match(format_course_line((year, section, title, credits, grade)).strip())
+        if not course:
+            continue
+        count += 1
+        yield {"type": "course", "academic_year": f"{year}-{year + 1}", "code": course.group(1).split()[0],
+               "name": course.group(2), "grade": course.group(4) or "N/A", "credits": int(course.group(3))}
+
+    yield {"type": "end", "courses": count}
+
+
+def write_records(records, stream) -> None:
+    """
+    Writes records to a text stream as JSON Lines, flushing at the end.
+    """
+    for record in records:
+        stream.write(json.dumps(record, separators=(",", ":")) + "\n")
+    stream.flush()
+
+
+def read_records(stream) -> tuple:
+    """
+    Reads a complete record stream written by write_records.
+
+    Lines that are not JSON objects (e.g. stray progress output) are ignored.
+
+    Returns:
+        tuple: (student, courses_by_year), see collect_records.
+    """
+    return collect_records(json.loads(line) for line in stream if line.startswith("{"))
+
+
+def collect_records(records) -> tuple:
+    """
+    Collects a complete sequence of records, e.g. a record stream or the records of an extractor service reply.
+
+    Returns:
+        tuple: (student, courses_by_year), where student is the 'student' record and courses_by_year has the
+               shape parse_grades_file returns: academic year -> list of (code, name, grade, credits).
+
+    Raises:
+        ValueError: If the records have an unsupported version, no student, or end before the 'end' record.
+    """
+    student, courses_by_year, count = None, {}, 0
+    for record in records:
+        kind = record.get("type")
+        if kind == "header":
+            if record.get("version") != RECORDS_FORMAT_VERSION:
+                raise ValueError(f"Unsupported record stream version: {record.get('version')}")
+        elif kind == "student":
+            student = record
+        elif kind == "year":
+            courses_by_year.setdefault(record["academic_year"], [])
+        elif kind == "course":
+            courses_by_year.setdefault(record["academic_year"], []).append(
+                (record["code"], record["name"], record["grade"], record["credits"]))
+            count += 1
+        elif kind == "end":
+            if record["courses"] != count:
+                raise ValueError(f"Expected {record['courses']} course records, got {count}")
+            if student is None:
+                raise ValueError("The record stream has no student record")
+            return student, courses_by_year
+    raise ValueError("The record stream ended early; the extractor did not finish")
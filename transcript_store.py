@@ -0,0 +1,369 @@
+import argparse
+import datetime
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+
+from Courses import Courses, EXCLUDED_FROM_GPA, MINIMUM_YEAR_CREDITS, base_course_code
+
+STORE_FORMAT_VERSION = 1  # Bump whenever the schema changes; older databases are refused rather than misread
+DEFAULT_DATABASE = "transcripts.db"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+
+-- One row per saved snapshot of a student's transcript, so earlier fetches are kept
+CREATE TABLE IF NOT EXISTS transcripts (
+    id INTEGER PRIMARY KEY,
+    student_id INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    majors TEXT NOT NULL,  -- JSON lists
+    minors TEXT NOT NULL,
+    cumulative_gpa TEXT NOT NULL,
+    digest TEXT NOT NULL,
+    saved_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS transcripts_by_student ON transcripts (student_id, id);
+
+-- The latest snapshot of each student, which the cohort queries look at
+CREATE TABLE IF NOT EXISTS students (
+    student_id INTEGER PRIMARY KEY,
+    transcript_id INTEGER NOT NULL REFERENCES transcripts (id)
+);
+CREATE UNIQUE INDEX IF NOT EXISTS students_by_transcript ON students (transcript_id);
+
+CREATE TABLE IF NOT EXISTS courses (
+    transcript_id INTEGER NOT NULL REFERENCES transcripts (id),
+    student_id INTEGER NOT NULL,
+    academic_year TEXT NOT NULL,  -- e.g. '2023-2024'
+    year INTEGER NOT NULL,  -- 1 for the student's first academic year
+    code TEXT NOT NULL,
+    base_code TEXT NOT NULL,  -- The code without its section, e.g. 'MATH-1920'
+    name TEXT NOT NULL,
+    grade TEXT NOT NULL,  -- Mark.percentage as text, e.g. '87', 'E' or 'DSC'
+    percentage INTEGER NOT NULL,  -- Mark.get_comparable_percentage()
+    gpa REAL,  -- NULL when the attempt cannot count towards the CGPA
+    letter TEXT NOT NULL,
+    credits INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS courses_by_transcript ON courses (transcript_id);
+CREATE INDEX IF NOT EXISTS courses_by_student_year ON courses (student_id, academic_year);
+CREATE INDEX IF NOT EXISTS courses_by_base_code ON courses (base_code, transcript_id, percentage);
+
+CREATE TABLE IF NOT EXISTS scholarships (
+    transcript_id INTEGER NOT NULL REFERENCES transcripts (id),
+    student_id INTEGER NOT NULL,
+    academic_year TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    credit_hours INTEGER NOT NULL,
+    weighted_average REAL,
+    status TEXT NOT NULL,
+    tier INTEGER,
+    amount INTEGER NOT NULL,
+    PRIMARY KEY (transcript_id, year)
+);
+CREATE INDEX IF NOT EXISTS scholarships_by_year ON scholarships (academic_year, amount, transcript_id);
+"""
+
+
+def _course_row(course: tuple, spans: list) -> tuple:
+    """
+    Returns the courses table columns of a (course_code, course_name, mark, credit_hours, year) course, without
+    its transcript and student IDs.
+    """
+    code, name, mark, credits, year = course
+    counted = mark.percentage not in EXCLUDED_FROM_GPA and isinstance(mark.gpa, (int, float))
+    return (spans[year - 1], year, code, base_course_code(code), name, str(mark.percentage),
+            mark.get_comparable_percentage(), mark.gpa if counted else None, mark.letter, credits)
+
+
+class TranscriptStore(object):
+    """
+    An SQLite database of transcripts, so fetched transcripts are kept between runs and a whole cohort can be
+    queried without re-parsing its text files.
+
+    Every save adds a snapshot of the student's transcript (unless nothing changed since their last one), with
+    its course rows and the scholarship result of each academic year. Cohort queries look at the latest snapshot
+    of each student and are answered from indexes on student ID, academic year and base course code.
+
+    Attributes:
+        __connection (sqlite3.Connection): The open database.
+    """
+
+    def __init__(self, path: str = DEFAULT_DATABASE):
+        """
+        Opens the database, creating it and its tables if needed.
+
+        Args:
+            path (str, optional): The database file, or ':memory:'. Defaults to 'transcripts.db'.
+
+        Raises:
+            ValueError: If the database was created with another store format.
+        """
+        self.__connection = sqlite3.connect(path)
+        try:
+            with self.__connection:
+                self.__connection.executescript(_SCHEMA)
+                self.__connection.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('version', ?)",
+                                          (str(STORE_FORMAT_VERSION),))
+            version = self.__connection.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()[0]
+            if version != str(STORE_FORMAT_VERSION):
+                raise ValueError(f"{path} has store format {version}, expected {STORE_FORMAT_VERSION}")
+        except BaseException:
+            self.__connection.close()
+            raise
+
+    def close(self) -> None:
+        self.__connection.close()
+
+    def __enter__(self) -> "TranscriptStore":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def save(self, transcript: dict, saved_at: str = None) -> int:
+        """
+        Saves a snapshot of a transcript.
+
+        Args:
+            transcript (dict): A transcript as returned by Main.load_transcript or Main.transcript_from_records.
+            saved_at (str, optional): An ISO timestamp for the snapshot. Defaults to now.
+
+        Returns:
+            int: The ID of the new snapshot, or of the student's latest one if the transcript has not changed.
+
+        Raises:
+            ValueError: If the transcript has no student ID.
+        """
+        return self.save_many([transcript], saved_at)[0]
+
+    def save_many(self, transcripts, saved_at: str = None) -> list[int]:
+        """
+        Saves a snapshot of every transcript in a single transaction, with the course and scholarship rows
+        inserted in bulk. Nothing is saved if any transcript fails.
+
+        Args:
+            transcripts (iterable): Transcripts as returned by Main.load_transcript.
+            saved_at (str, optional): An ISO timestamp for the snapshots. Defaults to now.
+
+        Returns:
+            list: The snapshot ID of each transcript, see save.
+
+        Raises:
+            ValueError: If a transcript has no student ID (a missing 'Student ID:' line parses to 0), as every such
+                        transcript would otherwise replace the same student's snapshot.
+        """
+        saved_at = saved_at or datetime.datetime.now().isoformat(timespec="seconds")
+        snapshot_ids, course_rows, scholarship_rows = [], [], []
+        with self.__connection as connection:
+            for transcript in transcripts:
+                spans = transcript["academic_years"]
+                courses_obj = transcript["student"].get_courses()
+                student_id = transcript["student_id"]
+                if not isinstance(student_id, int) or student_id <= 0:
+                    raise ValueError(f"The transcript of {transcript['name']} has no student ID and cannot be saved.")
+                header = (transcript["name"], json.dumps(list(transcript["majors"])),
+                          json.dumps(list(transcript["minors"])), courses_obj.calculate_cumulative_gpa())
+                courses = [_course_row(course, spans) for course in courses_obj.get_courses()]
+                digest = hashlib.sha256(json.dumps([header, spans, courses]).encode("utf-8")).hexdigest()
+
+                latest = connection.execute(
+                    "SELECT t.id, t.digest FROM students s JOIN transcripts t ON t.id = s.transcript_id "
+                    "WHERE s.student_id = ?", (student_id,)).fetchone()
+                if latest is not None and latest[1] == digest:
+                    snapshot_ids.append(latest[0])
+                    continue
+
+                snapshot_id = connection.execute(
+                    "INSERT INTO transcripts (student_id, name, majors, minors, cumulative_gpa, digest, saved_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)", (student_id, *header, digest, saved_at)).lastrowid
+                connection.execute("INSERT OR REPLACE INTO students (student_id, transcript_id) VALUES (?, ?)",
+                                   (student_id, snapshot_id))
+                course_rows.extend((snapshot_id, student_id, *course) for course in courses)
+                scholarships = courses_obj.calculate_all_scholarships(range(1, len(spans) + 1))
+                scholarship_rows.extend(
+                    (snapshot_id, student_id, span, idx, scholarships[idx]["credit_hours"],
+                     scholarships[idx]["weighted_average"], scholarships[idx]["status"], scholarships[idx]["tier"],
+                     scholarships[idx]["amount"])
+                    for idx, span in enumerate(spans, start=1))
+                snapshot_ids.append(snapshot_id)
+
+            connection.executemany("INSERT INTO courses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", course_rows)
+            connection.executemany("INSERT INTO scholarships VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", scholarship_rows)
+        return snapshot_ids
+
+    def load(self, student_id: int, snapshot_id: int = None, courses_cls=Courses) -> dict:
+        """
+        Rebuilds a student's transcript from the database.
+
+        Args:
+            student_id (int): The student.
+            snapshot_id (int, optional): One of the student's snapshots, see history. Defaults to the latest.
+            courses_cls (optional): The Courses storage backend, e.g. Courses or ColumnarCourses.
+
+        Returns:
+            dict: The transcript, as Main.load_transcript returns it.
+
+        Raises:
+            KeyError: If the student or snapshot is not in the database.
+        """
+        from Main import build_student  # Lazy import, Main only needs this module for --store
+
+        if snapshot_id is None:
+            row = self.__connection.execute(
+                "SELECT transcript_id FROM students WHERE student_id = ?", (student_id,)).fetchone()
+            if row is None:
+                raise KeyError(f"No transcript stored for student {student_id}")
+            snapshot_id = row[0]
+        header = self.__connection.execute(
+            "SELECT name, majors, minors FROM transcripts WHERE id = ? AND student_id = ?",
+            (snapshot_id, student_id)).fetchone()
+        if header is None:
+            raise KeyError(f"Student {student_id} has no snapshot {snapshot_id}")
+
+        courses_by_year = {span: [] for (span,) in self.__connection.execute(
+            "SELECT academic_year FROM scholarships WHERE transcript_id = ? ORDER BY year", (snapshot_id,))}
+        for span, code, name, grade, credits in self.__connection.execute(
+                "SELECT academic_year, code, name, grade, credits FROM courses WHERE transcript_id = ? "
+                "ORDER BY rowid", (snapshot_id,)):
+            courses_by_year[span].append((code, name, grade, credits))
+
+        name, majors, minors = header[0], tuple(json.loads(header[1])), tuple(json.loads(header[2]))
+        return {
+            "name": name,
+            "student_id": student_id,
+            "majors": majors,
+            "minors": minors,
+            "academic_years": sorted(courses_by_year),
+            "student": build_student(courses_by_year, name, student_id, majors, minors, courses_cls),
+        }
+
+    def history(self, student_id: int) -> list[dict]:
+        """
+        Returns a student's snapshots, oldest first, as dicts with snapshot_id, saved_at and cumulative_gpa.
+        """
+        return [{"snapshot_id": snapshot_id, "saved_at": saved_at, "cumulative_gpa": cumulative_gpa}
+                for snapshot_id, saved_at, cumulative_gpa in self.__connection.execute(
+                    "SELECT id, saved_at, cumulative_gpa FROM transcripts WHERE student_id = ? ORDER BY id",
+                    (student_id,))]
+
+    def scholarship_recipients(self, academic_year: str, amount: int = None) -> list[dict]:
+        """
+        Returns the students awarded a scholarship in an academic year, best weighted average first.
+
+        Args:
+            academic_year (str): The academic year, e.g. '2023-2024'.
+            amount (int, optional): Only students awarded this amount, e.g. 3000. Defaults to every award.
+
+        Returns:
+            list: Dicts with student_id, name, weighted_average and amount.
+        """
+        query = ("SELECT sc.student_id, t.name, sc.weighted_average, sc.amount FROM scholarships sc "
+                 "JOIN students s ON s.transcript_id = sc.transcript_id JOIN transcripts t ON t.id = sc.transcript_id "
+                 "WHERE sc.academic_year = ? AND sc.status = 'awarded'")
+        parameters = [academic_year]
+        if amount is not None:
+            query += " AND sc.amount = ?"
+            parameters.append(amount)
+        query += " ORDER BY sc.weighted_average DESC, sc.student_id"
+        return [{"student_id": student_id, "name": name, "weighted_average": weighted_average, "amount": awarded}
+                for student_id, name, weighted_average, awarded in self.__connection.execute(query, parameters)]
+
+    def scholarship_candidates(self, academic_year: str = None,
+                               minimum_credits: int = MINIMUM_YEAR_CREDITS) -> list[tuple]:
+        """
+        Returns every student and year with enough credit hours to be considered for a scholarship, whatever
+        their average, as the candidates scholarship_allocation.allocate_scholarships ranks.
+
+        Args:
+            academic_year (str, optional): Only this academic year, e.g. '2023-2024'. Defaults to every year.
+            minimum_credits (int, optional): The credit hours a year needs, e.g. a ScholarshipPolicy's
+                                             minimum_credits. Defaults to the default policy's.
+
+        Returns:
+            list: (student_id, academic_year, weighted_average) tuples.
+        """
+        query = ("SELECT sc.student_id, sc.academic_year, sc.weighted_average FROM scholarships sc "
+                 "JOIN students s ON s.transcript_id = sc.transcript_id "
+                 "WHERE sc.credit_hours > 0 AND sc.credit_hours >= ?")
+        if academic_year is None:
+            return self.__connection.execute(query, (minimum_credits,)).fetchall()
+        return self.__connection.execute(query + " AND sc.academic_year = ?",
+                                         (minimum_credits, academic_year)).fetchall()
+
+    def best_attempts_below(self, course_code: str, percentage: int) -> list[dict]:
+        """
+        Returns the students whose best attempt at a course, as counted towards their CGPA, is below a percentage.
+
+        Args:
+            course_code (str): The course, with or without a section (e.g. 'MATH-1920' or 'MATH-1920-02').
+            percentage (int): The percentage the best attempt is below. An E counts as 0.
+
+        Returns:
+            list: Dicts with student_id, name and best_percentage, lowest first.
+        """
+        return [{"student_id": student_id, "name": name, "best_percentage": best}
+                for student_id, name, best in self.__connection.execute(
+                    "SELECT s.student_id, t.name, MAX(c.percentage) AS best FROM courses c "
+                    "JOIN students s ON s.transcript_id = c.transcript_id JOIN transcripts t ON t.id = c.transcript_id "
+                    "WHERE c.base_code = ? AND c.gpa IS NOT NULL GROUP BY s.student_id HAVING best < ? "
+                    "ORDER BY best, s.student_id", (base_course_code(course_code), percentage))]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Keep transcripts in an SQLite database and query the cohort.")
+    parser.add_argument("--db", default=DEFAULT_DATABASE, help="The database file")
+    commands = parser.add_subparsers(dest="command", required=True)
+    import_parser = commands.add_parser("import", help="Save transcripts from their text files")
+    import_parser.add_argument("source",
+                               help="A directory of per-student folders, or a CSV manifest of grades/info file pairs")
+    scholarships_parser = commands.add_parser("scholarships", help="List the scholarship recipients of a year")
+    scholarships_parser.add_argument("academic_year", help="e.g. 2023-2024")
+    scholarships_parser.add_argument("--amount", type=int, default=None, help="Only this scholarship, e.g. 3000")
+    below_parser = commands.add_parser("below", help="List the students whose best attempt at a course is below a mark")
+    below_parser.add_argument("course_code", help="e.g. MATH-1920")
+    below_parser.add_argument("percentage", type=int)
+    history_parser = commands.add_parser("history", help="List the saved snapshots of a student")
+    history_parser.add_argument("student_id", type=int)
+    args = parser.parse_args(argv)
+
+    with TranscriptStore(args.db) as store:
+        if args.command == "import":
+            from batch_evaluator import discover_transcripts, read_manifest
+            from Main import load_transcript
+            pairs = discover_transcripts(args.source) if os.path.isdir(args.source) else read_manifest(args.source)
+            unidentified = []
+
+            def identified():
+                for grades_file, info_file in pairs:
+                    transcript = load_transcript(grades_file, info_file)
+                    if transcript["student_id"] > 0:
+                        yield transcript
+                    else:
+                        unidentified.append(info_file)
+
+            snapshot_ids = store.save_many(identified())
+            print(f"Saved {len(snapshot_ids)} transcripts → {args.db}")
+            for info_file in unidentified:
+                print(f"Skipped {info_file}: no Student ID")
+            return 0 if snapshot_ids and not unidentified else 1
+
+        if args.command == "scholarships":
+            rows = store.scholarship_recipients(args.academic_year, args.amount)
+            lines = [f"{r['student_id']:>9}  {r['name']:<40} {r['weighted_average']:6.2f}  ${r['amount']}"
+                     for r in rows]
+        elif args.command == "below":
+            rows = store.best_attempts_below(args.course_code, args.percentage)
+            lines = [f"{r['student_id']:>9}  {r['name']:<40} {r['best_percentage']:>3}" for r in rows]
+        else:
+            rows = store.history(args.student_id)
+            lines = [f"{r['snapshot_id']:>6}  {r['saved_at']}  {r['cumulative_gpa'].splitlines()[0]}" for r in rows]
+    print("\n".join(lines) if lines else "No matching students.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())